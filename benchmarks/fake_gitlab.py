@@ -0,0 +1,321 @@
+import asyncio
+import base64
+import json
+import math
+import multiprocessing
+import re
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from multiprocessing.connection import Connection
+from types import TracebackType
+from typing import Any, Final, Self
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+import httpx
+
+from benchmarks.synthetic import SyntheticGitLab, SyntheticProject
+
+
+GROUP_PROJECTS_PATTERN: Final[re.Pattern[str]] = re.compile(r"/api/v4/groups/(?P<id>\d+)/projects")
+DESCENDANT_GROUPS_PATTERN: Final[re.Pattern[str]] = re.compile(r"/api/v4/groups/(?P<id>\d+)/descendant_groups")
+TREE_PATTERN: Final[re.Pattern[str]] = re.compile(r"/api/v4/projects/(?P<id>\d+)/repository/tree")
+FILE_PATTERN: Final[re.Pattern[str]] = re.compile(r"/api/v4/projects/(?P<id>\d+)/repository/files/(?P<path>[^/]+)")
+GRAPHQL_PATH: Final[str] = "/api/graphql"
+STATS_PATH: Final[str] = "/_stats"
+DEFAULT_PER_PAGE: Final[int] = 20
+
+Response = tuple[HTTPStatus, dict[str, str], Any]
+
+
+@dataclass(frozen=True)
+class FakeGitLabOptions:
+    projects: int = 1_000
+    subgroups: int = 50
+    lock_size: int = 1024 * 1024
+    templates: int = 20
+    # Share of tracked files missing in a project and of projects with an empty repository (404 tree)
+    missing_ratio: float = 0.1
+    empty_ratio: float = 0.02
+    seed: int = 0
+    # Seconds added to every response and requests per second allowed before 429, 0 disables the limit
+    latency: float = 0.05
+    rate_limit: float = 0
+
+
+class FakeGitLabServer:
+    """Local GitLab speaking enough REST and GraphQL for a group scan, with latency and rate limits."""
+
+    def __init__(self, options: FakeGitLabOptions) -> None:
+        self.options: FakeGitLabOptions = options
+        self.gitlab: SyntheticGitLab = SyntheticGitLab(
+            projects=options.projects,
+            subgroups=options.subgroups,
+            lock_size=options.lock_size,
+            templates=options.templates,
+            missing_ratio=options.missing_ratio,
+            empty_ratio=options.empty_ratio,
+            seed=options.seed,
+        )
+        # Shared prefixes of files are encoded once, the server should not be the bottleneck of a benchmark
+        self._encoded_prefixes: dict[bytes, tuple[str, str]] = {}
+        self._tokens: float = options.rate_limit
+        self._tokens_updated_at: float = time.monotonic()
+        self._stats: dict[str, int] = {"requests": 0, "throttled": 0, "not_found": 0, "sent_bytes": 0}
+
+    async def serve(self, connection: Connection) -> None:
+        server: asyncio.Server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        connection.send(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head: list[str] = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+                method, target, _ = head[0].split(" ", 2)
+                headers: dict[str, str] = {
+                    name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in head[1:])
+                }
+                body: bytes = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, response_headers, payload = await self._respond(method, target, headers, body)
+                content: bytes = json.dumps(payload).encode()
+                self._stats["sent_bytes"] += len(content)
+                response_headers |= {"Content-Type": "application/json", "Content-Length": str(len(content))}
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n".encode()
+                    + "".join(f"{name}: {value}\r\n" for name, value in response_headers.items()).encode()
+                    + b"\r\n"
+                    + content,
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    async def _respond(self, method: str, target: str, headers: dict[str, str], body: bytes) -> Response:
+        url = urlsplit(target)
+        if url.path == STATS_PATH:
+            return HTTPStatus.OK, {}, self._stats | {"projects": len(self.gitlab.projects)}
+
+        self._stats["requests"] += 1
+        is_allowed: bool = self._take_token()
+        rate_limit_headers: dict[str, str] = self._get_rate_limit_headers()
+        if not is_allowed:
+            self._stats["throttled"] += 1
+            retry_after: int = max(math.ceil((1 - self._tokens) / self.options.rate_limit), 1)
+            return HTTPStatus.TOO_MANY_REQUESTS, rate_limit_headers | {"Retry-After": str(retry_after)}, {}
+        await asyncio.sleep(self.options.latency)
+
+        params: dict[str, str] = dict(parse_qsl(url.query))
+        response: Response = (HTTPStatus.NOT_FOUND, {}, {"message": "404 Not Found"})
+        if method == "POST" and url.path == GRAPHQL_PATH:
+            response = self._graphql(json.loads(body)["variables"])
+        elif match := GROUP_PROJECTS_PATTERN.fullmatch(url.path):
+            response = self._get_group_projects(int(match["id"]), params, headers["host"], url.path)
+        elif match := DESCENDANT_GROUPS_PATTERN.fullmatch(url.path):
+            response = self._get_descendant_groups(int(match["id"]), params, headers["host"], url.path)
+        elif match := TREE_PATTERN.fullmatch(url.path):
+            response = self._get_tree(int(match["id"]))
+        elif match := FILE_PATTERN.fullmatch(url.path):
+            response = self._get_file(int(match["id"]), unquote(match["path"]))
+
+        status, response_headers, payload = response
+        if status == HTTPStatus.NOT_FOUND:
+            self._stats["not_found"] += 1
+        return status, response_headers | rate_limit_headers, payload
+
+    def _take_token(self) -> bool:
+        if not self.options.rate_limit:
+            return True
+        now: float = time.monotonic()
+        # Token bucket holding a second of requests
+        self._tokens = min(
+            self._tokens + (now - self._tokens_updated_at) * self.options.rate_limit,
+            self.options.rate_limit,
+        )
+        self._tokens_updated_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _get_rate_limit_headers(self) -> dict[str, str]:
+        if not self.options.rate_limit:
+            return {}
+        full_at: float = time.time() + (self.options.rate_limit - self._tokens) / self.options.rate_limit
+        return {
+            "RateLimit-Limit": str(math.ceil(self.options.rate_limit)),
+            "RateLimit-Remaining": str(math.floor(self._tokens)),
+            "RateLimit-Reset": str(math.ceil(full_at)),
+        }
+
+    def _get_group_projects(self, group_id: int, params: dict[str, str], host: str, path: str) -> Response:
+        if group_id not in self.gitlab.groups:
+            return HTTPStatus.NOT_FOUND, {}, {"message": "404 Group Not Found"}
+        projects: list[SyntheticProject] = self.gitlab.get_projects(
+            group_id,
+            include_subgroups=params.get("include_subgroups", "").lower() == "true",
+        )
+        return self._paginate(
+            [
+                {
+                    "id": project.id,
+                    "name": project.name,
+                    "path_with_namespace": f"{project.group.path}/{project.name}",
+                    "web_url": f"http://{host}/{project.group.path}/{project.name}",
+                    "last_activity_at": project.last_activity_at,
+                }
+                for project in projects
+            ],
+            params,
+            host,
+            path,
+        )
+
+    def _get_descendant_groups(self, group_id: int, params: dict[str, str], host: str, path: str) -> Response:
+        if group_id not in self.gitlab.groups:
+            return HTTPStatus.NOT_FOUND, {}, {"message": "404 Group Not Found"}
+        return self._paginate(
+            [
+                {"id": group.id, "parent_id": group.parent_id, "full_path": group.path}
+                for group in self.gitlab.get_descendant_groups(group_id)
+            ],
+            params,
+            host,
+            path,
+        )
+
+    def _get_tree(self, project_id: int) -> Response:
+        if (project := self.gitlab.projects.get(project_id)) is None or project.is_empty:
+            return HTTPStatus.NOT_FOUND, {}, {"message": "404 Tree Not Found"}
+        return HTTPStatus.OK, {}, [self._get_tree_entry(project, file_path) for file_path in project.file_paths]
+
+    def _get_file(self, project_id: int, file_path: str) -> Response:
+        if (project := self.gitlab.projects.get(project_id)) is None or (
+            file := self.gitlab.get_file(project, file_path)
+        ) is None:
+            return HTTPStatus.NOT_FOUND, {}, {"message": "404 File Not Found"}
+        prefix, suffix = file
+        return (
+            HTTPStatus.OK,
+            {},
+            {
+                "file_name": file_path,
+                "file_path": file_path,
+                "size": len(prefix) + len(suffix),
+                "encoding": "base64",
+                # The prefix is padded to whole base64 quanta, so both parts are encoded separately
+                "content": self._get_encoded_prefix(prefix)[0] + base64.b64encode(suffix).decode(),
+                "blob_id": self.gitlab.get_sha(project, file_path),
+                "ref": "master",
+            },
+        )
+
+    def _graphql(self, variables: dict[str, Any]) -> Response:
+        projects: list[SyntheticProject] = [
+            project
+            for gid in variables["ids"]
+            if (project := self.gitlab.projects.get(int(gid.rsplit("/", 1)[-1]))) is not None
+        ]
+        nodes: list[dict[str, Any]] = []
+        for project in projects:
+            repository: dict[str, Any] | None = None
+            if not project.is_empty and "paths" in variables:
+                repository = {"blobs": {"nodes": self._get_blob_nodes(project, variables["paths"])}}
+            elif not project.is_empty:
+                entries: list[dict[str, str]] = [
+                    self._get_tree_entry(project, file_path) for file_path in project.file_paths
+                ]
+                repository = {
+                    "tree": {
+                        "blobs": {
+                            "pageInfo": {"hasNextPage": False},
+                            "nodes": [
+                                {"sha": entry["id"], "name": entry["name"], "path": entry["path"], "type": "blob"}
+                                for entry in entries
+                            ],
+                        },
+                    },
+                }
+            nodes.append({"id": f"gid://gitlab/Project/{project.id}", "repository": repository})
+        return HTTPStatus.OK, {}, {"data": {"projects": {"nodes": nodes}}}
+
+    def _get_blob_nodes(self, project: SyntheticProject, file_paths: list[str]) -> list[dict[str, str]]:
+        nodes: list[dict[str, str]] = []
+        for file_path in file_paths:
+            if (file := self.gitlab.get_file(project, file_path)) is None:
+                continue
+            prefix, suffix = file
+            nodes.append(
+                {
+                    "path": file_path,
+                    "oid": self.gitlab.get_sha(project, file_path),
+                    "rawBlob": self._get_encoded_prefix(prefix)[1] + suffix.decode(),
+                },
+            )
+        return nodes
+
+    def _get_tree_entry(self, project: SyntheticProject, file_path: str) -> dict[str, str]:
+        return {
+            "id": self.gitlab.get_sha(project, file_path),
+            "name": file_path,
+            "type": "blob",
+            "path": file_path,
+            "mode": "100644",
+        }
+
+    def _get_encoded_prefix(self, prefix: bytes) -> tuple[str, str]:
+        if (encoded := self._encoded_prefixes.get(prefix)) is None:
+            encoded = self._encoded_prefixes[prefix] = base64.b64encode(prefix).decode(), prefix.decode()
+        return encoded
+
+    @staticmethod
+    def _paginate(items: list[dict[str, Any]], params: dict[str, str], host: str, path: str) -> Response:
+        page: int = int(params.get("page", 1))
+        per_page: int = int(params.get("per_page", DEFAULT_PER_PAGE))
+        headers: dict[str, str] = {"X-Total": str(len(items))}
+        if page * per_page < len(items):
+            next_url: str = f"http://{host}{path}?{urlencode(params | {'page': str(page + 1)})}"
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return HTTPStatus.OK, headers, items[(page - 1) * per_page : page * per_page]
+
+
+class FakeGitLab:
+    """Runs the fake GitLab in a separate process, so serving it does not slow down the measured event loop."""
+
+    def __init__(self, options: FakeGitLabOptions) -> None:
+        self.options: FakeGitLabOptions = options
+        self.port: int | None = None
+        self._process: multiprocessing.process.BaseProcess | None = None
+
+    @property
+    def url(self) -> str:
+        if self.port is None:
+            raise RuntimeError("Fake GitLab is not started")
+        return f"http://127.0.0.1:{self.port}/"
+
+    def get_stats(self) -> dict[str, int]:
+        return httpx.get(f"{self.url.rstrip('/')}{STATS_PATH}").json()
+
+    def __enter__(self) -> Self:
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        self._process = context.Process(target=_serve, args=(self.options, sender), daemon=True)
+        self._process.start()
+        # Generating the group takes a while, the port is sent once the server listens
+        self.port = receiver.recv()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+
+def _serve(options: FakeGitLabOptions, connection: Connection) -> None:
+    asyncio.run(FakeGitLabServer(options).serve(connection))
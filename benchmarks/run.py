@@ -0,0 +1,221 @@
+"""Benchmarks of group scans against a local fake GitLab.
+
+Run from the repository root: python -m benchmarks.run --projects 1000 --lock-size 1048576
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Final
+
+import bakery
+from loguru import logger
+
+from benchmarks.fake_gitlab import FakeGitLab, FakeGitLabOptions
+from benchmarks.synthetic import ROOT_GROUP_ID
+from packagebusters.containers import PackagebustersContainer
+
+
+@dataclass(frozen=True)
+class BenchmarkOptions:
+    scans: int = 3
+    users: int = 20
+    requests_per_user: int = 5
+    is_add_transitive_dependencies: bool = True
+
+
+@dataclass
+class Measurement:
+    latencies: list[float]
+    seconds: float
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    scans: int
+    seconds: float
+    scans_per_second: float
+    projects_per_second: float
+    p50_ms: float
+    p99_ms: float
+    gitlab_requests: int
+    throttled: int
+    peak_rss_mb: float
+
+
+Scenario = Callable[[BenchmarkOptions], Coroutine[Any, Any, Measurement]]
+
+
+@asynccontextmanager
+async def open_container() -> AsyncIterator[None]:
+    # Every container starts with empty caches and its own connections to GitLab
+    await PackagebustersContainer.aopen()
+    try:
+        yield
+    finally:
+        await PackagebustersContainer.aclose()
+
+
+async def scan(options: BenchmarkOptions) -> float:
+    started_at: float = time.perf_counter()
+    await PackagebustersContainer._package_getter().get_group_packages(  # type: ignore[operator]  # noqa: SLF001
+        group_id=ROOT_GROUP_ID,
+        is_add_transitive_dependencies=options.is_add_transitive_dependencies,
+        is_cached=True,
+    )
+    return time.perf_counter() - started_at
+
+
+async def cold_scans(options: BenchmarkOptions) -> Measurement:
+    latencies: list[float] = []
+    for _ in range(options.scans):
+        async with open_container():
+            latencies.append(await scan(options))
+    return Measurement(latencies=latencies, seconds=sum(latencies))
+
+
+async def warm_scans(options: BenchmarkOptions) -> Measurement:
+    async with open_container():
+        await scan(options)
+        latencies: list[float] = [await scan(options) for _ in range(options.scans)]
+    return Measurement(latencies=latencies, seconds=sum(latencies))
+
+
+async def concurrent_users(options: BenchmarkOptions) -> Measurement:
+    # Users request a cold service at once through the group index, like the packages endpoint does
+    async def request() -> float:
+        started_at: float = time.perf_counter()
+        await PackagebustersContainer._group_index().get_group_packages(  # type: ignore[operator]  # noqa: SLF001
+            group_id=ROOT_GROUP_ID,
+            is_add_transitive_dependencies=options.is_add_transitive_dependencies,
+            is_cached=True,
+        )
+        return time.perf_counter() - started_at
+
+    async def user() -> list[float]:
+        return [await request() for _ in range(options.requests_per_user)]
+
+    async with open_container():
+        started_at: float = time.perf_counter()
+        users_latencies: list[list[float]] = await asyncio.gather(*(user() for _ in range(options.users)))
+        seconds: float = time.perf_counter() - started_at
+    return Measurement(latencies=[latency for latencies in users_latencies for latency in latencies], seconds=seconds)
+
+
+SCENARIOS: Final[dict[str, Scenario]] = {
+    "cold": cold_scans,
+    "warm": warm_scans,
+    "concurrent": concurrent_users,
+}
+
+
+def run_scenario(scenario: str, options: BenchmarkOptions) -> tuple[Measurement, float]:
+    # Debug logs of every request would be measured along with the scan
+    bakery.logger = None
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    measurement: Measurement = asyncio.run(SCENARIOS[scenario](options))
+    # ru_maxrss is in kilobytes on Linux, the peak of this process only
+    return measurement, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_percentile(latencies: list[float], percent: int) -> float:
+    if len(latencies) == 1:
+        return latencies[0]
+    return statistics.quantiles(latencies, n=100, method="inclusive")[percent - 1]
+
+
+def benchmark(
+    scenarios: list[str], gitlab_options: FakeGitLabOptions, options: BenchmarkOptions
+) -> list[ScenarioResult]:
+    results: list[ScenarioResult] = []
+    with FakeGitLab(gitlab_options) as gitlab:
+        # Settings are read from the environment of every scenario process, explicit ones are kept
+        os.environ["GITLAB_URL"] = gitlab.url
+        os.environ.setdefault("GITLAB_TOKEN", "benchmark")
+        for scenario in scenarios:
+            gitlab_stats: dict[str, int] = gitlab.get_stats()
+            # A fresh process per scenario keeps the peak RSS of one scenario from hiding the others
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                measurement, peak_rss_mb = executor.submit(run_scenario, scenario, options).result()
+            scenario_stats: dict[str, int] = {
+                name: value - gitlab_stats[name] for name, value in gitlab.get_stats().items()
+            }
+            results.append(
+                ScenarioResult(
+                    scenario=scenario,
+                    scans=len(measurement.latencies),
+                    seconds=round(measurement.seconds, 3),
+                    scans_per_second=round(len(measurement.latencies) / measurement.seconds, 3),
+                    projects_per_second=round(
+                        len(measurement.latencies) * gitlab_stats["projects"] / measurement.seconds,
+                        1,
+                    ),
+                    p50_ms=round(get_percentile(measurement.latencies, 50) * 1000, 1),
+                    p99_ms=round(get_percentile(measurement.latencies, 99) * 1000, 1),
+                    gitlab_requests=scenario_stats["requests"],
+                    throttled=scenario_stats["throttled"],
+                    peak_rss_mb=round(peak_rss_mb, 1),
+                ),
+            )
+            print_result(results[-1])
+    return results
+
+
+def print_result(result: ScenarioResult) -> None:
+    print("  ".join(f"{field.name}={getattr(result, field.name)}" for field in fields(result)))  # noqa: T201
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)}, all by default")
+    parser.add_argument("--projects", type=int, default=FakeGitLabOptions.projects)
+    parser.add_argument("--subgroups", type=int, default=FakeGitLabOptions.subgroups)
+    parser.add_argument("--lock-size", type=int, default=FakeGitLabOptions.lock_size, help="bytes of poetry.lock")
+    parser.add_argument("--templates", type=int, default=FakeGitLabOptions.templates, help="distinct lock files")
+    parser.add_argument("--missing-ratio", type=float, default=FakeGitLabOptions.missing_ratio)
+    parser.add_argument("--empty-ratio", type=float, default=FakeGitLabOptions.empty_ratio)
+    parser.add_argument("--latency", type=float, default=FakeGitLabOptions.latency, help="seconds per response")
+    parser.add_argument("--rate-limit", type=float, default=FakeGitLabOptions.rate_limit, help="requests per second")
+    parser.add_argument("--seed", type=int, default=FakeGitLabOptions.seed)
+    parser.add_argument("--scans", type=int, default=BenchmarkOptions.scans)
+    parser.add_argument("--users", type=int, default=BenchmarkOptions.users)
+    parser.add_argument("--requests-per-user", type=int, default=BenchmarkOptions.requests_per_user)
+    parser.add_argument("--json", help="file to write the results to")
+    args: argparse.Namespace = parser.parse_args()
+    if unknown_scenarios := set(args.scenarios) - set(SCENARIOS):
+        parser.error(f"unknown scenarios {', '.join(sorted(unknown_scenarios))}")
+
+    results: list[ScenarioResult] = benchmark(
+        scenarios=args.scenarios or list(SCENARIOS),
+        gitlab_options=FakeGitLabOptions(
+            projects=args.projects,
+            subgroups=args.subgroups,
+            lock_size=args.lock_size,
+            templates=args.templates,
+            missing_ratio=args.missing_ratio,
+            empty_ratio=args.empty_ratio,
+            latency=args.latency,
+            rate_limit=args.rate_limit,
+            seed=args.seed,
+        ),
+        options=BenchmarkOptions(scans=args.scans, users=args.users, requests_per_user=args.requests_per_user),
+    )
+    if args.json:
+        with open(args.json, "w") as file:  # noqa: PTH123
+            json.dump([asdict(result) for result in results], file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
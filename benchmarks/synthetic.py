@@ -0,0 +1,162 @@
+import hashlib
+import random
+from dataclasses import dataclass, field
+from typing import Final
+
+
+ROOT_GROUP_ID: Final[int] = 1
+PACKAGE_POOL_SIZE: Final[int] = 3_000
+TRACKED_FILE_PATHS: Final[tuple[str, ...]] = ("poetry.lock", "pyproject.toml", "Dockerfile")
+OTHER_FILE_PATHS: Final[tuple[str, ...]] = (".gitignore", "README.md", "Makefile")
+
+
+@dataclass
+class SyntheticGroup:
+    id: int
+    parent_id: int | None
+    path: str
+
+
+@dataclass
+class SyntheticProject:
+    id: int
+    name: str
+    group: SyntheticGroup
+    template_id: int
+    python_version: str
+    # Root files of the repository, an empty repository has none and its tree is not found
+    file_paths: tuple[str, ...]
+    last_activity_at: str = "2024-01-01T00:00:00.000Z"
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.file_paths
+
+
+@dataclass
+class LockTemplate:
+    poetry_lock: bytes
+    direct_dependencies: list[str] = field(default_factory=list)
+
+
+class SyntheticGitLab:
+    """Deterministic group tree with projects and realistic poetry.lock files, generated from a seed.
+
+    Projects share a few large lock templates and differ by a trailing comment, so every file has its own sha while
+    the generator keeps only the templates in memory.
+    """
+
+    def __init__(
+        self,
+        projects: int,
+        subgroups: int,
+        lock_size: int,
+        templates: int,
+        missing_ratio: float,
+        empty_ratio: float,
+        seed: int,
+    ) -> None:
+        self.random: random.Random = random.Random(seed)
+        self.groups: dict[int, SyntheticGroup] = {ROOT_GROUP_ID: SyntheticGroup(ROOT_GROUP_ID, None, "root")}
+        for group_id in range(ROOT_GROUP_ID + 1, ROOT_GROUP_ID + 1 + subgroups):
+            parent: SyntheticGroup = self.groups[self.random.choice(list(self.groups))]
+            self.groups[group_id] = SyntheticGroup(group_id, parent.id, f"{parent.path}/group-{group_id}")
+        self.templates: list[LockTemplate] = [self._get_lock_template(lock_size) for _ in range(templates)]
+        self.projects: dict[int, SyntheticProject] = {}
+        for project_id in range(1, projects + 1):
+            self.projects[project_id] = SyntheticProject(
+                id=project_id,
+                name=f"project-{project_id}",
+                group=self.groups[self.random.choice(list(self.groups))],
+                template_id=self.random.randrange(templates),
+                python_version=f"3.{self.random.randint(8, 12)}.{self.random.randint(0, 9)}",
+                file_paths=self._get_file_paths(missing_ratio, empty_ratio),
+            )
+
+    def get_descendant_groups(self, group_id: int) -> list[SyntheticGroup]:
+        root_path: str = self.groups[group_id].path
+        return [group for group in self.groups.values() if group.path.startswith(f"{root_path}/")]
+
+    def get_projects(self, group_id: int, include_subgroups: bool) -> list[SyntheticProject]:
+        group_ids: set[int] = {group_id}
+        if include_subgroups:
+            group_ids.update(group.id for group in self.get_descendant_groups(group_id))
+        return [project for project in self.projects.values() if project.group.id in group_ids]
+
+    def get_file(self, project: SyntheticProject, file_path: str) -> tuple[bytes, bytes] | None:
+        """Content of a file as a shared prefix and a suffix of the project, None when the file is missing."""
+        if file_path not in project.file_paths:
+            return None
+        template: LockTemplate = self.templates[project.template_id]
+        match file_path:
+            case "poetry.lock":
+                return template.poetry_lock, f"# {project.name}\n".encode()
+            case "pyproject.toml":
+                return b"", self._get_pyproject_toml(project, template).encode()
+            case "Dockerfile":
+                return b"", f"FROM python:{project.python_version}-slim\nCOPY . /app\n".encode()
+        return b"", f"{file_path} of {project.name}\n".encode()
+
+    @staticmethod
+    def get_sha(project: SyntheticProject, file_path: str) -> str:
+        return hashlib.sha1(f"{project.id}:{project.template_id}:{file_path}".encode()).hexdigest()  # noqa: S324
+
+    def _get_file_paths(self, missing_ratio: float, empty_ratio: float) -> tuple[str, ...]:
+        if self.random.random() < empty_ratio:
+            return ()
+        return (
+            *(file_path for file_path in TRACKED_FILE_PATHS if self.random.random() >= missing_ratio),
+            *OTHER_FILE_PATHS,
+        )
+
+    def _get_lock_template(self, lock_size: int) -> LockTemplate:
+        template: LockTemplate = LockTemplate(poetry_lock=b"")
+        lines: list[str] = ["# This file is automatically @generated by Poetry and should not be changed by hand.", ""]
+        size: int = 0
+        package_ids: list[int] = self.random.sample(range(PACKAGE_POOL_SIZE), k=PACKAGE_POOL_SIZE)
+        for package_id in package_ids:
+            if size >= lock_size:
+                break
+            package_lines: list[str] = self._get_package_lines(package_id)
+            size += sum(len(line) + 1 for line in package_lines)
+            lines.extend(package_lines)
+            if self.random.random() < 0.2:
+                template.direct_dependencies.append(f"package-{package_id}")
+        lines += ["[metadata]", 'lock-version = "2.0"', 'python-versions = "^3.12"']
+        lines.append(f'content-hash = "{self.random.randbytes(32).hex()}"')
+        poetry_lock: bytes = "\n".join(lines).encode() + b"\n"
+        # Padding to whole base64 quanta lets the server encode the shared template once
+        template.poetry_lock = poetry_lock + b"\n" * (-len(poetry_lock) % 3)
+        return template
+
+    def _get_package_lines(self, package_id: int) -> list[str]:
+        name: str = f"package-{package_id}"
+        version: str = f"{self.random.randint(0, 9)}.{self.random.randint(0, 30)}.{self.random.randint(0, 20)}"
+        wheel: str = f"{name.replace('-', '_')}-{version}"
+        return [
+            "[[package]]",
+            f'name = "{name}"',
+            f'version = "{version}"',
+            f'description = "Synthetic package {package_id}"',
+            "optional = false",
+            'python-versions = ">=3.8"',
+            "files = [",
+            *(
+                f'    {{file = "{wheel}-cp3{minor}-cp3{minor}-manylinux_2_17_x86_64.whl", '
+                f'hash = "sha256:{self.random.randbytes(32).hex()}"}},'
+                for minor in range(8, 8 + self.random.randint(1, 40))
+            ),
+            "]",
+            "",
+            "[package.dependencies]",
+            f'package-{self.random.randrange(PACKAGE_POOL_SIZE)} = ">=1.0"',
+            "",
+        ]
+
+    @staticmethod
+    def _get_pyproject_toml(project: SyntheticProject, template: LockTemplate) -> str:
+        dependencies: str = "\n".join(f'{name} = "*"' for name in template.direct_dependencies)
+        return (
+            f'[tool.poetry]\nname = "{project.name}"\nversion = "0.1.0"\n\n'
+            f'[tool.poetry.dependencies]\npython = "^3.12"\n{dependencies}\n'
+        )
@@ -1,7 +1,8 @@
 """Config."""
 
-from typing import Final
+from typing import Final, Literal
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -14,6 +15,50 @@ class Settings(BaseSettings):
     gitlab_token: str
     gitlab_url: str = "https://gitlab.com/"
     gitlab_api_version: str = "4"
+    # Requests in flight adapt to GitLab rate limits between the min and max concurrency
+    gitlab_max_concurrency: int = 32
+    gitlab_min_concurrency: int = 1
+    # Retries of throttled (429) and failed (5xx) requests
+    gitlab_max_retries: int = 3
+    # Connections kept open to GitLab, 0 matches the max concurrency. HTTP/2 needs the h2 package (httpx[http2])
+    gitlab_max_connections: int = 0
+    gitlab_keepalive_expiry: float = 60.0
+    gitlab_http2: bool = False
+    # Lists projects of a group and its subgroups at once instead of listing every subgroup separately. Much fewer
+    # requests, but GitLab leaves out projects shared into the subgroups, which the separate listings include
+    gitlab_include_subgroups: bool = False
+    # Projects per GraphQL query for trees and files, 0 switches to one REST request per file
+    gitlab_graphql_batch_size: int = 20
+    # Secret token of GitLab push hooks, webhooks are rejected while it is empty
+    gitlab_webhook_token: str = ""
+    # Limits of the in-memory file cache, 0 disables a limit
+    file_cache_max_entries: int = 50_000
+    file_cache_max_bytes: int = 512 * 1024 * 1024
+    file_cache_ttl: int = 24 * 60 * 60
+    # The sqlite backend keeps the file cache on disk between restarts, the redis one shares it between processes
+    file_cache_backend: Literal["memory", "sqlite", "redis"] = "memory"
+    file_cache_sqlite_path: str = "cache/file_cache.sqlite3"
+    # A rediss:// DSN connects over TLS
+    file_cache_redis_dsn: str = "redis://localhost:6379/0"
+    file_cache_redis_max_connections: int = 10
+    # Seconds to wait for Redis before a cache operation counts as failed, 0 waits forever
+    file_cache_redis_timeout: float = 1.0
+    parsed_file_cache_max_entries: int = 100_000
+    # Group and project listings are fresh for the ttl, older ones are served until the stale ttl while refetched
+    listing_cache_ttl: int = 5 * 60
+    listing_cache_stale_ttl: int = 60 * 60
+    # Processes parsing lock files in parallel, 0 parses them in a thread of the service process
+    file_parser_max_workers: int = 0
+    # Requested groups are served from an index refreshed in the background until not requested for idle timeout
+    group_index_refresh_interval: float = 60
+    group_index_full_refresh_interval: float = 60 * 60
+    group_index_idle_timeout: float = 24 * 60 * 60
+
+    @model_validator(mode="after")
+    def set_gitlab_max_connections(self) -> "Settings":
+        if not self.gitlab_max_connections:
+            self.gitlab_max_connections = self.gitlab_max_concurrency
+        return self
 
     def __str__(self) -> str:
         values: list[str] = []
@@ -3,41 +3,86 @@
 from bakery import Bakery, Cake
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from gitlab import Gitlab
 
 from packagebusters.config import Settings
 from packagebusters.controllers.cache.controller import FileCache
+from packagebusters.controllers.cache.factory import create_file_cache
+from packagebusters.controllers.cache.listing_cache import ListingCache
+from packagebusters.controllers.cache.parsed_cache import ParsedFileCache
+from packagebusters.controllers.cache.redis_cache import RedisFileCache
+from packagebusters.controllers.fetch_scheduler.controller import FetchScheduler
 from packagebusters.controllers.file_getter.controller import FileGetter
+from packagebusters.controllers.file_parser.controller import FileParser
+from packagebusters.controllers.gitlab_client.controller import GitLabClient
+from packagebusters.controllers.group_index.controller import GroupIndex
+from packagebusters.controllers.loop_monitor.controller import LoopLagMonitor
 from packagebusters.controllers.package_getter.controller import PackageGetter
 from packagebusters.controllers.project_getter.controller import ProjectGetter
+from packagebusters.controllers.project_refresher.controller import ProjectRefresher
 from packagebusters.controllers.subgroup_getter.controller import SubGroupGetter
 from packagebusters.endpoints.healthchecks import HealthCheckEndpoint
 from packagebusters.endpoints.index import IndexEndpoint
+from packagebusters.endpoints.metrics.metrics import MetricsEndpoint
 from packagebusters.endpoints.package_getter.package_getter import PackageGetterEndpoint
+from packagebusters.endpoints.webhook.webhook import WebhookEndpoint
 
 
 class PackagebustersContainer(Bakery):
     """Main Packagebusters container."""
 
     config: Settings = Cake(Settings)
-    _file_cache: FileCache = FileCache()
-    _gitlab_client: Gitlab = Cake(
+    _file_cache: FileCache | RedisFileCache = Cake(Cake(create_file_cache, settings=config))  # type: ignore[assignment]
+    _parsed_file_cache: ParsedFileCache = Cake(ParsedFileCache, max_entries=config.parsed_file_cache_max_entries)
+    _listing_cache: ListingCache = Cake(
+        Cake(ListingCache, ttl=config.listing_cache_ttl, stale_ttl=config.listing_cache_stale_ttl),
+    )
+    _loop_lag_monitor: LoopLagMonitor = Cake(Cake(LoopLagMonitor))
+    _file_parser: FileParser = Cake(Cake(FileParser, max_workers=config.file_parser_max_workers))
+    _fetch_scheduler: FetchScheduler = Cake(
+        Cake(
+            FetchScheduler,
+            max_concurrency=config.gitlab_max_concurrency,
+            min_concurrency=config.gitlab_min_concurrency,
+        ),
+    )
+    _gitlab_client: GitLabClient = Cake(
         Cake(
-            Gitlab,
-            url=config.gitlab_url,
-            private_token=config.gitlab_token,
-            api_version=config.gitlab_api_version,
+            GitLabClient,
+            settings=config,
+            fetch_scheduler=_fetch_scheduler,
         ),
     )
-    _subgroup_getter: SubGroupGetter = Cake(SubGroupGetter, gitlab_client=_gitlab_client)
-    _project_getter: ProjectGetter = Cake(ProjectGetter, gitlab_client=_gitlab_client)
-    _file_getter: FileGetter = Cake(FileGetter, gitlab_client=_gitlab_client, file_cache=_file_cache)
+    _subgroup_getter: SubGroupGetter = Cake(SubGroupGetter, gitlab_client=_gitlab_client, listing_cache=_listing_cache)
+    _project_getter: ProjectGetter = Cake(ProjectGetter, gitlab_client=_gitlab_client, listing_cache=_listing_cache)
+    _file_getter: FileGetter = Cake(
+        FileGetter,
+        gitlab_client=_gitlab_client,
+        file_cache=_file_cache,
+        graphql_batch_size=config.gitlab_graphql_batch_size,
+    )
 
     _package_getter: PackageGetter = Cake(
         PackageGetter,
         subgroup_getter=_subgroup_getter,
         project_getter=_project_getter,
         file_getter=_file_getter,
+        fetch_scheduler=_fetch_scheduler,
+        parsed_file_cache=_parsed_file_cache,
+        file_parser=_file_parser,
+        is_include_subgroups=config.gitlab_include_subgroups,
+    )
+    _group_index: GroupIndex = Cake(
+        Cake(
+            GroupIndex,
+            package_getter=_package_getter,
+            settings=config,
+        ),
+    )
+    _project_refresher: ProjectRefresher = Cake(
+        ProjectRefresher,
+        file_getter=_file_getter,
+        group_index=_group_index,
+        fetch_scheduler=_fetch_scheduler,
     )
 
     templates: Jinja2Templates = Cake(Jinja2Templates, directory="templates")
@@ -45,15 +90,37 @@ class PackagebustersContainer(Bakery):
 
     _health_endpoint: HealthCheckEndpoint = Cake(HealthCheckEndpoint)
     _index_endpoint: IndexEndpoint = Cake(IndexEndpoint, templates=templates)
+    _metrics_endpoint: MetricsEndpoint = Cake(
+        MetricsEndpoint,
+        stats_providers={
+            "fetch_scheduler": _fetch_scheduler,
+            "gitlab_client": _gitlab_client,
+            "file_cache": _file_cache,
+            "parsed_file_cache": _parsed_file_cache,
+            "listing_cache": _listing_cache,
+            "file_parser": _file_parser,
+            "event_loop": _loop_lag_monitor,
+            "group_index": _group_index,
+            "project_refresher": _project_refresher,
+        },
+    )
     _package_getter_endpoint: PackageGetterEndpoint = Cake(
-        PackageGetterEndpoint,  # type: ignore[arg-type]
-        package_getter=_package_getter,  # type: ignore[arg-type]
+        PackageGetterEndpoint,
+        package_getter=_group_index,
+    )
+    _webhook_endpoint: WebhookEndpoint = Cake(
+        WebhookEndpoint,
+        project_refresher=_project_refresher,
+        listing_cache=_listing_cache,
+        token=config.gitlab_webhook_token,
     )
 
     endpoint_includes: list = Cake(
         [
             {"router": _health_endpoint.router, "prefix": "/check"},
+            {"router": _metrics_endpoint.router, "prefix": "/check"},
             {"router": _package_getter_endpoint.router, "prefix": "/api/v1"},
+            {"router": _webhook_endpoint.router, "prefix": "/api/v1"},
             {"router": _index_endpoint.router},
         ],
     )
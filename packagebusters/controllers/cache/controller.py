@@ -1,31 +1,114 @@
-from contextlib import suppress
-from datetime import UTC, datetime
-from typing import Any, TypedDict
+import dataclasses
+import sys
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+from types import TracebackType
+from typing import Any, Self, TypedDict
+
+from .types import FileCacheStats
 
 
 class CachedFile(TypedDict):
     content: Any
     created_at: datetime
+    size: int
 
 
 class FileCache:
-    def __init__(self) -> None:
-        self.file_cache: dict = {}
+    """In-memory LRU cache bounded by the number of entries and their approximate size, entries expire after ttl."""
+
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, ttl: int = 0) -> None:
+        # Zero disables the corresponding limit
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.ttl: timedelta | None = timedelta(seconds=ttl) if ttl else None
+        self.file_cache: OrderedDict[tuple[int, str], CachedFile] = OrderedDict()
+        self._bytes: int = 0
+        self._stats: FileCacheStats = FileCacheStats()
+
+    async def __aenter__(self) -> Self:
+        return self
 
-    def set(self, project_id: int, file_path: str, content: Any) -> None:
-        self.file_cache.setdefault(project_id, {})[file_path] = CachedFile(
-            content=content,
-            created_at=datetime.now(tz=UTC),
-        )
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        pass
 
-    def get(self, project_id: int, file_path: str) -> Any:
-        file: CachedFile = self.file_cache.get(project_id, {}).get(file_path)
-        return file["content"] if file is not None else None
+    async def set(self, project_id: int, file_path: str, content: Any) -> None:
+        self._put(project_id=project_id, file_path=file_path, content=content, created_at=datetime.now(tz=UTC))
 
-    def get_created_at(self, project_id: int, file_path: str) -> datetime | None:
-        file: CachedFile = self.file_cache.get(project_id, {}).get(file_path)
+    async def get(self, project_id: int, file_path: str) -> Any:
+        return (await self.get_many([(project_id, file_path)])).get((project_id, file_path))
+
+    async def get_many(self, keys: list[tuple[int, str]]) -> dict[tuple[int, str], Any]:
+        files: dict[tuple[int, str], Any] = {}
+        for project_id, file_path in keys:
+            file: CachedFile | None = self._get(project_id=project_id, file_path=file_path)
+            if file is None:
+                self._stats.misses += 1
+                continue
+            self._stats.hits += 1
+            files[project_id, file_path] = file["content"]
+        return files
+
+    async def get_created_at(self, project_id: int, file_path: str) -> datetime | None:
+        file: CachedFile | None = self._get(project_id=project_id, file_path=file_path)
         return file["created_at"] if file is not None else None
 
-    def delete(self, project_id: int, file_path: str) -> None:
-        with suppress(KeyError):
-            del self.file_cache[project_id][file_path]
+    async def delete(self, project_id: int, file_path: str) -> None:
+        self._delete(project_id=project_id, file_path=file_path)
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.file_cache),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        } | dataclasses.asdict(self._stats)
+
+    def _put(self, project_id: int, file_path: str, content: Any, created_at: datetime) -> None:
+        if (previous_file := self.file_cache.pop((project_id, file_path), None)) is not None:
+            self._bytes -= previous_file["size"]
+        file: CachedFile = CachedFile(content=content, created_at=created_at, size=self._get_size(content))
+        self.file_cache[project_id, file_path] = file
+        self._bytes += file["size"]
+        self._evict()
+
+    def _get(self, project_id: int, file_path: str) -> CachedFile | None:
+        file: CachedFile | None = self.file_cache.get((project_id, file_path))
+        if file is None:
+            return None
+        if self.ttl is not None and datetime.now(tz=UTC) - file["created_at"] >= self.ttl:
+            self._delete(project_id=project_id, file_path=file_path)
+            self._stats.expirations += 1
+            return None
+        self.file_cache.move_to_end((project_id, file_path))
+        return file
+
+    def _delete(self, project_id: int, file_path: str) -> None:
+        file: CachedFile | None = self.file_cache.pop((project_id, file_path), None)
+        if file is not None:
+            self._bytes -= file["size"]
+
+    def _evict(self) -> None:
+        # The least recently used entries are at the beginning, the last one was just set and is always kept
+        while len(self.file_cache) > 1 and (
+            (self.max_entries and len(self.file_cache) > self.max_entries)
+            or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, file = self.file_cache.popitem(last=False)
+            self._bytes -= file["size"]
+            self._stats.evictions += 1
+
+    @classmethod
+    def _get_size(cls, value: Any) -> int:
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return sys.getsizeof(value) + sum(cls._get_size(item) for item in vars(value).values())
+        if isinstance(value, dict):
+            return sys.getsizeof(value) + sum(cls._get_size(key) + cls._get_size(item) for key, item in value.items())
+        if isinstance(value, list | tuple | set | frozenset):
+            return sys.getsizeof(value) + sum(cls._get_size(item) for item in value)
+        return sys.getsizeof(value)
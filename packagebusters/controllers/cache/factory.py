@@ -0,0 +1,26 @@
+from .controller import FileCache
+from .interfaces import IFileCacheSettings
+from .redis_cache import RedisFileCache
+from .sqlite import SQLiteFileCache
+
+
+def create_file_cache(settings: IFileCacheSettings) -> FileCache | RedisFileCache:
+    if settings.file_cache_backend == "redis":
+        return RedisFileCache(
+            dsn=settings.file_cache_redis_dsn,
+            max_connections=settings.file_cache_redis_max_connections,
+            ttl=settings.file_cache_ttl,
+            timeout=settings.file_cache_redis_timeout,
+        )
+    if settings.file_cache_backend == "sqlite":
+        return SQLiteFileCache(
+            path=settings.file_cache_sqlite_path,
+            max_entries=settings.file_cache_max_entries,
+            max_bytes=settings.file_cache_max_bytes,
+            ttl=settings.file_cache_ttl,
+        )
+    return FileCache(
+        max_entries=settings.file_cache_max_entries,
+        max_bytes=settings.file_cache_max_bytes,
+        ttl=settings.file_cache_ttl,
+    )
@@ -0,0 +1,12 @@
+from typing import Literal, Protocol
+
+
+class IFileCacheSettings(Protocol):
+    file_cache_backend: Literal["memory", "sqlite", "redis"]
+    file_cache_sqlite_path: str
+    file_cache_redis_dsn: str
+    file_cache_redis_max_connections: int
+    file_cache_redis_timeout: float
+    file_cache_max_entries: int
+    file_cache_max_bytes: int
+    file_cache_ttl: int
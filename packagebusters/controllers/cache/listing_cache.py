@@ -0,0 +1,84 @@
+import asyncio
+import dataclasses
+import time
+from collections.abc import Callable, Coroutine, Hashable
+from types import TracebackType
+from typing import Any, Self
+
+from loguru import logger
+
+from packagebusters.single_flight import SingleFlight
+from .types import ListingCacheStats
+
+
+class ListingCache:
+    """Group and project listings of GitLab, fresh for ttl seconds.
+
+    Listings older than that are still served until stale_ttl, while they are fetched again in the background.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float) -> None:
+        self.ttl: float = ttl
+        self.stale_ttl: float = stale_ttl
+        self.listings: dict[Hashable, tuple[Any, float]] = {}
+        self._loads: SingleFlight[Hashable, Any] = SingleFlight()
+        self._revalidations: set[asyncio.Task] = set()
+        self._stats: ListingCacheStats = ListingCacheStats()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        for task in self._revalidations:
+            task.cancel()
+        await asyncio.gather(*self._revalidations, return_exceptions=True)
+
+    async def get(self, key: Hashable, load: Callable[[], Coroutine[Any, Any, Any]], is_cached: bool) -> Any:
+        if is_cached and (listing := self.listings.get(key)) is not None:
+            value, stored_at = listing
+            age: float = time.monotonic() - stored_at
+            if age < self.ttl:
+                self._stats.hits += 1
+                return value
+            if age < self.stale_ttl:
+                self._stats.stale_hits += 1
+                self._revalidate(key, load)
+                return value
+        self._stats.misses += 1
+        return await self._loads.run(key, self._load, key, load)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.listings[key] = value, time.monotonic()
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        if key is None:
+            self.listings.clear()
+        else:
+            self.listings.pop(key, None)
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.listings),
+            "revalidating": len(self._revalidations),
+        } | dataclasses.asdict(self._stats)
+
+    async def _load(self, key: Hashable, load: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        value: Any = await load()
+        self.set(key, value)
+        return value
+
+    def _revalidate(self, key: Hashable, load: Callable[[], Coroutine[Any, Any, Any]]) -> None:
+        task: asyncio.Task = asyncio.create_task(self._loads.run(key, self._load, key, load))
+        self._revalidations.add(task)
+        task.add_done_callback(self._on_revalidated)
+
+    def _on_revalidated(self, task: asyncio.Task) -> None:
+        self._revalidations.discard(task)
+        if not task.cancelled() and (exc := task.exception()) is not None:
+            self._stats.errors += 1
+            logger.opt(exception=exc).warning("Failed to revalidate a GitLab listing, the stale one is kept")
@@ -0,0 +1,44 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+class ParsedFileCache:
+    """LRU cache of values parsed from files, keyed by the content hash of the file.
+
+    Parsing runs in worker threads, so every access is guarded by a lock.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries: int = max_entries
+        self.parsed_files: OrderedDict[str, Any] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if (value := self.parsed_files.get(key)) is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self.parsed_files.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.parsed_files[key] = value
+            self.parsed_files.move_to_end(key)
+            while len(self.parsed_files) > self.max_entries:
+                self.parsed_files.popitem(last=False)
+                self._evictions += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self.parsed_files),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import UTC, datetime
+from types import TracebackType
+from typing import Any, Final, Self
+
+from loguru import logger
+
+from .redis_client import RedisClient, RedisError
+from .serialization import DECODE_ERRORS, dumps, loads
+
+
+KEY_PREFIX: Final[str] = "packagebusters:file"
+# Unavailable, slow and failing Redis alike turn into cache misses
+CACHE_ERRORS: Final[tuple[type[Exception], ...]] = (OSError, EOFError, RedisError)
+
+
+class RedisFileCache:
+    """File cache shared by every worker and replica, entries expire in Redis after ttl."""
+
+    def __init__(self, dsn: str, max_connections: int, ttl: int = 0, timeout: float = 0) -> None:
+        self.client: RedisClient = RedisClient(dsn=dsn, max_connections=max_connections)
+        self.ttl: int = ttl
+        self.timeout: float = timeout
+        self._hits: int = 0
+        self._misses: int = 0
+        self._errors: int = 0
+
+    async def __aenter__(self) -> Self:
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.client.__aexit__(exc_type, exc_value, traceback)
+
+    async def set(self, project_id: int, file_path: str, content: Any) -> None:
+        value: bytes = dumps(content, created_at=datetime.now(tz=UTC))
+        expiration: tuple[str | int, ...] = ("EX", self.ttl) if self.ttl else ()
+        try:
+            await self._execute("SET", self._get_key(project_id, file_path), value, *expiration)
+        except CACHE_ERRORS as exc:
+            # The cache is an optimization, GitLab stays the source of truth when Redis is unavailable
+            self._errors += 1
+            logger.warning(f"Cannot cache file {file_path} for project {project_id}: {exc!r}")
+
+    async def get(self, project_id: int, file_path: str) -> Any:
+        return (await self.get_many([(project_id, file_path)])).get((project_id, file_path))
+
+    async def get_many(self, keys: list[tuple[int, str]]) -> dict[tuple[int, str], Any]:
+        values: list[tuple[Any, datetime] | None] = await self._get_values(keys)
+        self._hits += sum(value is not None for value in values)
+        self._misses += sum(value is None for value in values)
+        return {key: value[0] for key, value in zip(keys, values, strict=True) if value is not None}
+
+    async def get_created_at(self, project_id: int, file_path: str) -> datetime | None:
+        value: tuple[Any, datetime] | None = (await self._get_values([(project_id, file_path)]))[0]
+        return value[1] if value is not None else None
+
+    async def delete(self, project_id: int, file_path: str) -> None:
+        try:
+            await self._execute("DEL", self._get_key(project_id, file_path))
+        except CACHE_ERRORS as exc:
+            self._errors += 1
+            logger.warning(f"Cannot delete cached file {file_path} for project {project_id}: {exc!r}")
+
+    def get_stats(self) -> dict[str, int]:
+        return {"hits": self._hits, "misses": self._misses, "errors": self._errors}
+
+    async def _get_values(self, keys: list[tuple[int, str]]) -> list[tuple[Any, datetime] | None]:
+        try:
+            values: list[bytes | None] = await self._execute(
+                "MGET",
+                *(self._get_key(project_id, file_path) for project_id, file_path in keys),
+            )
+        except CACHE_ERRORS as exc:
+            self._errors += 1
+            logger.warning(f"Cannot read cached files: {exc!r}")
+            return [None] * len(keys)
+        return [self._loads(value) if value is not None else None for value in values]
+
+    async def _execute(self, *args: bytes | str | int) -> Any:
+        # A hanging Redis would otherwise hold every scan, a timed out connection is closed by the client
+        async with asyncio.timeout(self.timeout or None):
+            return await self.client.execute(*args)
+
+    def _loads(self, value: bytes) -> tuple[Any, datetime] | None:
+        try:
+            return loads(value)
+        except DECODE_ERRORS as exc:
+            self._errors += 1
+            logger.warning(f"Cannot decode cached file: {exc!r}")
+            return None
+
+    @staticmethod
+    def _get_key(project_id: int, file_path: str) -> str:
+        return f"{KEY_PREFIX}:{project_id}:{file_path}"
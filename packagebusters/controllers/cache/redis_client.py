@@ -0,0 +1,115 @@
+import asyncio
+import ssl
+from types import TracebackType
+from typing import Any, Final, Self
+from urllib.parse import unquote, urlsplit
+
+
+DEFAULT_PORT: Final[int] = 6379
+# rediss is Redis over TLS, the scheme used by managed Redis services
+SCHEMES: Final[tuple[str, ...]] = ("redis", "rediss")
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+
+    async def execute(self, *args: bytes | str | int) -> Any:
+        self.writer.write(self._encode(args))
+        await self.writer.drain()
+        return await self._read()
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    @staticmethod
+    def _encode(args: tuple[bytes | str | int, ...]) -> bytes:
+        chunks: list[bytes] = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            value: bytes = arg if isinstance(arg, bytes) else str(arg).encode()
+            chunks.append(b"$%d\r\n%b\r\n" % (len(value), value))
+        return b"".join(chunks)
+
+    async def _read(self) -> Any:
+        line: bytes = await self.reader.readuntil(b"\r\n")
+        kind, value = line[:1], line[1:-2]
+        if kind == b"+":
+            return value.decode()
+        if kind == b"-":
+            raise RedisError(value.decode())
+        if kind == b":":
+            return int(value)
+        if kind == b"$":
+            if int(value) == -1:
+                return None
+            return (await self.reader.readexactly(int(value) + 2))[:-2]
+        if kind == b"*":
+            if int(value) == -1:
+                return None
+            return [await self._read() for _ in range(int(value))]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+
+class RedisClient:
+    """Minimal RESP client with a pool of connections, enough for a key-value cache."""
+
+    def __init__(self, dsn: str, max_connections: int) -> None:
+        url = urlsplit(dsn)
+        if url.scheme not in SCHEMES:
+            raise ValueError(f"Unsupported Redis DSN scheme {url.scheme!r}, expected one of {SCHEMES}")
+        self.ssl: ssl.SSLContext | None = ssl.create_default_context() if url.scheme == "rediss" else None
+        self.host: str = url.hostname or "localhost"
+        self.port: int = url.port or DEFAULT_PORT
+        self.username: str | None = unquote(url.username) if url.username else None
+        self.password: str | None = unquote(url.password) if url.password else None
+        self.db: int = int(url.path.lstrip("/") or 0)
+        self._connections: asyncio.LifoQueue[RedisConnection | None] = asyncio.LifoQueue()
+        for _ in range(max_connections):
+            self._connections.put_nowait(None)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        while not self._connections.empty():
+            if (connection := self._connections.get_nowait()) is not None:
+                await connection.close()
+
+    async def execute(self, *args: bytes | str | int) -> Any:
+        connection: RedisConnection | None = await self._connections.get()
+        try:
+            if connection is None:
+                connection = await self._connect()
+            result: Any = await connection.execute(*args)
+        except RedisError:
+            self._connections.put_nowait(connection)
+            raise
+        except BaseException:
+            # The reply may be left unread, so the connection cannot be reused
+            if connection is not None:
+                connection.writer.close()
+            self._connections.put_nowait(None)
+            raise
+        self._connections.put_nowait(connection)
+        return result
+
+    async def _connect(self) -> RedisConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        connection: RedisConnection = RedisConnection(reader=reader, writer=writer)
+        if self.password is not None:
+            credentials: tuple[str, ...] = (self.username, self.password) if self.username else (self.password,)
+            await connection.execute("AUTH", *credentials)
+        if self.db:
+            await connection.execute("SELECT", self.db)
+        return connection
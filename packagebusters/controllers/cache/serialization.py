@@ -0,0 +1,24 @@
+import dataclasses
+import json
+from datetime import UTC, datetime
+from typing import Any, Final
+
+from packagebusters.controllers.file_getter.controller import ProjectFile
+
+
+# Entries written by an older version or another service are skipped as cache misses
+DECODE_ERRORS: Final[tuple[type[Exception], ...]] = (ValueError, KeyError, TypeError)
+
+
+# Cached files are stored as JSON, nothing read back from a shared cache is unpickled
+def dumps(value: Any, created_at: datetime) -> bytes:
+    entry: dict[str, Any] = (
+        {"project_file": dataclasses.asdict(value)} if isinstance(value, ProjectFile) else {"value": value}
+    )
+    return json.dumps(entry | {"created_at": created_at.timestamp()}, separators=(",", ":")).encode()
+
+
+def loads(data: bytes) -> tuple[Any, datetime]:
+    entry: dict[str, Any] = json.loads(data)
+    value: Any = ProjectFile(**entry["project_file"]) if "project_file" in entry else entry["value"]
+    return value, datetime.fromtimestamp(entry["created_at"], tz=UTC)
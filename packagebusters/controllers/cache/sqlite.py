@@ -0,0 +1,185 @@
+import asyncio
+import sqlite3
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Final, ParamSpec, Self, TypeVar
+
+from loguru import logger
+
+from .controller import FileCache
+from .serialization import DECODE_ERRORS, dumps, loads
+
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Expired rows are deleted on startup and on writes at most this often
+PRUNE_INTERVAL: Final[timedelta] = timedelta(minutes=10)
+
+Row = tuple[int, str, Any, datetime]
+
+
+class SQLiteFileCache(FileCache):
+    """FileCache that writes every entry through to a SQLite file and is warmed from it on startup.
+
+    Entries evicted from memory stay on disk until they expire and are read back on a miss. The database is used from
+    one dedicated thread, the event loop does not wait for encoding and disk.
+    """
+
+    def __init__(self, path: str, max_entries: int = 0, max_bytes: int = 0, ttl: int = 0) -> None:
+        super().__init__(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self.path: Path = Path(path)
+        self.connection: sqlite3.Connection | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pruned_at: datetime | None = None
+        self._warmed: int = 0
+
+    async def __aenter__(self) -> Self:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-file-cache")
+        await self._run(self._open)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._executor is not None:
+            await self._run(self._close)
+            self._executor.shutdown()
+            self._executor = None
+
+    async def set(self, project_id: int, file_path: str, content: Any) -> None:
+        created_at: datetime = datetime.now(tz=UTC)
+        self._put(project_id=project_id, file_path=file_path, content=content, created_at=created_at)
+        if self.connection is not None:
+            await self._run(self._write, project_id, file_path, content, created_at)
+
+    async def get_many(self, keys: list[tuple[int, str]]) -> dict[tuple[int, str], Any]:
+        await self._load_missing(keys)
+        return await super().get_many(keys)
+
+    async def get_created_at(self, project_id: int, file_path: str) -> datetime | None:
+        await self._load_missing([(project_id, file_path)])
+        return await super().get_created_at(project_id=project_id, file_path=file_path)
+
+    async def delete(self, project_id: int, file_path: str) -> None:
+        await super().delete(project_id=project_id, file_path=file_path)
+        if self.connection is not None:
+            await self._run(self._delete_row, project_id, file_path)
+
+    def get_stats(self) -> dict[str, int]:
+        return super().get_stats() | {"warmed": self._warmed}
+
+    async def _run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def _load_missing(self, keys: list[tuple[int, str]]) -> None:
+        missing_keys: list[tuple[int, str]] = [key for key in keys if key not in self.file_cache]
+        if not missing_keys or self.connection is None:
+            return
+        for project_id, file_path, content, created_at in await self._run(self._read, missing_keys):
+            # A file set while it was read from disk is newer than the row
+            if (project_id, file_path) not in self.file_cache:
+                self._put(project_id=project_id, file_path=file_path, content=content, created_at=created_at)
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        # WAL keeps write-through commits cheap
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "project_id INTEGER NOT NULL, file_path TEXT NOT NULL, content BLOB NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (project_id, file_path))",
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS files_created_at ON files (created_at)")
+        self._prune()
+        self._warm()
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _warm(self) -> None:
+        if self.connection is None:
+            return
+        # Only the newest entries that fit into the cache limits are read, however large the database is
+        query: str = "SELECT project_id, file_path, content, created_at FROM files ORDER BY created_at DESC"
+        cursor: sqlite3.Cursor = self.connection.execute(
+            f"{query} LIMIT ?" if self.max_entries else query,
+            (self.max_entries,) if self.max_entries else (),
+        )
+        rows: list[Row] = []
+        size: int = 0
+        for row in cursor:
+            if (loaded_row := self._load_row(*row)) is None:
+                continue
+            size += self._get_size(loaded_row[2])
+            if self.max_bytes and size > self.max_bytes and rows:
+                break
+            rows.append(loaded_row)
+        # The newest entries are put last, so they are the most recently used ones
+        for project_id, file_path, content, created_at in reversed(rows):
+            self._put(project_id=project_id, file_path=file_path, content=content, created_at=created_at)
+        self._warmed = len(rows)
+        logger.info(f"File cache is warmed with {self._warmed} entries from {self.path}")
+
+    def _read(self, keys: list[tuple[int, str]]) -> list[Row]:
+        if self.connection is None:
+            return []
+        rows: list[Row] = []
+        for project_id, file_path in keys:
+            row: tuple[bytes, float] | None = self.connection.execute(
+                "SELECT content, created_at FROM files WHERE project_id = ? AND file_path = ? AND created_at > ?",
+                (project_id, file_path, self._get_expired_at()),
+            ).fetchone()
+            if row is not None and (loaded_row := self._load_row(project_id, file_path, *row)) is not None:
+                rows.append(loaded_row)
+        return rows
+
+    def _write(self, project_id: int, file_path: str, content: Any, created_at: datetime) -> None:
+        if self.connection is None:
+            return
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                (project_id, file_path, dumps(content, created_at=created_at), created_at.timestamp()),
+            )
+        if self._pruned_at is None or created_at - self._pruned_at >= PRUNE_INTERVAL:
+            self._prune()
+
+    def _delete_row(self, project_id: int, file_path: str) -> None:
+        if self.connection is None:
+            return
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM files WHERE project_id = ? AND file_path = ?",
+                (project_id, file_path),
+            )
+
+    def _prune(self) -> None:
+        self._pruned_at = datetime.now(tz=UTC)
+        if self.connection is None or self.ttl is None:
+            return
+        with self.connection:
+            self.connection.execute("DELETE FROM files WHERE created_at <= ?", (self._get_expired_at(),))
+
+    def _get_expired_at(self) -> float:
+        return (datetime.now(tz=UTC) - self.ttl).timestamp() if self.ttl is not None else 0
+
+    @staticmethod
+    def _load_row(project_id: int, file_path: str, content: bytes, created_at: float) -> Row | None:
+        try:
+            value, _ = loads(content)
+        except DECODE_ERRORS:
+            logger.warning(f"Skipping unreadable cached file {file_path} for project {project_id}")
+            return None
+        return project_id, file_path, value, datetime.fromtimestamp(created_at, tz=UTC)
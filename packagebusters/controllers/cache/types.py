@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class FileCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+@dataclass
+class ListingCacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    errors: int = 0
@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import Awaitable, Callable, Generator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Final, ParamSpec, Self, TypeVar
+
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+SESSION_ID: Final[ContextVar[int | None]] = ContextVar("fetch_scheduler_session_id", default=None)
+# Throttled responses of requests sent together halve the limit once
+DECREASE_INTERVAL: Final[float] = 1.0
+
+
+class FetchSchedulerClosedError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Fetch scheduler is closed")
+
+
+@dataclass
+class AdaptiveLimit:
+    """Concurrency limit that grows additively on success and decreases multiplicatively when throttled."""
+
+    max_concurrency: int
+    min_concurrency: int
+    value: float = field(init=False)
+    decreased_at: float = -DECREASE_INTERVAL
+    paused_until: float = 0
+    throttled: int = 0
+
+    def __post_init__(self) -> None:
+        self.value = self.max_concurrency
+
+    def increase(self) -> None:
+        self.value = min(self.value + 1 / self.value, self.max_concurrency)
+
+    def decrease(self, now: float, retry_after: float | None) -> None:
+        self.throttled += 1
+        if retry_after:
+            # Nothing is sent until GitLab accepts requests again
+            self.paused_until = max(self.paused_until, now + retry_after)
+        if now - self.decreased_at >= DECREASE_INTERVAL:
+            self.decreased_at = now
+            self.value = max(self.value / 2, self.min_concurrency)
+
+
+class FetchScheduler:
+    """Process-wide limit on in-flight GitLab requests, shared round-robin between sessions (incoming requests).
+
+    The limit adapts to GitLab: it grows by one per limit of successful requests and halves when GitLab throttles.
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1) -> None:
+        self.is_open: bool = False
+        self._limit: AdaptiveLimit = AdaptiveLimit(max_concurrency=max_concurrency, min_concurrency=min_concurrency)
+        self._resume_handle: asyncio.TimerHandle | None = None
+        self._active: int = 0
+        self._max_queued: int = 0
+        self._waiters: dict[int | None, deque[asyncio.Future[None]]] = {}
+        self._session_ids: itertools.count = itertools.count()
+
+    async def __aenter__(self) -> Self:
+        self.is_open = True
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.is_open = False
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+        for waiter in itertools.chain.from_iterable(self._waiters.values()):
+            if not waiter.done():
+                waiter.set_exception(FetchSchedulerClosedError())
+        self._waiters.clear()
+
+    @property
+    def limit(self) -> float:
+        return self._limit.value
+
+    @contextmanager
+    def session(self) -> Generator[None, None, None]:
+        token = SESSION_ID.set(next(self._session_ids))
+        try:
+            yield
+        finally:
+            SESSION_ID.reset(token)
+
+    async def run(self, func: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs) -> T:
+        await self._acquire()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self._release()
+
+    def on_success(self) -> None:
+        self._limit.increase()
+        self._wake()
+
+    def on_throttled(self, retry_after: float | None = None) -> None:
+        self._limit.decrease(now=asyncio.get_running_loop().time(), retry_after=retry_after)
+        if retry_after:
+            self._wake()
+
+    def get_stats(self) -> dict[str, int | float]:
+        return {
+            "max_concurrency": self._limit.max_concurrency,
+            "limit": round(self._limit.value, 2),
+            "throttled": self._limit.throttled,
+            "active": self._active,
+            "queued": self._get_queued(),
+            "max_queued": self._max_queued,
+            "queued_sessions": len(self._waiters),
+        }
+
+    async def _acquire(self) -> None:
+        if not self.is_open:
+            raise FetchSchedulerClosedError
+        while (pause := self._limit.paused_until - asyncio.get_running_loop().time()) > 0:
+            await asyncio.sleep(pause)
+        if self._active < int(self._limit.value) and not self._waiters:
+            self._active += 1
+            return
+
+        session_id: int | None = SESSION_ID.get()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(session_id, deque()).append(waiter)
+        self._max_queued = max(self._max_queued, self._get_queued())
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before the cancellation
+                self._release()
+            elif waiters := self._waiters.get(session_id):
+                with suppress(ValueError):
+                    waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[session_id]
+            raise
+
+    def _get_queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        if loop.time() < self._limit.paused_until:
+            # Queued requests wait for the pause too, they are woken once it is over
+            if self._resume_handle is not None:
+                self._resume_handle.cancel()
+            self._resume_handle = loop.call_at(self._limit.paused_until, self._wake)
+            return
+        while self._active < int(self._limit.value) and self._waiters:
+            session_id, waiters = next(iter(self._waiters.items()))
+            waiter: asyncio.Future[None] = waiters.popleft()
+            # Move the session to the end of the queue to serve sessions in turn
+            del self._waiters[session_id]
+            if waiters:
+                self._waiters[session_id] = waiters
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
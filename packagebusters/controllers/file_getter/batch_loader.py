@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Mapping
+from typing import Generic, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """Collects keys requested during one event loop iteration and loads them in chunks with one call each."""
+
+    def __init__(self, load_batch: Callable[[list[K]], Awaitable[Mapping[K, V]]], max_batch_size: int) -> None:
+        self.load_batch: Callable[[list[K]], Awaitable[Mapping[K, V]]] = load_batch
+        self.max_batch_size: int = max_batch_size
+        self._pending: dict[K, asyncio.Future[V | None]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        if (future := self._pending.get(key)) is None:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = self._pending[key] = loop.create_future()
+        # The future is shared by everyone who asked for the same key in this iteration
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        keys: list[K] = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            chunk: dict[K, asyncio.Future[V | None]] = {
+                key: pending[key] for key in keys[start : start + self.max_batch_size]
+            }
+            task: asyncio.Task = asyncio.create_task(self._load_chunk(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load_chunk(self, chunk: dict[K, asyncio.Future[V | None]]) -> None:
+        try:
+            values: Mapping[K, V] = await self.load_batch(list(chunk))
+        # Whatever the batch raised is handed to every caller waiting on it, they decide what to catch
+        except Exception as exc:  # noqa: BLE001  # pylint: disable=broad-exception-caught
+            for future in chunk.values():
+                future.set_exception(exc)
+            return
+        for key, future in chunk.items():
+            future.set_result(values.get(key))
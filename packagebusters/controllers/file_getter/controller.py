@@ -1,62 +1,180 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+from collections.abc import Mapping, Sequence
+from contextlib import suppress
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Final
 
-from gitlab import GitlabGetError
 from loguru import logger
 
-from .interfaces import IFileCache, IGitLabClient, IProject, IProjectFile
+from packagebusters.controllers.gitlab_client.exceptions import GitLabError, GitLabGraphQLError, GitLabNotFoundError
+from packagebusters.single_flight import SingleFlight
+from .batch_loader import BatchLoader
+from .interfaces import IFileCache, IGitLabClient, IProject, IProjectFile, ITreeEntry
+
+
+# Cache key of the repository root listing, stored next to the files of the project
+REPOSITORY_TREE_PATH: Final[str] = "/"
+CACHE_BATCH_SIZE: Final[int] = 500
+GRAPHQL_ERRORS: Final[tuple[type[Exception], ...]] = (GitLabError, GitLabGraphQLError)
 
 
 @dataclass
 class ProjectFile:
     content: Any
+    sha: str | None = None
 
 
 class FileGetter:
-    def __init__(self, gitlab_client: IGitLabClient, file_cache: IFileCache) -> None:
+    def __init__(self, gitlab_client: IGitLabClient, file_cache: IFileCache, graphql_batch_size: int = 0) -> None:
         self.gitlab_client: IGitLabClient = gitlab_client
         self.file_cache: IFileCache = file_cache
+        # Cache reads made together are served with one multi-get, a round trip each matters for a shared cache
+        self._cache_loader: BatchLoader[tuple[int, str], Any] = BatchLoader(
+            self.file_cache.get_many,
+            max_batch_size=CACHE_BATCH_SIZE,
+        )
+        # Concurrent cache misses of the same tree or file share one fetch
+        self._tree_flights: SingleFlight[int, dict[str, str]] = SingleFlight()
+        self._file_flights: SingleFlight[tuple[int, str], IProjectFile | None] = SingleFlight()
+        # Trees and files requested together are fetched with one GraphQL query per batch instead of REST calls
+        self._tree_loader: BatchLoader[int, Sequence[ITreeEntry] | None] | None = None
+        self._blob_loader: BatchLoader[tuple[int, str], IProjectFile] | None = None
+        if graphql_batch_size:
+            self._tree_loader = BatchLoader(self._load_trees, max_batch_size=graphql_batch_size)
+            self._blob_loader = BatchLoader(self._load_blobs, max_batch_size=graphql_batch_size)
 
-    def get_file(self, project_id: int, file_path: str, is_cached: bool) -> IProjectFile | None:
+    async def get_file_shas(self, project_id: int, is_cached: bool) -> dict[str, str]:
         if is_cached:
-            cached_file: IProjectFile = self.file_cache.get(project_id=project_id, file_path=file_path)
-            if cached_file is not None:
+            cached_tree: ProjectFile | None = await self._cache_loader.load((project_id, REPOSITORY_TREE_PATH))
+            if cached_tree is not None:
+                logger.debug(f"Received repository tree for project {project_id} from cache")
+                return cached_tree.content
+
+        return await self._tree_flights.run(project_id, self._fetch_and_cache_file_shas, project_id=project_id)
+
+    async def get_file(
+        self, project_id: int, file_path: str, is_cached: bool, sha: str | None = None
+    ) -> IProjectFile | None:
+        # A known blob sha revalidates the cached file even when the cache is bypassed
+        if is_cached or sha is not None:
+            cached_file: ProjectFile | None = await self._cache_loader.load((project_id, file_path))
+            if cached_file is not None and (sha is None or cached_file.sha == sha):
                 logger.debug(f"Received file {file_path} for project {project_id} from cache")
                 return cached_file
             logger.debug(f"File {file_path} for project {project_id} not found in cache")
 
-        logger.debug(f"Getting file {file_path} for project {project_id}")
+        return await self._file_flights.run(
+            (project_id, file_path),
+            self._fetch_and_cache_file,
+            project_id=project_id,
+            file_path=file_path,
+        )
+
+    async def batch_get_files(
+        self, projects: list[IProject], file_path: str, is_cached: bool
+    ) -> list[tuple[IProject, IProjectFile | None]]:
+        files: list[IProjectFile | None] = await asyncio.gather(
+            *(self._get_existing_file(project.id, file_path, is_cached) for project in projects),
+        )
+        return list(zip(projects, files, strict=True))
+
+    async def _get_existing_file(self, project_id: int, file_path: str, is_cached: bool) -> IProjectFile | None:
+        # One project GitLab fails to serve is skipped instead of failing the whole batch
         try:
-            file: IProjectFile = self.gitlab_client.projects.get(project_id).files.get(
-                file_path=file_path,
-                ref="master",
-            )
-            logger.debug(f"Received file {file_path} for project {project_id}")
-            self.file_cache.set(project_id=project_id, file_path=file_path, content=ProjectFile(content=file.content))
-        except GitlabGetError:
+            return await self._get_listed_file(project_id, file_path, is_cached)
+        except GitLabError as exc:
+            logger.warning(f"Skipping file {file_path} of project {project_id}: {exc}")
+            return None
+
+    async def _get_listed_file(self, project_id: int, file_path: str, is_cached: bool) -> IProjectFile | None:
+        # The repository tree only lists the root directory, nested files are requested as is
+        if "/" in file_path:
+            return await self.get_file(project_id, file_path, is_cached)
+        file_shas: dict[str, str] = await self.get_file_shas(project_id, is_cached)
+        if file_path not in file_shas:
+            logger.debug(f"File {file_path} is not in repository tree of project {project_id}")
+            return None
+        return await self.get_file(project_id, file_path, is_cached, sha=file_shas[file_path])
+
+    async def _fetch_and_cache_file_shas(self, project_id: int) -> dict[str, str]:
+        logger.debug(f"Getting repository tree for project {project_id}")
+        tree: Sequence[ITreeEntry] = await self._fetch_tree(project_id=project_id)
+        file_shas: dict[str, str] = {entry.path: entry.id for entry in tree if entry.type == "blob"}
+        await self.file_cache.set(
+            project_id=project_id,
+            file_path=REPOSITORY_TREE_PATH,
+            content=ProjectFile(content=file_shas),
+        )
+        return file_shas
+
+    async def _fetch_and_cache_file(self, project_id: int, file_path: str) -> IProjectFile | None:
+        logger.debug(f"Getting file {file_path} for project {project_id}")
+        # Only a missing file is remembered as empty, other GitLab errors propagate and leave the cache alone
+        file: IProjectFile | None = await self._fetch_file(project_id=project_id, file_path=file_path)
+        if file is None:
             logger.debug(f"File {file_path} not found in project {project_id}")
-            self.file_cache.set(project_id=project_id, file_path=file_path, content=ProjectFile(content=""))
+            await self.file_cache.set(project_id=project_id, file_path=file_path, content=ProjectFile(content=""))
             return None
 
+        logger.debug(f"Received file {file_path} for project {project_id}")
+        await self.file_cache.set(
+            project_id=project_id,
+            file_path=file_path,
+            content=ProjectFile(content=file.content, sha=file.sha),
+        )
         return file
 
-    def batch_get_files(
-        self, projects: list[IProject], file_path: str, is_cached: bool
-    ) -> list[tuple[IProject, IProjectFile | None]]:
-        projects_files: list[tuple[IProject, IProjectFile | None]] = []
-        with ThreadPoolExecutor() as executor:
-            file_futures = {
-                executor.submit(
-                    self.get_file,
-                    project.id,
-                    file_path,
-                    is_cached,
-                ): project
-                for project in projects
-            }
-            for future in as_completed(file_futures):
-                file: IProjectFile | None = future.result()
-                project: IProject = file_futures[future]
-                projects_files.append((project, file))
-        return projects_files
+    async def _fetch_tree(self, project_id: int) -> Sequence[ITreeEntry]:
+        # Projects of a failed GraphQL query are listed one by one with REST
+        if self._tree_loader is not None:
+            with suppress(*GRAPHQL_ERRORS):
+                if (tree := await self._tree_loader.load(project_id)) is not None:
+                    return tree
+        try:
+            return await self.gitlab_client.get_repository_tree(project_id=project_id, ref="master")
+        except GitLabNotFoundError:
+            logger.debug(f"Repository of project {project_id} is empty")
+            return []
+
+    async def _fetch_file(self, project_id: int, file_path: str) -> IProjectFile | None:
+        if self._blob_loader is not None:
+            with suppress(*GRAPHQL_ERRORS):
+                return await self._blob_loader.load((project_id, file_path))
+        try:
+            return await self.gitlab_client.get_file(project_id=project_id, file_path=file_path, ref="master")
+        except GitLabNotFoundError:
+            return None
+
+    async def _load_trees(self, project_ids: list[int]) -> Mapping[int, Sequence[ITreeEntry] | None]:
+        logger.debug(f"Getting repository trees for projects {project_ids}")
+        try:
+            return await self.gitlab_client.get_repository_trees(project_ids=project_ids, ref="master")
+        except GRAPHQL_ERRORS as exc:
+            logger.warning(f"Repository trees query failed, falling back to REST: {exc}")
+            raise
+
+    async def _load_blobs(self, keys: list[tuple[int, str]]) -> Mapping[tuple[int, str], IProjectFile]:
+        logger.debug(f"Getting files {keys}")
+        # A query reads every path of every project in it, so projects needing other files go to separate queries
+        project_file_paths: dict[int, list[str]] = {}
+        for project_id, file_path in keys:
+            project_file_paths.setdefault(project_id, []).append(file_path)
+        path_sets: dict[tuple[str, ...], list[int]] = {}
+        for project_id, file_paths in project_file_paths.items():
+            path_sets.setdefault(tuple(sorted(file_paths)), []).append(project_id)
+        try:
+            blobs_list: list[Mapping[int, Mapping[str, IProjectFile]]] = await asyncio.gather(
+                *(
+                    self.gitlab_client.get_blobs(project_ids=project_ids, file_paths=list(file_paths), ref="master")
+                    for file_paths, project_ids in path_sets.items()
+                ),
+            )
+        except GRAPHQL_ERRORS as exc:
+            logger.warning(f"Repository blobs query failed, falling back to REST: {exc}")
+            raise
+        return {
+            (project_id, file_path): file
+            for blobs in blobs_list
+            for project_id, project_blobs in blobs.items()
+            for file_path, file in project_blobs.items()
+        }
@@ -1,12 +1,30 @@
+from collections.abc import Mapping, Sequence
 from typing import Any, Protocol
 
 
+class IProjectFile(Protocol):
+    content: Any
+    sha: str | None
+
+
+class ITreeEntry(Protocol):
+    id: str
+    type: str
+    path: str
+
+
 class IGitLabClient(Protocol):
-    projects: Any
+    async def get_file(self, project_id: int, file_path: str, ref: str) -> IProjectFile: ...
 
+    async def get_repository_tree(self, project_id: int, ref: str) -> Sequence[ITreeEntry]: ...
 
-class IProjectFile(Protocol):
-    content: Any
+    async def get_repository_trees(
+        self, project_ids: list[int], ref: str
+    ) -> Mapping[int, Sequence[ITreeEntry] | None]: ...
+
+    async def get_blobs(
+        self, project_ids: list[int], file_paths: list[str], ref: str
+    ) -> Mapping[int, Mapping[str, IProjectFile]]: ...
 
 
 class IProject(Protocol):
@@ -16,6 +34,6 @@ class IProject(Protocol):
 
 
 class IFileCache(Protocol):
-    def get(self, project_id: int, file_path: str) -> Any: ...
+    async def get_many(self, keys: list[tuple[int, str]]) -> Mapping[tuple[int, str], Any]: ...
 
-    def set(self, project_id: int, file_path: str, content: Any) -> None: ...
+    async def set(self, project_id: int, file_path: str, content: Any) -> None: ...
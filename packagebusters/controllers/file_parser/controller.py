@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from types import TracebackType
+from typing import Any, Final, Self
+
+
+# Jobs are sent to the workers in a few chunks each, so small files do not pay for a round trip each
+CHUNKS_PER_WORKER: Final[int] = 4
+# Forking the service process would copy its running event loop and threads, workers start from a clean server instead
+MP_CONTEXT: Final[str] = "forkserver"
+
+ParseJob = tuple[Callable[[str], Any], str]
+
+
+def parse_chunk(jobs: list[ParseJob]) -> list[Any]:
+    return [parse(content) for parse, content in jobs]
+
+
+class FileParser:
+    """Runs file parsers in a pool of processes, or in a thread when there are no worker processes."""
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers: int = max_workers
+        self.executor: ProcessPoolExecutor | None = None
+        self._parsed: int = 0
+
+    async def __aenter__(self) -> Self:
+        if self.max_workers:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(MP_CONTEXT),
+            )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def parse_many(self, jobs: list[ParseJob]) -> list[Any]:
+        self._parsed += len(jobs)
+        if self.executor is None:
+            return await asyncio.to_thread(parse_chunk, jobs)
+
+        chunk_size: int = max(1, -(-len(jobs) // (self.max_workers * CHUNKS_PER_WORKER)))
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        results: list[list[Any]] = await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, parse_chunk, jobs[start : start + chunk_size])
+                for start in range(0, len(jobs), chunk_size)
+            ),
+        )
+        return list(chain.from_iterable(results))
+
+    def get_stats(self) -> dict[str, int]:
+        return {"max_workers": self.max_workers, "parsed": self._parsed}
@@ -0,0 +1,244 @@
+import asyncio
+import base64
+import dataclasses
+import random
+import time
+from collections.abc import AsyncGenerator
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from types import TracebackType
+from typing import Any, Final, Self
+from urllib.parse import quote
+
+import httpx
+from loguru import logger
+
+from .exceptions import GitLabError, GitLabGraphQLError, GitLabNotFoundError
+from .interfaces import IFetchScheduler, IGitLabSettings
+from .queries import REPOSITORY_BLOBS_QUERY, REPOSITORY_TREES_QUERY
+from .types import ConnectionStats, GitLabFile, GitLabGroup, GitLabProject, GitLabTreeEntry
+
+
+PER_PAGE: Final[int] = 100
+# Jittered exponential backoff of retried requests, when GitLab does not tell how long to wait
+RETRY_BASE_DELAY: Final[float] = 0.5
+RETRY_MAX_DELAY: Final[float] = 30.0
+# Share of the rate limit left when requests are slowed down before GitLab starts rejecting them
+RATE_LIMIT_RESERVE: Final[float] = 0.1
+# GraphQL batches read many blobs in one response, which takes longer than the httpx default of 5 seconds
+REQUEST_TIMEOUT: Final[float] = 30.0
+
+
+class GitLabClient:
+    def __init__(self, settings: IGitLabSettings, fetch_scheduler: IFetchScheduler) -> None:
+        self.settings: IGitLabSettings = settings
+        self.fetch_scheduler: IFetchScheduler = fetch_scheduler
+        url: str = settings.gitlab_url.rstrip("/")
+        self.graphql_url: str = f"{url}/api/graphql"
+        # Every connection stays open between requests, so a scan does not repeat TCP and TLS handshakes
+        self.client: httpx.AsyncClient = httpx.AsyncClient(
+            base_url=f"{url}/api/v{settings.gitlab_api_version}",
+            headers={"PRIVATE-TOKEN": settings.gitlab_token},
+            limits=httpx.Limits(
+                max_connections=settings.gitlab_max_connections,
+                max_keepalive_connections=settings.gitlab_max_connections,
+                keepalive_expiry=settings.gitlab_keepalive_expiry,
+            ),
+            http2=settings.gitlab_http2,
+            timeout=REQUEST_TIMEOUT,
+        )
+        self._stats: ConnectionStats = ConnectionStats()
+
+    async def __aenter__(self) -> Self:
+        await self.client.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.client.__aexit__(exc_type, exc_value, traceback)
+
+    def get_stats(self) -> dict[str, int | bool]:
+        return {
+            "max_connections": self.settings.gitlab_max_connections,
+            "http2": self.settings.gitlab_http2,
+        } | dataclasses.asdict(self._stats)
+
+    async def get_file(self, project_id: int, file_path: str, ref: str) -> GitLabFile:
+        response: httpx.Response = await self._get(
+            f"/projects/{project_id}/repository/files/{quote(file_path, safe='')}",
+            params={"ref": ref},
+        )
+        file: dict = response.json()
+        return GitLabFile(content=file["content"], sha=file.get("blob_id"))
+
+    async def get_repository_tree(self, project_id: int, ref: str) -> list[GitLabTreeEntry]:
+        return [
+            GitLabTreeEntry(id=entry["id"], name=entry["name"], type=entry["type"], path=entry["path"])
+            async for entry in self._paginate(f"/projects/{project_id}/repository/tree", params={"ref": ref})
+        ]
+
+    async def get_repository_trees(self, project_ids: list[int], ref: str) -> dict[int, list[GitLabTreeEntry] | None]:
+        data: dict = await self._graphql(
+            REPOSITORY_TREES_QUERY,
+            variables={"ids": self._get_project_gids(project_ids), "first": len(project_ids), "ref": ref},
+        )
+        trees: dict[int, list[GitLabTreeEntry] | None] = {}
+        for project in data["projects"]["nodes"]:
+            blobs: dict | None = ((project["repository"] or {}).get("tree") or {}).get("blobs")
+            # A root tree longer than one page is left for the paginated REST listing
+            if blobs is not None and blobs["pageInfo"]["hasNextPage"]:
+                trees[self._get_project_id(project["id"])] = None
+                continue
+            trees[self._get_project_id(project["id"])] = [
+                GitLabTreeEntry(id=blob["sha"], name=blob["name"], type=blob["type"], path=blob["path"])
+                for blob in (blobs or {}).get("nodes", [])
+            ]
+        return trees
+
+    async def get_blobs(
+        self, project_ids: list[int], file_paths: list[str], ref: str
+    ) -> dict[int, dict[str, GitLabFile]]:
+        data: dict = await self._graphql(
+            REPOSITORY_BLOBS_QUERY,
+            variables={
+                "ids": self._get_project_gids(project_ids),
+                "first": len(project_ids),
+                "ref": ref,
+                "paths": file_paths,
+            },
+        )
+        return {
+            self._get_project_id(project["id"]): {
+                # Keep the REST files API format, content is base64 encoded there
+                blob["path"]: GitLabFile(content=base64.b64encode(blob["rawBlob"].encode()).decode(), sha=blob["oid"])
+                for blob in ((project["repository"] or {}).get("blobs") or {}).get("nodes", [])
+            }
+            for project in data["projects"]["nodes"]
+        }
+
+    async def get_group_projects(self, group_id: int, include_subgroups: bool = False) -> list[GitLabProject]:
+        # The simple representation is enough and much lighter, subgroups are listed along when asked
+        params: dict[str, Any] = {"archived": False, "simple": True, "include_subgroups": include_subgroups}
+        return [
+            GitLabProject(
+                id=project["id"],
+                name=project["name"],
+                web_url=project["web_url"],
+                last_activity_at=project.get("last_activity_at"),
+            )
+            async for project in self._paginate(f"/groups/{group_id}/projects", params=params)
+        ]
+
+    async def get_descendant_groups(self, group_id: int) -> list[GitLabGroup]:
+        return [
+            GitLabGroup(id=group["id"], parent_id=group.get("parent_id"))
+            async for group in self._paginate(f"/groups/{group_id}/descendant_groups")
+        ]
+
+    async def _paginate(self, path: str, params: dict[str, Any] | None = None) -> AsyncGenerator[dict, None]:
+        url: str | None = path
+        params = {**(params or {}), "per_page": PER_PAGE}
+        while url is not None:
+            response: httpx.Response = await self._get(url, params=params)
+            for item in response.json():
+                yield item
+            # GitLab puts every query parameter into the next page link
+            url, params = response.links.get("next", {}).get("url"), None
+
+    async def _graphql(self, query: str, variables: dict[str, Any]) -> dict:
+        logger.debug(f"GitLab GraphQL request {variables}")
+        response: httpx.Response = await self._send(
+            "POST",
+            self.graphql_url,
+            json={"query": query, "variables": variables},
+        )
+        if response.is_error:
+            raise GitLabError(status_code=response.status_code, url=str(response.url))
+        payload: dict = response.json()
+        if errors := payload.get("errors"):
+            raise GitLabGraphQLError(errors=errors)
+        return payload["data"]
+
+    @staticmethod
+    def _get_project_gids(project_ids: list[int]) -> list[str]:
+        return [f"gid://gitlab/Project/{project_id}" for project_id in project_ids]
+
+    @staticmethod
+    def _get_project_id(project_gid: str) -> int:
+        return int(project_gid.rsplit("/", 1)[-1])
+
+    async def _get(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        logger.debug(f"GitLab request GET {url}")
+        response: httpx.Response = await self._send("GET", url, params=params)
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            raise GitLabNotFoundError(status_code=response.status_code, url=str(response.url))
+        if response.is_error:
+            raise GitLabError(status_code=response.status_code, url=str(response.url))
+        return response
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        attempt: int = 0
+        while True:
+            response: httpx.Response = await self.fetch_scheduler.run(
+                self.client.request,
+                method,
+                url,
+                extensions={"trace": self._trace},
+                **kwargs,
+            )
+            if (
+                response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+                and response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR
+            ):
+                self._report_rate_limit(response)
+                return response
+
+            retry_after: float | None = self._get_retry_after(response)
+            self.fetch_scheduler.on_throttled(retry_after=retry_after)
+            if attempt >= self.settings.gitlab_max_retries:
+                return response
+            logger.warning(f"GitLab responded {response.status_code} for {response.url}, retry {attempt + 1}")
+            # The scheduler holds every request for Retry-After, otherwise retries are spread randomly
+            if retry_after is None:
+                # The jitter needs no cryptographic randomness
+                delay: float = random.uniform(0, min(RETRY_BASE_DELAY * 2**attempt, RETRY_MAX_DELAY))  # nosec B311
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _trace(self, event_name: str, _info: dict[str, Any]) -> None:
+        # Connection events of httpcore tell how often the pool opens a connection instead of reusing one
+        match event_name:
+            case "connection.connect_tcp.complete":
+                self._stats.connections += 1
+            case "connection.start_tls.complete":
+                self._stats.tls_handshakes += 1
+            case "http11.send_request_headers.started" | "http2.send_request_headers.started":
+                self._stats.requests += 1
+
+    def _report_rate_limit(self, response: httpx.Response) -> None:
+        remaining: str | None = response.headers.get("RateLimit-Remaining")
+        limit: str | None = response.headers.get("RateLimit-Limit")
+        if remaining is None or limit is None or int(remaining) >= int(limit) * RATE_LIMIT_RESERVE:
+            self.fetch_scheduler.on_success()
+            return
+        retry_after: float | None = None
+        if int(remaining) == 0 and (reset := response.headers.get("RateLimit-Reset")):
+            retry_after = max(int(reset) - time.time(), 0)
+        self.fetch_scheduler.on_throttled(retry_after=retry_after)
+
+    @staticmethod
+    def _get_retry_after(response: httpx.Response) -> float | None:
+        if (retry_after := response.headers.get("Retry-After")) is None:
+            return None
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,15 @@
+class GitLabError(Exception):
+    def __init__(self, status_code: int, url: str) -> None:
+        super().__init__(f"GitLab responded {status_code} for {url}")
+        self.status_code: int = status_code
+        self.url: str = url
+
+
+class GitLabNotFoundError(GitLabError):
+    pass
+
+
+class GitLabGraphQLError(Exception):
+    def __init__(self, errors: list[dict]) -> None:
+        super().__init__(f"GitLab GraphQL errors: {'; '.join(error.get('message', '') for error in errors)}")
+        self.errors: list[dict] = errors
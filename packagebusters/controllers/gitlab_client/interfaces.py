@@ -0,0 +1,24 @@
+from collections.abc import Awaitable, Callable
+from typing import ParamSpec, Protocol, TypeVar
+
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class IFetchScheduler(Protocol):
+    async def run(self, func: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs) -> T: ...
+
+    def on_success(self) -> None: ...
+
+    def on_throttled(self, retry_after: float | None = None) -> None: ...
+
+
+class IGitLabSettings(Protocol):
+    gitlab_token: str
+    gitlab_url: str
+    gitlab_api_version: str
+    gitlab_max_retries: int
+    gitlab_max_connections: int
+    gitlab_keepalive_expiry: float
+    gitlab_http2: bool
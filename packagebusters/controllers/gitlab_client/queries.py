@@ -0,0 +1,35 @@
+from typing import Final
+
+
+REPOSITORY_TREES_QUERY: Final[str] = """
+query($ids: [ID!], $first: Int!, $ref: String!) {
+  projects(ids: $ids, first: $first) {
+    nodes {
+      id
+      repository {
+        tree(ref: $ref) {
+          blobs(first: 100) {
+            pageInfo { hasNextPage }
+            nodes { sha name path type }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+REPOSITORY_BLOBS_QUERY: Final[str] = """
+query($ids: [ID!], $first: Int!, $ref: String!, $paths: [String!]!) {
+  projects(ids: $ids, first: $first) {
+    nodes {
+      id
+      repository {
+        blobs(ref: $ref, paths: $paths) {
+          nodes { path oid rawBlob }
+        }
+      }
+    }
+  }
+}
+"""
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(unsafe_hash=True)
+class GitLabProject:
+    id: int
+    name: str
+    web_url: str
+    last_activity_at: str | None = None
+
+
+@dataclass
+class GitLabGroup:
+    id: int
+    parent_id: int | None = None
+
+
+@dataclass
+class GitLabFile:
+    content: Any
+    sha: str | None = None
+
+
+@dataclass
+class GitLabTreeEntry:
+    id: str
+    name: str
+    type: str
+    path: str
+
+
+@dataclass
+class ConnectionStats:
+    requests: int = 0
+    connections: int = 0
+    tls_handshakes: int = 0
@@ -0,0 +1,134 @@
+import asyncio
+import dataclasses
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Self
+
+from loguru import logger
+
+from packagebusters.controllers.package_getter.types import GroupPackage, GroupSnapshot, ScanOptions
+from packagebusters.single_flight import SingleFlight
+from .interfaces import IGroupIndexSettings, IPackageGetter
+from .types import GroupIndexStats
+
+
+GroupKey = tuple[int, bool]
+
+
+@dataclass
+class IndexedGroup:
+    snapshot: GroupSnapshot
+    requested_at: float
+    fully_refreshed_at: float
+
+
+class GroupIndex:
+    """Latest package snapshots of requested groups, refreshed in the background while they keep being requested.
+
+    A refresh reads only projects with new activity. GitLab updates the activity of a project lazily, so every
+    full_refresh_interval all projects are read again.
+    """
+
+    def __init__(self, package_getter: IPackageGetter, settings: IGroupIndexSettings) -> None:
+        self.package_getter: IPackageGetter = package_getter
+        self.settings: IGroupIndexSettings = settings
+        self._groups: dict[GroupKey, IndexedGroup] = {}
+        self._locks: defaultdict[GroupKey, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Requests for a group being built wait for that build instead of starting another one
+        self._builds: SingleFlight[tuple[GroupKey, bool], None] = SingleFlight()
+        self._refresh_task: asyncio.Task | None = None
+        self._stats: GroupIndexStats = GroupIndexStats()
+
+    async def __aenter__(self) -> Self:
+        self._refresh_task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._refresh_task
+            self._refresh_task = None
+
+    async def get_group_packages(
+        self, group_id: int, is_add_transitive_dependencies: bool, is_cached: bool
+    ) -> list[GroupPackage]:
+        key: GroupKey = (group_id, is_add_transitive_dependencies)
+        # A group is built on its first request, uncached requests rebuild it
+        if key not in self._groups or not is_cached:
+            await self._builds.run((key, is_cached), self._build, key=key, is_cached=is_cached)
+        group: IndexedGroup = self._groups[key]
+        group.requested_at = asyncio.get_running_loop().time()
+        return group.snapshot.group_packages
+
+    async def refresh_project(self, project_id: int) -> None:
+        for key, group in list(self._groups.items()):
+            if project_id in group.snapshot.projects:
+                async with self._locks[key]:
+                    await self._refresh(
+                        key=key, is_full=False, is_cached=True, stale_project_ids=frozenset({project_id})
+                    )
+
+    def get_stats(self) -> dict[str, int]:
+        return {"groups": len(self._groups), "shared_builds": self._builds.shared} | dataclasses.asdict(self._stats)
+
+    async def _build(self, key: GroupKey, is_cached: bool) -> None:
+        try:
+            async with self._locks[key]:
+                if key not in self._groups or not is_cached:
+                    await self._refresh(key=key, is_full=True, is_cached=is_cached)
+        finally:
+            # A group that failed to build is not indexed, its lock is dropped so bad ids do not pile up
+            if key not in self._groups:
+                self._locks.pop(key, None)
+
+    async def _run(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.settings.group_index_refresh_interval)
+            for key, group in list(self._groups.items()):
+                if loop.time() - group.requested_at > self.settings.group_index_idle_timeout:
+                    logger.debug(f"Dropping idle group {key[0]} from the index")
+                    del self._groups[key]
+                    self._locks.pop(key, None)
+                    continue
+                is_full: bool = (
+                    loop.time() - group.fully_refreshed_at >= self.settings.group_index_full_refresh_interval
+                )
+                try:
+                    async with self._locks[key]:
+                        await self._refresh(key=key, is_full=is_full, is_cached=False)
+                # Whatever fails one group must not stop the refresh loop for the others
+                except Exception:  # noqa: BLE001  # pylint: disable=broad-exception-caught
+                    self._stats.errors += 1
+                    logger.exception(f"Failed to refresh group {key[0]}, the previous snapshot is kept")
+
+    async def _refresh(
+        self, key: GroupKey, is_full: bool, is_cached: bool, stale_project_ids: frozenset[int] = frozenset()
+    ) -> None:
+        group_id, is_add_transitive_dependencies = key
+        group: IndexedGroup | None = self._groups.get(key)
+        logger.debug(f"Refreshing group {group_id}, full: {is_full or group is None}")
+        snapshot: GroupSnapshot = await self.package_getter.get_group_snapshot(
+            group_id=group_id,
+            options=ScanOptions(
+                is_add_transitive_dependencies=is_add_transitive_dependencies,
+                is_cached=is_cached,
+                previous=None if is_full or group is None else group.snapshot,
+                stale_project_ids=stale_project_ids,
+            ),
+        )
+        now: float = asyncio.get_running_loop().time()
+        self._groups[key] = IndexedGroup(
+            snapshot=snapshot,
+            requested_at=group.requested_at if group else now,
+            fully_refreshed_at=now if is_full or group is None else group.fully_refreshed_at,
+        )
+        self._stats.refreshes += 1
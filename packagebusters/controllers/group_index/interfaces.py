@@ -0,0 +1,13 @@
+from typing import Protocol
+
+from packagebusters.controllers.package_getter.types import GroupSnapshot, ScanOptions
+
+
+class IPackageGetter(Protocol):
+    async def get_group_snapshot(self, group_id: int, options: ScanOptions) -> GroupSnapshot: ...
+
+
+class IGroupIndexSettings(Protocol):
+    group_index_refresh_interval: float
+    group_index_full_refresh_interval: float
+    group_index_idle_timeout: float
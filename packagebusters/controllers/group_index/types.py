@@ -0,0 +1,7 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class GroupIndexStats:
+    refreshes: int = 0
+    errors: int = 0
@@ -0,0 +1,44 @@
+import asyncio
+from contextlib import suppress
+from types import TracebackType
+from typing import Final, Self
+
+
+CHECK_INTERVAL: Final[float] = 0.5
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a sleeping task, every request is delayed by as much."""
+
+    def __init__(self, interval: float = CHECK_INTERVAL) -> None:
+        self.interval: float = interval
+        self._lag: float = 0
+        self._max_lag: float = 0
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def get_stats(self) -> dict[str, float]:
+        return {"lag_ms": round(self._lag * 1000, 3), "max_lag_ms": round(self._max_lag * 1000, 3)}
+
+    async def _run(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            started_at: float = loop.time()
+            await asyncio.sleep(self.interval)
+            self._lag = max(loop.time() - started_at - self.interval, 0)
+            self._max_lag = max(self._max_lag, self._lag)
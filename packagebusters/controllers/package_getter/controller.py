@@ -1,148 +1,331 @@
+import asyncio
 import base64
 import re
 import tomllib
-from collections import defaultdict
-from collections.abc import Generator
+from collections.abc import Callable
 from contextlib import suppress
+from functools import lru_cache
 from itertools import chain
-from typing import Any, Final
+from typing import Any, Final, TypeVar
 
-from packaging.version import parse as parse_version
+from loguru import logger
+from packaging.version import InvalidVersion, Version
 
+from packagebusters.controllers.gitlab_client.exceptions import GitLabError
+from .index import PackageIndex
 from .interface import (
+    IFetchScheduler,
+    IFile,
     IFileGetter,
+    IFileParser,
+    IParsedFileCache,
     IProject,
     IProjectGetter,
     ISubGroupGetter,
 )
-from .types import GroupPackage
+from .poetry_lock import UnsupportedPoetryLockError, scan_poetry_lock_packages
+from .types import GroupPackage, GroupSnapshot, ParseJob, ProjectSnapshot, ScanOptions, SourceFile
 
 
+T = TypeVar("T")
+
 VERSION_UNKNOWN: Final[str] = "Version Unknown"
+POETRY_LOCK: Final[str] = "poetry.lock"
+VERSION_KEYS_CACHE_SIZE: Final[int] = 65_536
 
 
 class PackageGetter:
-    def __init__(
+    # Every collaborator is injected by the container on its own, grouping them would only hide the dependencies
+    def __init__(  # pylint: disable=too-many-arguments
         self,
         subgroup_getter: ISubGroupGetter,
         project_getter: IProjectGetter,
         file_getter: IFileGetter,
+        fetch_scheduler: IFetchScheduler,
+        parsed_file_cache: IParsedFileCache,
+        file_parser: IFileParser,
+        is_include_subgroups: bool = False,
     ) -> None:
         self.subgroup_getter: ISubGroupGetter = subgroup_getter
         self.project_getter: IProjectGetter = project_getter
         self.file_getter: IFileGetter = file_getter
+        self.fetch_scheduler: IFetchScheduler = fetch_scheduler
+        self.parsed_file_cache: IParsedFileCache = parsed_file_cache
+        self.file_parser: IFileParser = file_parser
+        self.is_include_subgroups: bool = is_include_subgroups
 
-    def get_group_packages(
+    async def get_group_packages(
         self, group_id: int, is_add_transitive_dependencies: bool, is_cached: bool
-    ) -> Generator[GroupPackage, Any, None]:
-        subgroup_ids: set[int] = self.subgroup_getter.get_subgroup_ids(group_id=group_id)
-        projects: list[IProject] = self.project_getter.batch_get_projects(group_ids={*subgroup_ids, group_id})
-        files = self._get_files(
-            projects=projects,
-            is_add_transitive_dependencies=is_add_transitive_dependencies,
-            is_cached=is_cached,
+    ) -> list[GroupPackage]:
+        group_snapshot: GroupSnapshot = await self.get_group_snapshot(
+            group_id=group_id,
+            options=ScanOptions(is_add_transitive_dependencies=is_add_transitive_dependencies, is_cached=is_cached),
         )
-        group_packages: defaultdict = self._add_project_to_packages(
-            files=files,
-            is_add_transitive_dependencies=is_add_transitive_dependencies,
+        return group_snapshot.group_packages
+
+    async def get_group_snapshot(self, group_id: int, options: ScanOptions) -> GroupSnapshot:
+        with self.fetch_scheduler.session():
+            projects: list[IProject] = await self._get_projects(group_id=group_id, is_cached=options.is_cached)
+            project_snapshots, files = await self._get_project_snapshots(projects=projects, options=options)
+            parsed_files: dict[str, Any] = await self._parse_files(
+                project_snapshots=project_snapshots,
+                files=files,
+                options=options,
+            )
+        # The whole result is built in a worker thread, the event loop keeps serving other requests meanwhile
+        group_packages: list[GroupPackage] = await asyncio.to_thread(
+            self._get_group_packages,
+            project_snapshots=project_snapshots,
+            parsed_files=parsed_files,
+            is_add_transitive_dependencies=options.is_add_transitive_dependencies,
         )
+        return GroupSnapshot(group_packages=group_packages, projects=project_snapshots)
 
-        return self._get_sorted_group_packages(group_packages)
+    async def _get_projects(self, group_id: int, is_cached: bool) -> list[IProject]:
+        if self.is_include_subgroups:
+            # One listing of the group with all of its subgroups instead of a listing per subgroup
+            return await self.project_getter.get_projects(
+                group_id=group_id,
+                include_subgroups=True,
+                is_cached=is_cached,
+            )
+        subgroup_ids: set[int] = await self.subgroup_getter.get_subgroup_ids(group_id=group_id, is_cached=is_cached)
+        return await self.project_getter.batch_get_projects(group_ids={*subgroup_ids, group_id}, is_cached=is_cached)
 
-    def _get_files(
-        self, projects: list[IProject], is_add_transitive_dependencies: bool, is_cached: bool
-    ) -> dict[IProject, dict[str, str | None]]:
-        poetry_lock_files = self.file_getter.batch_get_files(
-            projects=projects,
-            file_path="poetry.lock",
-            is_cached=is_cached,
+    async def _get_project_snapshots(
+        self, projects: list[IProject], options: ScanOptions
+    ) -> tuple[dict[int, ProjectSnapshot], dict[int, dict[str, SourceFile | None]]]:
+        # Projects without activity since the previous snapshot keep their file shas, only the others are read again
+        previous_projects: dict[int, ProjectSnapshot] = options.previous.projects if options.previous else {}
+        project_snapshots: dict[int, ProjectSnapshot] = {
+            project.id: ProjectSnapshot(project=project, file_shas=previous_project.file_shas)
+            for project in projects
+            if (previous_project := previous_projects.get(project.id))
+            and project.id not in options.stale_project_ids
+            and project.last_activity_at is not None
+            and project.last_activity_at == previous_project.project.last_activity_at
+        }
+        changed_projects: list[IProject] = [project for project in projects if project.id not in project_snapshots]
+        file_paths: tuple[str, ...] = (
+            ("Dockerfile",) if options.is_add_transitive_dependencies else ("Dockerfile", "pyproject.toml")
         )
-        projects_with_poetry: list[IProject] = [project for project, file in poetry_lock_files if file]
-        dockerfiles = self.file_getter.batch_get_files(
-            projects=projects_with_poetry,
-            file_path="Dockerfile",
-            is_cached=is_cached,
+        projects_files: list[dict[str, SourceFile | None] | BaseException | None] = await asyncio.gather(
+            *(
+                self._get_project_files(project=project, file_paths=file_paths, is_cached=options.is_cached)
+                for project in changed_projects
+            ),
+            return_exceptions=True,
         )
+        # Contents of the read files live until they are parsed, snapshots keep only their shas
+        files: dict[int, dict[str, SourceFile | None]] = {}
+        for project, project_files in zip(changed_projects, projects_files, strict=True):
+            if isinstance(project_files, BaseException):
+                self._skip_project(project_id=project.id, exc=project_files)
+                continue
+            file_shas: dict[str, str | None] | None = None
+            if project_files is not None:
+                files[project.id] = project_files
+                file_shas = {
+                    file_path: file["sha"] if file and file["content"] else None
+                    for file_path, file in project_files.items()
+                }
+            project_snapshots[project.id] = ProjectSnapshot(project=project, file_shas=file_shas)
+        return project_snapshots, files
 
-        files: dict[IProject, dict[str, Any]] = {
-            project: {"poetry.lock": file.content} for project, file in poetry_lock_files if file
+    async def _get_project_files(
+        self, project: IProject, file_paths: tuple[str, ...], is_cached: bool
+    ) -> dict[str, SourceFile | None] | None:
+        file_shas: dict[str, str] = await self.file_getter.get_file_shas(project_id=project.id, is_cached=is_cached)
+        if POETRY_LOCK not in file_shas:
+            return None
+
+        # The repository tree tells which files exist, so all of them are requested at once. Their blob shas let the
+        # file getter reuse cached contents that did not change
+        existing_file_paths: list[str] = [
+            file_path for file_path in (POETRY_LOCK, *file_paths) if file_path in file_shas
+        ]
+        files: list[IFile | None] = await asyncio.gather(
+            *(
+                self.file_getter.get_file(
+                    project_id=project.id,
+                    file_path=file_path,
+                    is_cached=is_cached,
+                    sha=file_shas[file_path],
+                )
+                for file_path in existing_file_paths
+            ),
+        )
+        project_files: dict[str, SourceFile | None] = dict.fromkeys(file_paths) | {
+            file_path: SourceFile(content=file.content, sha=file_shas[file_path]) if file else None
+            for file_path, file in zip(existing_file_paths, files, strict=True)
         }
+        poetry_lock: SourceFile | None = project_files[POETRY_LOCK]
+        return project_files if poetry_lock and poetry_lock["content"] else None
 
-        for project, file in dockerfiles:
-            files[project].update({"Dockerfile": file.content if file else None})
+    async def _parse_files(
+        self,
+        project_snapshots: dict[int, ProjectSnapshot],
+        files: dict[int, dict[str, SourceFile | None]],
+        options: ScanOptions,
+    ) -> dict[str, Any]:
+        # Files missing from the parsed file cache are parsed together, possibly in other processes
+        parsers: dict[str, Callable[[str], Any]] = {
+            POETRY_LOCK: self._get_poetry_lock_packages,
+            "Dockerfile": self._get_python_version,
+        }
+        if not options.is_add_transitive_dependencies:
+            parsers["pyproject.toml"] = self._get_pyproject_toml_packages
+        jobs: dict[str, ParseJob] = {
+            self._get_parsed_key(sha, parse): ParseJob(parse=parse, project_id=project_id, file_path=file_path, sha=sha)
+            for project_id, project_snapshot in project_snapshots.items()
+            if project_snapshot.file_shas is not None
+            for file_path, parse in parsers.items()
+            if (sha := project_snapshot.file_shas.get(file_path))
+        }
+        parsed_files: dict[str, Any] = {
+            key: parsed for key in jobs if (parsed := self.parsed_file_cache.get(key)) is not None
+        }
+        missing_keys: list[str] = [key for key in jobs if key not in parsed_files]
+        if not missing_keys:
+            return parsed_files
+        read_contents: dict[str, str] = await self._read_contents(
+            project_snapshots=project_snapshots,
+            files=files,
+            jobs={key: jobs[key] for key in missing_keys},
+            is_cached=options.is_cached,
+        )
+        parsed_contents: list[Any] = await self.file_parser.parse_many(
+            [(jobs[key].parse, content) for key, content in read_contents.items()],
+        )
+        for key, parsed in zip(read_contents, parsed_contents, strict=True):
+            self.parsed_file_cache.set(key, parsed)
+            parsed_files[key] = parsed
+        return parsed_files
 
-        if not is_add_transitive_dependencies:
-            pyproject_toml_files = self.file_getter.batch_get_files(
-                projects=projects_with_poetry,
-                file_path="pyproject.toml",
-                is_cached=is_cached,
-            )
-            for project, file in pyproject_toml_files:
-                files[project].update({"pyproject.toml": file.content if file else None})
+    async def _read_contents(
+        self,
+        project_snapshots: dict[int, ProjectSnapshot],
+        files: dict[int, dict[str, SourceFile | None]],
+        jobs: dict[str, ParseJob],
+        is_cached: bool,
+    ) -> dict[str, str]:
+        contents: list[str | BaseException] = await asyncio.gather(
+            *(self._get_content(files=files, job=job, is_cached=is_cached) for job in jobs.values()),
+            return_exceptions=True,
+        )
+        read_contents: dict[str, str] = {}
+        unread_shas: set[str] = set()
+        for (key, job), content in zip(jobs.items(), contents, strict=True):
+            if isinstance(content, BaseException):
+                self._skip_project(project_id=job.project_id, exc=content)
+                unread_shas.add(job.sha)
+                continue
+            read_contents[key] = content
+        # Every project sharing a file that could not be read is skipped, its parsed file is missing
+        for project_id, project_snapshot in list(project_snapshots.items()):
+            if project_snapshot.file_shas and not unread_shas.isdisjoint(project_snapshot.file_shas.values()):
+                del project_snapshots[project_id]
+        return read_contents
 
-        return files
+    async def _get_content(self, files: dict[int, dict[str, SourceFile | None]], job: ParseJob, is_cached: bool) -> str:
+        if file := files.get(job.project_id, {}).get(job.file_path):
+            return file["content"]
+        # A project kept from the previous snapshot lost its parsed file, the file getter reads it again by sha
+        project_file: IFile | None = await self.file_getter.get_file(
+            project_id=job.project_id,
+            file_path=job.file_path,
+            is_cached=is_cached,
+            sha=job.sha,
+        )
+        return project_file.content if project_file else ""
+
+    @staticmethod
+    def _skip_project(project_id: int, exc: BaseException) -> None:
+        # A project GitLab fails to serve is left out of the snapshot, so the next refresh reads it again
+        if not isinstance(exc, GitLabError):
+            raise exc
+        logger.warning(f"Skipping project {project_id}, its files could not be read: {exc}")
+
+    def _get_group_packages(
+        self,
+        project_snapshots: dict[int, ProjectSnapshot],
+        parsed_files: dict[str, Any],
+        is_add_transitive_dependencies: bool,
+    ) -> list[GroupPackage]:
+        package_index: PackageIndex = self._add_project_to_packages(
+            project_snapshots=project_snapshots,
+            parsed_files=parsed_files,
+            is_add_transitive_dependencies=is_add_transitive_dependencies,
+        )
+        return package_index.get_group_packages(version_key=self._get_version_key)
 
     def _add_project_to_packages(
         self,
-        files: dict[IProject, dict[str, str | None]],
+        project_snapshots: dict[int, ProjectSnapshot],
+        parsed_files: dict[str, Any],
         is_add_transitive_dependencies: bool,
-    ) -> defaultdict:
-        group_packages: defaultdict = defaultdict(lambda: defaultdict(list))
+    ) -> PackageIndex:
+        package_index: PackageIndex = PackageIndex()
 
-        for project, project_files in files.items():
-            poetry_lock_packages: dict = self._get_poetry_lock_packages(file=project_files["poetry.lock"])
+        # Projects are added in name order, so every list of projects comes out sorted
+        for project_snapshot in sorted(project_snapshots.values(), key=lambda snapshot: snapshot.project.name.lower()):
+            if (file_shas := project_snapshot.file_shas) is None:
+                continue
+            project: IProject = project_snapshot.project
+            project_id: int = package_index.add_project(project_name=project.name, project_url=project.web_url)
+            poetry_lock_packages: dict = self._get_parsed(
+                parsed_files,
+                file_shas[POETRY_LOCK],
+                self._get_poetry_lock_packages,
+            )
             dependencies: set = (
                 set(poetry_lock_packages.keys())
                 if is_add_transitive_dependencies
-                else self._get_pyproject_toml_packages(file=project_files["pyproject.toml"])
+                else self._get_parsed(parsed_files, file_shas["pyproject.toml"], self._get_pyproject_toml_packages)
             )
 
-            if dockerfile := project_files.get("Dockerfile"):
-                python_version: str = self._get_python_version(dockerfile)
-                self._add_dependence_to_group_packages(
-                    group_packages=group_packages,
-                    dependence_name="python",
-                    dependence_version=python_version,
-                    project_name=project.name,
-                    project_url=project.web_url,
-                )
+            if dockerfile_sha := file_shas.get("Dockerfile"):
+                python_version: str = self._get_parsed(parsed_files, dockerfile_sha, self._get_python_version)
+                package_index.add(package_name="python", version=python_version, project_id=project_id)
 
             for dependence_name in dependencies:
                 dependence_version: str = self._get_dependence_version(
                     dependence_name=dependence_name,
                     poetry_lock_packages=poetry_lock_packages,
                 )
-                self._add_dependence_to_group_packages(
-                    group_packages=group_packages,
-                    dependence_name=dependence_name,
-                    dependence_version=dependence_version,
-                    project_name=project.name,
-                    project_url=project.web_url,
-                )
+                package_index.add(package_name=dependence_name, version=dependence_version, project_id=project_id)
+
+        return package_index
 
-        return group_packages
+    def _get_parsed(self, parsed_files: dict[str, Any], sha: str | None, parse: Callable[[str], T]) -> T:
+        if sha is None:
+            return parse("")
+        return parsed_files[self._get_parsed_key(sha, parse)]
 
     @staticmethod
-    def _get_sorted_group_packages(group_packages: dict) -> Generator[GroupPackage, Any, None]:
-        return (
-            GroupPackage(
-                package_name=package_name,
-                package_version=version,
-                projects=sorted(projects, key=lambda x: x["project_name"].lower()),
-            )
-            for package_name, versions in sorted(group_packages.items())
-            for version, projects in sorted(
-                {
-                    version: sorted(projects, key=lambda x: x["project_name"].lower())
-                    for version, projects in versions.items()
-                }.items(),
-                key=lambda x: parse_version("0") if x[0] == VERSION_UNKNOWN else parse_version(x[0]),
-            )
-        )
+    def _get_parsed_key(sha: str, parse: Callable[[str], Any]) -> str:
+        # Equal blob shas mean equal contents, so warm scans skip decoding and parsing
+        return f"{parse.__name__}:{sha}"
+
+    @staticmethod
+    @lru_cache(maxsize=VERSION_KEYS_CACHE_SIZE)
+    def _get_version_key(version: str) -> tuple[int, Version | str]:
+        # Unknown versions go first and versions that are not PEP 440 go last, in alphabetical order
+        if version == VERSION_UNKNOWN:
+            return 0, ""
+        try:
+            return 1, Version(version)
+        except InvalidVersion:
+            return 2, version
 
     @staticmethod
     def _get_poetry_lock_packages(file: str | None) -> dict:
-        decoded_poetry_lock: dict = tomllib.loads(base64.b64decode(file).decode("utf-8")) if file else {}
+        if not file:
+            return {}
+        poetry_lock: bytes = base64.b64decode(file)
+        with suppress(UnsupportedPoetryLockError):
+            return scan_poetry_lock_packages(poetry_lock)
+        decoded_poetry_lock: dict = tomllib.loads(poetry_lock.decode("utf-8"))
         return {pkg["name"]: pkg["version"] for pkg in decoded_poetry_lock.get("package", [])}
 
     @staticmethod
@@ -168,21 +351,6 @@ class PackageGetter:
         python_version = re.search(r"(?<=python:)\d+.\d+.?\d*", decoded_dockerfile)
         return python_version.group() if python_version else VERSION_UNKNOWN
 
-    @staticmethod
-    def _add_dependence_to_group_packages(
-        group_packages: defaultdict,
-        dependence_name: str,
-        dependence_version: str,
-        project_name: str,
-        project_url: str,
-    ) -> None:
-        group_packages[dependence_name][dependence_version].append(
-            {
-                "project_name": project_name,
-                "project_url": project_url,
-            },
-        )
-
     @staticmethod
     def _get_dependence_version(dependence_name: str, poetry_lock_packages: dict) -> str:
         for dep_name in (
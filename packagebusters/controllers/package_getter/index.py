@@ -0,0 +1,78 @@
+from array import array
+from collections.abc import Callable
+from typing import Any
+
+from .types import GroupPackage, Project
+
+
+class StringTable:
+    """Gives every distinct string an integer id, so columns hold small ints instead of repeated strings."""
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def get_id(self, value: str) -> int:
+        if (value_id := self._ids.get(value)) is None:
+            value_id = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return value_id
+
+    def get_ranks(self, key: Callable[[str], Any] = str) -> list[int]:
+        ranks: list[int] = [0] * len(self.strings)
+        for rank, value_id in enumerate(sorted(range(len(self.strings)), key=lambda i: key(self.strings[i]))):
+            ranks[value_id] = rank
+        return ranks
+
+
+class PackageIndex:
+    """Packages of a group as integer columns, one row per package version used by a project.
+
+    Projects get ids in the order they are added, the rows of a package version are listed in that order.
+    """
+
+    def __init__(self) -> None:
+        self.package_names: StringTable = StringTable()
+        self.versions: StringTable = StringTable()
+        self.projects: list[Project] = []
+        self.package_ids: "array[int]" = array("I")
+        self.version_ids: "array[int]" = array("I")
+        self.project_ids: "array[int]" = array("I")
+
+    def add_project(self, project_name: str, project_url: str) -> int:
+        self.projects.append(Project(project_name=project_name, project_url=project_url))
+        return len(self.projects) - 1
+
+    def add(self, package_name: str, version: str, project_id: int) -> None:
+        self.package_ids.append(self.package_names.get_id(package_name))
+        self.version_ids.append(self.versions.get_id(version))
+        self.project_ids.append(project_id)
+
+    def get_group_packages(self, version_key: Callable[[str], Any]) -> list[GroupPackage]:
+        package_ranks: list[int] = self.package_names.get_ranks()
+        version_ranks: list[int] = self.versions.get_ranks(key=version_key)
+        # Rows are ordered by one integer made of the package name, version and project positions
+        versions_count, projects_count = len(version_ranks), len(self.projects)
+        row_keys: list[int] = [
+            (package_ranks[package_id] * versions_count + version_ranks[version_id]) * projects_count + project_id
+            for package_id, version_id, project_id in zip(
+                self.package_ids, self.version_ids, self.project_ids, strict=True
+            )
+        ]
+
+        group_packages: list[GroupPackage] = []
+        previous_row: tuple[int, int] | None = None
+        for row in sorted(range(len(row_keys)), key=row_keys.__getitem__):
+            package_id, version_id = self.package_ids[row], self.version_ids[row]
+            if (package_id, version_id) != previous_row:
+                previous_row = package_id, version_id
+                group_packages.append(
+                    GroupPackage(
+                        package_name=self.package_names.strings[package_id],
+                        package_version=self.versions.strings[version_id],
+                        projects=[],
+                    ),
+                )
+            # Every package lists the same Project of a project instead of a copy
+            group_packages[-1]["projects"].append(self.projects[self.project_ids[row]])
+        return group_packages
@@ -1,18 +1,23 @@
+from collections.abc import Callable
+from contextlib import AbstractContextManager
 from typing import Any, Protocol
 
 
 class ISubGroupGetter(Protocol):
-    def get_subgroup_ids(self, group_id: int) -> set: ...
+    async def get_subgroup_ids(self, group_id: int, is_cached: bool) -> set: ...
 
 
 class IProject(Protocol):
     id: int
     name: str
     web_url: str
+    last_activity_at: str | None
 
 
 class IProjectGetter(Protocol):
-    def batch_get_projects(self, group_ids: set[int]) -> list[IProject]: ...
+    async def get_projects(self, group_id: int, include_subgroups: bool, is_cached: bool) -> list[IProject]: ...
+
+    async def batch_get_projects(self, group_ids: set[int], is_cached: bool) -> list[IProject]: ...
 
 
 class IFile(Protocol):
@@ -20,6 +25,22 @@ class IFile(Protocol):
 
 
 class IFileGetter(Protocol):
-    def batch_get_files(
-        self, projects: list[IProject], file_path: str, is_cached: bool
-    ) -> list[tuple[IProject, IFile | None]]: ...
+    async def get_file_shas(self, project_id: int, is_cached: bool) -> dict[str, str]: ...
+
+    async def get_file(
+        self, project_id: int, file_path: str, is_cached: bool, sha: str | None = None
+    ) -> IFile | None: ...
+
+
+class IFetchScheduler(Protocol):
+    def session(self) -> AbstractContextManager[None]: ...
+
+
+class IParsedFileCache(Protocol):
+    def get(self, key: str) -> Any: ...
+
+    def set(self, key: str, value: Any) -> None: ...
+
+
+class IFileParser(Protocol):
+    async def parse_many(self, jobs: list[tuple[Callable[[str], Any], str]]) -> list[Any]: ...
@@ -0,0 +1,53 @@
+import re
+from typing import Final
+
+
+# Table headers, name and version keys and quoted keys at the beginning of a line, everything else is skipped.
+# Lines are matched from the preceding newline, a literal prefix is much faster to search for than "^"
+LINE_PATTERN: Final[re.Pattern[bytes]] = re.compile(
+    rb"""\n[ \t]*(?:(?P<header>\[[^\n]*?)|(?P<key>name|version)[ \t]*=(?P<value>[^\n]*?)|(?P<quoted_key>["'])[^\n]*?)"""
+    rb"""[ \t]*\r?(?=\n)""",
+)
+PACKAGE_HEADER_PATTERN: Final[re.Pattern[bytes]] = re.compile(rb"\[\[[ \t]*package[ \t]*\]\](?:[ \t]*#.*)?")
+STRING_VALUE_PATTERN: Final[re.Pattern[bytes]] = re.compile(
+    rb"""[ \t]*(?:"(?P<basic>[^"\\]*)"|'(?P<literal>[^']*)')(?:[ \t]*#.*)?""",
+)
+
+
+class UnsupportedPoetryLockError(Exception):
+    pass
+
+
+def scan_poetry_lock_packages(poetry_lock: bytes) -> dict[str, str]:
+    """Read name and version of every [[package]] table without building the whole TOML document.
+
+    Raises UnsupportedPoetryLockError on anything that needs a real TOML parser.
+    """
+    # A multiline string may contain lines that look like keys
+    if b'"""' in poetry_lock or b"'''" in poetry_lock:
+        raise UnsupportedPoetryLockError
+
+    packages: dict[str, str] = {}
+    package: dict[bytes, str] | None = None
+    for match in LINE_PATTERN.finditer(b"\n" + poetry_lock + b"\n"):
+        if (header := match["header"]) is not None:
+            _add_package(packages, package)
+            package = {} if PACKAGE_HEADER_PATTERN.fullmatch(header) else None
+        elif package is None:
+            continue
+        elif match["quoted_key"] is not None or match["key"] in package:
+            raise UnsupportedPoetryLockError
+        elif value := STRING_VALUE_PATTERN.fullmatch(match["value"]):
+            package[match["key"]] = (value["basic"] if value["basic"] is not None else value["literal"]).decode()
+        else:
+            raise UnsupportedPoetryLockError
+    _add_package(packages, package)
+    return packages
+
+
+def _add_package(packages: dict[str, str], package: dict[bytes, str] | None) -> None:
+    if package is None:
+        return
+    if b"name" not in package or b"version" not in package:
+        raise UnsupportedPoetryLockError
+    packages[package[b"name"]] = package[b"version"]
@@ -1,4 +1,8 @@
-from typing import TypedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypedDict
+
+from .interface import IProject
 
 
 class Project(TypedDict):
@@ -10,3 +14,41 @@ class GroupPackage(TypedDict):
     package_name: str
     package_version: str
     projects: list[Project]
+
+
+class SourceFile(TypedDict):
+    content: str
+    # Blob sha of the content, the key of its parsed form
+    sha: str
+
+
+@dataclass
+class ProjectSnapshot:
+    project: IProject
+    # Blob shas of files read at this activity of the project, None when it has no poetry.lock.
+    # Contents are not kept, files are parsed by sha and read again from the file getter when that is evicted
+    file_shas: dict[str, str | None] | None
+
+
+@dataclass
+class GroupSnapshot:
+    group_packages: list[GroupPackage]
+    projects: dict[int, ProjectSnapshot]
+
+
+@dataclass(frozen=True)
+class ScanOptions:
+    is_add_transitive_dependencies: bool
+    is_cached: bool
+    # Projects without activity since the previous snapshot keep their file shas
+    previous: GroupSnapshot | None = None
+    # Projects known to have changed before GitLab reports their activity
+    stale_project_ids: frozenset[int] = frozenset()
+
+
+@dataclass(frozen=True)
+class ParseJob:
+    parse: Callable[[str], Any]
+    project_id: int
+    file_path: str
+    sha: str
@@ -1,30 +1,40 @@
+import asyncio
 import itertools
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
 from loguru import logger
 
-from .interfaces import IGitLabClient, IGroupProject
+from packagebusters.exceptions import raise_bad_gitlab_group_id
+from .interfaces import IGitLabClient, IGroupProject, IListingCache
 
 
 class ProjectGetter:
-    def __init__(self, gitlab_client: IGitLabClient) -> None:
+    def __init__(self, gitlab_client: IGitLabClient, listing_cache: IListingCache) -> None:
         self.gitlab_client = gitlab_client
+        self.listing_cache = listing_cache
 
-    def get_projects(self, group_id: int) -> list[IGroupProject]:
-        logger.debug(f"Getting projects for group {group_id}")
-        projects: list[IGroupProject] = list(
-            self.gitlab_client.groups.get(group_id).projects.list(iterator=True, archived=False),
+    async def get_projects(
+        self, group_id: int, include_subgroups: bool = False, is_cached: bool = True
+    ) -> list[IGroupProject]:
+        # Listings of single groups are shared by scans of every group above them
+        projects: tuple[IGroupProject, ...] = await self.listing_cache.get(
+            ("projects", group_id, include_subgroups),
+            partial(self._fetch_projects, group_id=group_id, include_subgroups=include_subgroups),
+            is_cached=is_cached,
         )
+        return [*projects]
+
+    async def batch_get_projects(self, group_ids: set[int], is_cached: bool = True) -> list[IGroupProject]:
+        projects: list[list[IGroupProject]] = await asyncio.gather(
+            *(self.get_projects(group_id=group_id, is_cached=is_cached) for group_id in group_ids),
+        )
+        return list(itertools.chain.from_iterable(projects))
+
+    async def _fetch_projects(self, group_id: int, include_subgroups: bool) -> tuple[IGroupProject, ...]:
+        logger.debug(f"Getting projects for group {group_id}, include subgroups: {include_subgroups}")
+        with raise_bad_gitlab_group_id(group_id):
+            projects: tuple[IGroupProject, ...] = tuple(
+                await self.gitlab_client.get_group_projects(group_id=group_id, include_subgroups=include_subgroups),
+            )
         logger.debug(f"Received project ids {[project.id for project in projects]} for group {group_id}")
         return projects
-
-    def batch_get_projects(self, group_ids: set[int]) -> list[IGroupProject]:
-        with ThreadPoolExecutor() as executor:
-            project_futures = {
-                executor.submit(
-                    self.get_projects,
-                    group_id=group_id,
-                )
-                for group_id in group_ids
-            }
-        return list(itertools.chain.from_iterable(future.result() for future in as_completed(project_futures)))
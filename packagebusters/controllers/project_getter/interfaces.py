@@ -1,11 +1,17 @@
+from collections.abc import Callable, Coroutine, Hashable, Sequence
 from typing import Any, Protocol
 
 
-class IGitLabClient(Protocol):
-    groups: Any
-
-
 class IGroupProject(Protocol):
     id: int
     name: str
     web_url: str
+    last_activity_at: str | None
+
+
+class IGitLabClient(Protocol):
+    async def get_group_projects(self, group_id: int, include_subgroups: bool = False) -> Sequence[IGroupProject]: ...
+
+
+class IListingCache(Protocol):
+    async def get(self, key: Hashable, load: Callable[[], Coroutine[Any, Any, Any]], is_cached: bool) -> Any: ...
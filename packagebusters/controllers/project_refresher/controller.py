@@ -0,0 +1,45 @@
+import asyncio
+
+from loguru import logger
+
+from .interfaces import IFetchScheduler, IFileGetter, IGroupIndex
+
+
+class ProjectRefresher:
+    """Re-reads changed files of a pushed project into the file cache and the group index right away."""
+
+    def __init__(self, file_getter: IFileGetter, group_index: IGroupIndex, fetch_scheduler: IFetchScheduler) -> None:
+        self.file_getter: IFileGetter = file_getter
+        self.group_index: IGroupIndex = group_index
+        self.fetch_scheduler: IFetchScheduler = fetch_scheduler
+        self._refreshes: int = 0
+        self._errors: int = 0
+
+    async def refresh_project(self, project_id: int, file_paths: set[str]) -> None:
+        logger.debug(f"Refreshing files {sorted(file_paths)} of project {project_id}")
+        try:
+            with self.fetch_scheduler.session():
+                # The new tree gives the shas of changed files, unchanged ones stay in the cache
+                file_shas: dict[str, str] = await self.file_getter.get_file_shas(project_id=project_id, is_cached=False)
+                await asyncio.gather(
+                    *(
+                        self.file_getter.get_file(
+                            project_id=project_id,
+                            file_path=file_path,
+                            is_cached=False,
+                            sha=file_shas[file_path],
+                        )
+                        for file_path in sorted(file_paths)
+                        if file_path in file_shas
+                    ),
+                )
+            await self.group_index.refresh_project(project_id=project_id)
+        # Runs as a webhook background task, so nothing above it would log an error, parsing errors included
+        except Exception:  # noqa: BLE001  # pylint: disable=broad-exception-caught
+            self._errors += 1
+            logger.exception(f"Failed to refresh project {project_id}")
+            return
+        self._refreshes += 1
+
+    def get_stats(self) -> dict[str, int]:
+        return {"refreshes": self._refreshes, "errors": self._errors}
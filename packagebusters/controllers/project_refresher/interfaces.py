@@ -0,0 +1,16 @@
+from contextlib import AbstractContextManager
+from typing import Any, Protocol
+
+
+class IFileGetter(Protocol):
+    async def get_file_shas(self, project_id: int, is_cached: bool) -> dict[str, str]: ...
+
+    async def get_file(self, project_id: int, file_path: str, is_cached: bool, sha: str | None = None) -> Any: ...
+
+
+class IGroupIndex(Protocol):
+    async def refresh_project(self, project_id: int) -> None: ...
+
+
+class IFetchScheduler(Protocol):
+    def session(self) -> AbstractContextManager[None]: ...
@@ -1,23 +1,45 @@
-from gitlab import GitlabGetError
+from collections import defaultdict
+from collections.abc import Sequence
+from functools import partial
+
 from loguru import logger
 
-from packagebusters.exceptions import BadGitlabGroupIdError
-from .interfaces import IGitLabClient, IGroupDescendantGroup
+from packagebusters.exceptions import raise_bad_gitlab_group_id
+from .interfaces import IGitLabClient, IGroupDescendantGroup, IListingCache
 
 
 class SubGroupGetter:
-    def __init__(self, gitlab_client: IGitLabClient) -> None:
+    def __init__(self, gitlab_client: IGitLabClient, listing_cache: IListingCache) -> None:
         self.gitlab_client = gitlab_client
+        self.listing_cache = listing_cache
+
+    async def get_subgroup_ids(self, group_id: int, is_cached: bool = True) -> set[int]:
+        subgroup_ids: frozenset[int] = await self.listing_cache.get(
+            ("subgroups", group_id),
+            partial(self._fetch_subgroup_ids, group_id=group_id),
+            is_cached=is_cached,
+        )
+        return set(subgroup_ids)
 
-    def get_subgroup_ids(self, group_id: int) -> set[int]:
+    async def _fetch_subgroup_ids(self, group_id: int) -> frozenset[int]:
         logger.debug(f"Getting subgroups for group {group_id}")
-        try:
-            groups: list[IGroupDescendantGroup] = self.gitlab_client.groups.get(
-                group_id,
-                archived=False,
-            ).descendant_groups.list(iterator=True)
-        except GitlabGetError as exc:
-            raise BadGitlabGroupIdError(group_id=group_id) from exc
-        subgroup_ids: set = {group.id for group in groups}
-        logger.debug(f"Received subgroups ids {subgroup_ids} for group {group_id}")
+        with raise_bad_gitlab_group_id(group_id):
+            groups: Sequence[IGroupDescendantGroup] = await self.gitlab_client.get_descendant_groups(group_id=group_id)
+        subgroup_ids: frozenset[int] = frozenset(group.id for group in groups)
+        logger.debug(f"Received subgroups ids {set(subgroup_ids)} for group {group_id}")
+        self._set_descendant_subgroup_ids(groups)
         return subgroup_ids
+
+    def _set_descendant_subgroup_ids(self, groups: Sequence[IGroupDescendantGroup]) -> None:
+        # The listing holds the whole tree under the group, so subgroups of every descendant are known as well
+        children: defaultdict[int | None, list[int]] = defaultdict(list)
+        for group in groups:
+            children[group.parent_id].append(group.id)
+        for group in groups:
+            descendant_ids: set[int] = set()
+            pending: list[int] = [group.id]
+            while pending:
+                child_ids: list[int] = children[pending.pop()]
+                descendant_ids.update(child_ids)
+                pending.extend(child_ids)
+            self.listing_cache.set(("subgroups", group.id), frozenset(descendant_ids))
@@ -1,9 +1,17 @@
+from collections.abc import Callable, Coroutine, Hashable, Sequence
 from typing import Any, Protocol
 
 
+class IGroupDescendantGroup(Protocol):
+    id: int
+    parent_id: int | None
+
+
 class IGitLabClient(Protocol):
-    groups: Any
+    async def get_descendant_groups(self, group_id: int) -> Sequence[IGroupDescendantGroup]: ...
 
 
-class IGroupDescendantGroup(Protocol):
-    id: int
+class IListingCache(Protocol):
+    async def get(self, key: Hashable, load: Callable[[], Coroutine[Any, Any, Any]], is_cached: bool) -> Any: ...
+
+    def set(self, key: Hashable, value: Any) -> None: ...
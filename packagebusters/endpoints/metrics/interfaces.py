@@ -0,0 +1,5 @@
+from typing import Any, Protocol
+
+
+class IStatsProvider(Protocol):
+    def get_stats(self) -> dict[str, Any]: ...
@@ -0,0 +1,21 @@
+from typing import Any, Final
+
+from fastapi import APIRouter
+
+from .interfaces import IStatsProvider
+
+
+class MetricsEndpoint:
+    def __init__(self, stats_providers: dict[str, IStatsProvider]) -> None:
+        self.router: Final[APIRouter] = APIRouter()
+        self.router.add_api_route(
+            "/metrics",
+            self.__call__,
+            methods=["GET"],
+            include_in_schema=False,
+            status_code=200,
+        )
+        self.stats_providers = stats_providers
+
+    async def __call__(self) -> dict[str, dict[str, Any]]:
+        return {name: stats_provider.get_stats() for name, stats_provider in self.stats_providers.items()}
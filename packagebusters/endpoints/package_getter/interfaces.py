@@ -13,7 +13,7 @@ class IGroupPackage(TypedDict):
 
 
 class IPackageGetter(Protocol):
-    def get_group_packages(
+    async def get_group_packages(
         self,
         group_id: int,
         is_add_transitive_dependencies: bool,
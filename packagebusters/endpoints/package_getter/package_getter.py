@@ -1,11 +1,20 @@
-from asyncio import to_thread
+import asyncio
+from collections.abc import AsyncGenerator
 from typing import Final
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
+from fastapi.responses import StreamingResponse
 from loguru import logger
+from pydantic import TypeAdapter
 
 from .interfaces import IGroupPackage, IPackageGetter
-from .types import GroupPackage, Project
+from .types import GroupPackage
+
+
+GROUP_PACKAGES_ADAPTER: Final[TypeAdapter[list[GroupPackage]]] = TypeAdapter(list[GroupPackage])
+GROUP_PACKAGE_ADAPTER: Final[TypeAdapter[GroupPackage]] = TypeAdapter(GroupPackage)
+# Packages serialized per worker thread call of a streamed response
+STREAM_CHUNK_SIZE: Final[int] = 500
 
 
 class PackageGetterEndpoint:
@@ -16,6 +25,7 @@ class PackageGetterEndpoint:
             self.__call__,
             methods=["GET"],
             status_code=200,
+            response_model=list[GroupPackage],
         )
         self.package_getter = package_getter
 
@@ -24,26 +34,33 @@ class PackageGetterEndpoint:
         group_id: int,
         with_transitive_dependencies: bool = Query(default=False),
         is_cached: bool = Query(default=True),
-    ) -> list[GroupPackage]:
+        stream: bool = Query(default=False),
+    ) -> Response:
         logger.debug(f"Get packages for group {group_id}")
-        group_packages: list[IGroupPackage] = await to_thread(
-            self.package_getter.get_group_packages,
+        group_packages: list[IGroupPackage] = await self.package_getter.get_group_packages(
             group_id=group_id,
             is_add_transitive_dependencies=with_transitive_dependencies,
             is_cached=is_cached,
         )
+        if stream:
+            # One package per line, sent chunk by chunk while the rest is being serialized
+            return StreamingResponse(self._get_lines(group_packages), media_type="application/x-ndjson")
+        # Thousands of packages take a while to validate and serialize, it is done away from the event loop
+        content: bytes = await asyncio.to_thread(self._get_content, group_packages)
+        return Response(content=content, media_type="application/json")
+
+    @staticmethod
+    def _get_content(group_packages: list[IGroupPackage]) -> bytes:
+        return GROUP_PACKAGES_ADAPTER.dump_json(GROUP_PACKAGES_ADAPTER.validate_python(group_packages))
 
-        return [
-            GroupPackage(
-                package_name=package["package_name"],
-                package_version=package["package_version"],
-                projects=[
-                    Project(
-                        project_name=project["project_name"],
-                        project_url=project["project_url"],
-                    )
-                    for project in package["projects"]
-                ],
-            )
-            for package in group_packages
-        ]
+    @classmethod
+    async def _get_lines(cls, group_packages: list[IGroupPackage]) -> AsyncGenerator[bytes, None]:
+        for start in range(0, len(group_packages), STREAM_CHUNK_SIZE):
+            yield await asyncio.to_thread(cls._get_chunk_lines, group_packages[start : start + STREAM_CHUNK_SIZE])
+
+    @staticmethod
+    def _get_chunk_lines(group_packages: list[IGroupPackage]) -> bytes:
+        return b"".join(
+            GROUP_PACKAGE_ADAPTER.dump_json(GROUP_PACKAGE_ADAPTER.validate_python(group_package)) + b"\n"
+            for group_package in group_packages
+        )
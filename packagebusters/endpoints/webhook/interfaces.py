@@ -0,0 +1,9 @@
+from typing import Protocol
+
+
+class IProjectRefresher(Protocol):
+    async def refresh_project(self, project_id: int, file_paths: set[str]) -> None: ...
+
+
+class IListingCache(Protocol):
+    def invalidate(self) -> None: ...
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class PushCommit(BaseModel):
+    added: list[str] = []
+    modified: list[str] = []
+    removed: list[str] = []
+
+
+class PushEvent(BaseModel):
+    ref: str
+    project_id: int
+    commits: list[PushCommit] = []
+    total_commits_count: int = 0
+
+
+class WebhookResult(BaseModel):
+    is_refreshed: bool
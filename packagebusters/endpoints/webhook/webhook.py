@@ -0,0 +1,95 @@
+import secrets
+from typing import Annotated, Any, Final
+
+from fastapi import APIRouter, BackgroundTasks, Body, Header, HTTPException, status
+from loguru import logger
+from pydantic import ValidationError
+
+from .interfaces import IListingCache, IProjectRefresher
+from .types import PushEvent, WebhookResult
+
+
+# Files are read from master, pushes to other branches do not change them
+TRACKED_REF: Final[str] = "refs/heads/master"
+TRACKED_FILE_PATHS: Final[frozenset[str]] = frozenset({"poetry.lock", "pyproject.toml", "Dockerfile"})
+# System hook events that change group or project listings
+LISTING_EVENTS: Final[frozenset[str]] = frozenset(
+    {
+        "project_create",
+        "project_destroy",
+        "project_rename",
+        "project_transfer",
+        "project_update",
+        "group_create",
+        "group_destroy",
+        "group_rename",
+        "subgroup_create",
+        "subgroup_destroy",
+    },
+)
+
+
+class WebhookEndpoint:
+    def __init__(self, project_refresher: IProjectRefresher, listing_cache: IListingCache, token: str) -> None:
+        self.router: Final[APIRouter] = APIRouter()
+        self.router.add_api_route(
+            "/webhooks/gitlab",
+            self.__call__,
+            methods=["POST"],
+            status_code=status.HTTP_202_ACCEPTED,
+            response_model=WebhookResult,
+        )
+        self.project_refresher = project_refresher
+        self.listing_cache = listing_cache
+        self.token = token
+
+    async def __call__(
+        self,
+        background_tasks: BackgroundTasks,
+        event: Annotated[dict[str, Any], Body()],
+        x_gitlab_token: str = Header(default=""),
+    ) -> WebhookResult:
+        if not self.token or not secrets.compare_digest(x_gitlab_token, self.token):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid GitLab token")
+
+        if event.get("event_name") in LISTING_EVENTS:
+            logger.debug(f"Invalidating GitLab listings after {event['event_name']}")
+            self.listing_cache.invalidate()
+            return WebhookResult(is_refreshed=True)
+        # Project hooks name the event in object_kind, system hooks in event_name
+        if (event.get("object_kind") or event.get("event_name")) != "push":
+            return WebhookResult(is_refreshed=False)
+        try:
+            push_event: PushEvent = PushEvent.model_validate(event)
+        except ValidationError as exc:
+            logger.warning(f"Invalid GitLab push event: {exc.errors(include_url=False)}")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid push event",
+            ) from exc
+        if push_event.ref != TRACKED_REF:
+            return WebhookResult(is_refreshed=False)
+
+        file_paths: set[str] = self._get_changed_file_paths(push_event) & TRACKED_FILE_PATHS
+        if not file_paths:
+            return WebhookResult(is_refreshed=False)
+
+        logger.debug(f"Push to project {push_event.project_id} changed {sorted(file_paths)}")
+        # GitLab waits for the response only a few seconds, files are fetched after it
+        background_tasks.add_task(
+            self.project_refresher.refresh_project,
+            project_id=push_event.project_id,
+            file_paths=file_paths,
+        )
+        return WebhookResult(is_refreshed=True)
+
+    @staticmethod
+    def _get_changed_file_paths(push_event: PushEvent) -> set[str]:
+        # Only the last 20 commits of a push are listed, any file could have changed in the others
+        if push_event.total_commits_count > len(push_event.commits):
+            return set(TRACKED_FILE_PATHS)
+        return {
+            file_path
+            for commit in push_event.commits
+            for file_path in (*commit.added, *commit.modified, *commit.removed)
+        }
@@ -1,5 +1,7 @@
 """Packagebusters error models."""
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from enum import IntEnum
 from typing import Final
 
@@ -9,6 +11,8 @@ from fastapi.responses import JSONResponse
 from loguru import logger
 from pydantic import BaseModel
 
+from packagebusters.controllers.gitlab_client.exceptions import GitLabNotFoundError
+
 
 BODY_ERRORS: Final[dict] = {}
 # pylint: disable=invalid-name
@@ -67,6 +71,15 @@ class BadGitlabGroupIdError(BadRequestError):
         super().__init__(detail={"detail": f"Group {group_id} not found", "error_code": ErrCode.BadGitlabGroupId})
 
 
+@contextmanager
+def raise_bad_gitlab_group_id(group_id: int) -> Iterator[None]:
+    """Group missing in GitLab is a bad group id of the request."""
+    try:
+        yield
+    except GitLabNotFoundError as exc:
+        raise BadGitlabGroupIdError(group_id=group_id) from exc
+
+
 def _make_detail(loc: tuple[str], err_msg: str) -> str:
     return " ".join(str(location) for location in loc) + " " + err_msg
 
@@ -0,0 +1,35 @@
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any, Generic, ParamSpec, TypeVar
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+P = ParamSpec("P")
+
+
+class SingleFlight(Generic[K, V]):
+    """Runs one call per key at a time, callers of a key already in flight share its result."""
+
+    def __init__(self) -> None:
+        self.shared: int = 0
+        self._flights: dict[K, asyncio.Task[V]] = {}
+
+    # The key is named apart from the parameters of the function, a keyword argument named key is passed on to it
+    async def run(
+        self, flight_key: K, func: Callable[P, Coroutine[Any, Any, V]], /, *args: P.args, **kwargs: P.kwargs
+    ) -> V:
+        if (flight := self._flights.get(flight_key)) is None:
+            flight = self._flights[flight_key] = asyncio.create_task(func(*args, **kwargs))
+            flight.add_done_callback(lambda _: self._forget(flight_key, flight))
+        else:
+            self.shared += 1
+        # A cancelled caller does not cancel the call for the others
+        return await asyncio.shield(flight)
+
+    def _forget(self, key: K, flight: asyncio.Task[V]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Retrieves the exception when every caller was cancelled, so it is not reported as never retrieved
+        if not flight.cancelled():
+            flight.exception()
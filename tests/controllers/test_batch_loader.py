@@ -0,0 +1,41 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from packagebusters.controllers.file_getter.batch_loader import BatchLoader
+
+
+async def test_batch_loader(mocker: Any) -> None:
+    load_batch_mock: Any = mocker.AsyncMock(side_effect=lambda keys: {key: key * 10 for key in keys if key != 4})
+    batch_loader: BatchLoader[int, int] = BatchLoader(load_batch_mock, max_batch_size=2)
+
+    values: list[int | None] = await asyncio.gather(*(batch_loader.load(key) for key in (1, 2, 2, 3, 4)))
+
+    assert values == [10, 20, 20, 30, None]
+    assert load_batch_mock.mock_calls == [mocker.call([1, 2]), mocker.call([3, 4])]
+
+
+async def test_batch_loader_separates_iterations(mocker: Any) -> None:
+    load_batch_mock: Any = mocker.AsyncMock(side_effect=lambda keys: dict.fromkeys(keys, True))
+    batch_loader: BatchLoader[int, bool] = BatchLoader(load_batch_mock, max_batch_size=10)
+
+    await batch_loader.load(1)
+    await batch_loader.load(2)
+
+    assert load_batch_mock.mock_calls == [mocker.call([1]), mocker.call([2])]
+
+
+async def test_batch_loader_error(mocker: Any) -> None:
+    batch_loader: BatchLoader[int, int] = BatchLoader(
+        mocker.AsyncMock(side_effect=RuntimeError("GitLab is down")),
+        max_batch_size=10,
+    )
+
+    results: list = list(
+        await asyncio.gather(batch_loader.load(1), batch_loader.load(2), return_exceptions=True),
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError, match="GitLab is down"):
+        await batch_loader.load(3)
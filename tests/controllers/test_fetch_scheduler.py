@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from packagebusters.controllers.fetch_scheduler.controller import FetchScheduler, FetchSchedulerClosedError
+
+
+async def test_fetch_scheduler_limits_concurrency() -> None:
+    max_active: int = 0
+    active: int = 0
+
+    async def fetch() -> None:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0)
+        active -= 1
+
+    async with FetchScheduler(max_concurrency=2) as fetch_scheduler:
+        await asyncio.gather(*(fetch_scheduler.run(fetch) for _ in range(10)))
+
+    assert max_active == 2
+    assert fetch_scheduler.get_stats() == {
+        "max_concurrency": 2,
+        "limit": 2,
+        "throttled": 0,
+        "active": 0,
+        "queued": 0,
+        "max_queued": 8,
+        "queued_sessions": 0,
+    }
+
+
+async def test_fetch_scheduler_serves_sessions_in_turn() -> None:
+    order: list[str] = []
+    release: asyncio.Event = asyncio.Event()
+
+    async def fetch(name: str) -> None:
+        order.append(name)
+        await release.wait()
+
+    async def scan(fetch_scheduler: FetchScheduler, name: str, num_of_fetches: int) -> None:
+        with fetch_scheduler.session():
+            await asyncio.gather(*(fetch_scheduler.run(fetch, name) for _ in range(num_of_fetches)))
+
+    async with FetchScheduler(max_concurrency=1) as fetch_scheduler:
+        big_scan = asyncio.create_task(scan(fetch_scheduler, "big", 4))
+        while fetch_scheduler.get_stats()["queued"] < 3:
+            await asyncio.sleep(0)
+        small_scan = asyncio.create_task(scan(fetch_scheduler, "small", 2))
+        while fetch_scheduler.get_stats()["queued"] < 5:
+            await asyncio.sleep(0)
+        assert fetch_scheduler.get_stats()["queued_sessions"] == 2
+        release.set()
+        await asyncio.gather(big_scan, small_scan)
+
+    assert order == ["big", "big", "small", "big", "small", "big"]
+
+
+async def test_fetch_scheduler_cancelled_waiter(mocker: Any) -> None:
+    release: asyncio.Event = asyncio.Event()
+    async with FetchScheduler(max_concurrency=1) as fetch_scheduler:
+        running = asyncio.create_task(fetch_scheduler.run(release.wait))
+        waiting = asyncio.create_task(fetch_scheduler.run(mocker.AsyncMock()))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await running
+
+    assert waiting.cancelled()
+    assert fetch_scheduler.get_stats()["active"] == 0
+    assert fetch_scheduler.get_stats()["queued"] == 0
+
+
+async def test_fetch_scheduler_closed(mocker: Any) -> None:
+    fetch_scheduler: FetchScheduler = FetchScheduler(max_concurrency=1)
+
+    with pytest.raises(FetchSchedulerClosedError):
+        await fetch_scheduler.run(mocker.AsyncMock())
+
+
+async def test_fetch_scheduler_adapts_limit(mocker: Any) -> None:
+    async with FetchScheduler(max_concurrency=8, min_concurrency=2) as fetch_scheduler:
+        fetch_scheduler.on_throttled()
+        fetch_scheduler.on_throttled()
+        halved_limit: float = fetch_scheduler.limit
+        # Grows by about one after as many successful requests as the limit
+        for _ in range(4):
+            fetch_scheduler.on_success()
+
+        assert halved_limit == 4
+        assert 4 < fetch_scheduler.limit < 5
+
+        mocker.patch("packagebusters.controllers.fetch_scheduler.controller.DECREASE_INTERVAL", 0)
+        for _ in range(4):
+            fetch_scheduler.on_throttled()
+
+    assert fetch_scheduler.get_stats()["limit"] == 2
+    assert fetch_scheduler.get_stats()["throttled"] == 6
+
+
+async def test_fetch_scheduler_pauses_for_retry_after(mocker: Any) -> None:
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+    async with FetchScheduler(max_concurrency=2) as fetch_scheduler:
+        fetch_scheduler.on_throttled(retry_after=0.05)
+        started_at: float = loop.time()
+        await fetch_scheduler.run(mocker.AsyncMock())
+
+    assert loop.time() - started_at >= 0.05
+
+
+async def test_fetch_scheduler_pauses_queued_requests() -> None:
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    release: asyncio.Event = asyncio.Event()
+    sent_at: list[float] = []
+
+    async def fetch() -> None:
+        sent_at.append(loop.time())
+
+    async with FetchScheduler(max_concurrency=1) as fetch_scheduler:
+        running = asyncio.create_task(fetch_scheduler.run(release.wait))
+        waiting = asyncio.create_task(fetch_scheduler.run(fetch))
+        await asyncio.sleep(0)
+        started_at: float = loop.time()
+        fetch_scheduler.on_throttled(retry_after=0.1)
+        release.set()
+        await asyncio.gather(running, waiting)
+
+    assert sent_at[0] - started_at >= 0.1
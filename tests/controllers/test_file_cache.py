@@ -7,21 +7,72 @@ from packagebusters.controllers.cache.controller import FileCache
 
 
 @freeze_time("1988-10-14")
-def test_cache(faker: Any) -> None:
+async def test_cache(faker: Any) -> None:
     project_id: int = faker.pyint()
     file_path: str = faker.file_name()
     content: str = faker.text()
     cache: FileCache = FileCache()
 
     for i in range(3):
-        cache.set(project_id=project_id * i, file_path=file_path * i, content=content * i)
-    cached_content: str | None = cache.get(project_id=project_id, file_path=file_path)
-    cached_content_created_at: datetime | None = cache.get_created_at(project_id=project_id, file_path=file_path)
+        await cache.set(project_id=project_id * i, file_path=file_path * i, content=content * i)
+    cached_content: str | None = await cache.get(project_id=project_id, file_path=file_path)
+    cached_content_created_at: datetime | None = await cache.get_created_at(project_id=project_id, file_path=file_path)
 
     assert cached_content == content
     assert cached_content_created_at == datetime(1988, 10, 14, tzinfo=UTC)
 
-    cache.delete(project_id=project_id, file_path=file_path)
-    cached_content: str = cache.get(project_id=project_id, file_path=file_path)
+    await cache.delete(project_id=project_id, file_path=file_path)
+    cached_content: str = await cache.get(project_id=project_id, file_path=file_path)
 
     assert cached_content is None
+
+
+async def test_cache_evicts_least_recently_used(faker: Any) -> None:
+    project_id: int = faker.pyint()
+    cache: FileCache = FileCache(max_entries=2)
+
+    await cache.set(project_id=project_id, file_path="poetry.lock", content=faker.text())
+    await cache.set(project_id=project_id, file_path="Dockerfile", content=faker.text())
+    await cache.get(project_id=project_id, file_path="poetry.lock")
+    await cache.set(project_id=project_id, file_path="pyproject.toml", content=faker.text())
+
+    assert await cache.get(project_id=project_id, file_path="Dockerfile") is None
+    assert await cache.get(project_id=project_id, file_path="poetry.lock") is not None
+    assert cache.get_stats() | {"bytes": 0} == {
+        "entries": 2,
+        "bytes": 0,
+        "max_entries": 2,
+        "max_bytes": 0,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+
+
+async def test_cache_max_bytes(faker: Any) -> None:
+    project_id: int = faker.pyint()
+    cache: FileCache = FileCache(max_bytes=3000)
+
+    for file_path in ("poetry.lock", "Dockerfile", "pyproject.toml"):
+        await cache.set(project_id=project_id, file_path=file_path, content="x" * 1000)
+
+    assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
+    assert cache.get_stats()["entries"] == 2
+    assert cache.get_stats()["bytes"] <= 3000
+
+
+async def test_cache_ttl(faker: Any) -> None:
+    project_id: int = faker.pyint()
+    file_path: str = faker.file_name()
+    cache: FileCache = FileCache(ttl=60)
+
+    with freeze_time("1988-10-14 00:00:00"):
+        await cache.set(project_id=project_id, file_path=file_path, content=faker.text())
+    with freeze_time("1988-10-14 00:00:59"):
+        assert await cache.get(project_id=project_id, file_path=file_path) is not None
+    with freeze_time("1988-10-14 00:01:00"):
+        assert await cache.get(project_id=project_id, file_path=file_path) is None
+
+    assert cache.get_stats()["entries"] == 0
+    assert cache.get_stats()["expirations"] == 1
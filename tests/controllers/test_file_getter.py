@@ -1,64 +1,57 @@
+import asyncio
 from types import SimpleNamespace
 from typing import Any, cast
 
-from gitlab import GitlabGetError
-
-from packagebusters.controllers.file_getter.controller import FileGetter, ProjectFile
+from packagebusters.config import Settings
+from packagebusters.controllers.fetch_scheduler.controller import FetchScheduler
+from packagebusters.controllers.file_getter.controller import REPOSITORY_TREE_PATH, FileGetter, ProjectFile
 from packagebusters.controllers.file_getter.interfaces import IProjectFile
+from packagebusters.controllers.gitlab_client.controller import GitLabClient
+from packagebusters.controllers.gitlab_client.exceptions import GitLabError, GitLabGraphQLError, GitLabNotFoundError
+from packagebusters.controllers.gitlab_client.types import GitLabFile
+from tests.fixtures.mockers import get_mocked_file_cache
 
 
-def test_file_getter(mocker: Any, faker: Any) -> None:
+async def test_file_getter(mocker: Any, faker: Any) -> None:
     project_id: int = faker.pyint()
     file_path: str = faker.file_name()
     content: str = faker.text()
-    gitlab_client_mock: Any = mocker.Mock(
-        **{
-            "projects.get.return_value": mocker.Mock(
-                **{"files.get.return_value": SimpleNamespace(content=content)},
-            ),
-        },
-    )
-    file_cache_mock: Any = mocker.Mock()
+    sha: str = faker.sha1()
+    gitlab_client_mock: Any = mocker.AsyncMock(**{"get_file.return_value": SimpleNamespace(content=content, sha=sha)})
+    file_cache_mock: Any = get_mocked_file_cache()
     file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
 
-    file = file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=False)
+    file = await file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=False)
     file = cast(IProjectFile, file)
 
     assert file.content == content
-    assert gitlab_client_mock.projects.get.mock_calls == [
-        mocker.call(project_id),
-        mocker.call().files.get(file_path=file_path, ref="master"),
+    assert gitlab_client_mock.get_file.mock_calls == [
+        mocker.call(project_id=project_id, file_path=file_path, ref="master"),
     ]
     assert file_cache_mock.set.mock_calls == [
         mocker.call(
             project_id=project_id,
             file_path=file_path,
-            content=ProjectFile(file.content),
+            content=ProjectFile(file.content, sha=sha),
         ),
     ]
 
 
-def test_batch_get_files(mocker: Any, faker: Any) -> None:
+async def test_batch_get_files(mocker: Any, faker: Any) -> None:
     file_path: str = faker.file_name()
     first_project = SimpleNamespace(id=faker.pyint(), name=faker.pystr(), web_url=faker.url())
     second_project = SimpleNamespace(id=faker.pyint(), name=faker.pystr(), web_url=faker.url())
-    first_project_file = SimpleNamespace(content=faker.text())
-    second_project_file = SimpleNamespace(content=faker.text())
-    gitlab_client_mock: Any = mocker.Mock(
+    first_project_file = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+    second_project_file = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+    gitlab_client_mock: Any = mocker.AsyncMock(
         **{
-            "projects.get.return_value": mocker.Mock(
-                **{
-                    "files.get.side_effect": [
-                        first_project_file,
-                        second_project_file,
-                    ]
-                },
-            ),
+            "get_repository_tree.return_value": [SimpleNamespace(id=faker.sha1(), type="blob", path=file_path)],
+            "get_file.side_effect": [first_project_file, second_project_file],
         },
     )
-    file_cache_mock: Any = mocker.Mock()
+    file_cache_mock: Any = get_mocked_file_cache()
     file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
-    files = file_getter.batch_get_files(
+    files = await file_getter.batch_get_files(
         projects=[first_project, second_project],
         file_path=file_path,
         is_cached=False,
@@ -69,73 +62,171 @@ def test_batch_get_files(mocker: Any, faker: Any) -> None:
     assert (second_project, second_project_file) in files
 
 
-def test_cached_file_getter(mocker: Any, faker: Any) -> None:
+async def test_batch_get_files_skips_missing_files(mocker: Any, faker: Any) -> None:
+    project = SimpleNamespace(id=faker.pyint(), name=faker.pystr(), web_url=faker.url())
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{"get_repository_tree.return_value": [SimpleNamespace(id=faker.sha1(), type="blob", path="pyproject.toml")]},
+    )
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=get_mocked_file_cache())
+
+    files = await file_getter.batch_get_files(projects=[project], file_path="poetry.lock", is_cached=False)
+
+    assert files == [(project, None)]
+    assert gitlab_client_mock.get_file.call_count == 0
+
+
+async def test_batch_get_files_skips_unreadable_files(mocker: Any, faker: Any) -> None:
+    project = SimpleNamespace(id=faker.pyint(), name=faker.pystr(), web_url=faker.url())
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{
+            "get_repository_tree.return_value": [SimpleNamespace(id=faker.sha1(), type="blob", path="poetry.lock")],
+            "get_file.side_effect": GitLabError(status_code=403, url=faker.url()),
+        },
+    )
+    file_cache_mock: Any = get_mocked_file_cache()
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
+
+    files = await file_getter.batch_get_files(projects=[project], file_path="poetry.lock", is_cached=False)
+
+    assert files == [(project, None)]
+    # Only the repository tree is cached, a forbidden file is not remembered as missing
+    assert [call.kwargs["file_path"] for call in file_cache_mock.set.mock_calls] == [REPOSITORY_TREE_PATH]
+
+
+async def test_get_file_shas(mocker: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    poetry_lock_sha: str = faker.sha1()
+    dockerfile_sha: str = faker.sha1()
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{
+            "get_repository_tree.return_value": [
+                SimpleNamespace(id=poetry_lock_sha, type="blob", path="poetry.lock"),
+                SimpleNamespace(id=dockerfile_sha, type="blob", path="Dockerfile"),
+                SimpleNamespace(id=faker.sha1(), type="tree", path="packagebusters"),
+            ],
+        },
+    )
+    file_cache_mock: Any = get_mocked_file_cache()
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
+
+    file_shas: dict[str, str] = await file_getter.get_file_shas(project_id=project_id, is_cached=False)
+
+    assert file_shas == {"poetry.lock": poetry_lock_sha, "Dockerfile": dockerfile_sha}
+    assert gitlab_client_mock.get_repository_tree.mock_calls == [mocker.call(project_id=project_id, ref="master")]
+    assert file_cache_mock.set.mock_calls == [
+        mocker.call(project_id=project_id, file_path=REPOSITORY_TREE_PATH, content=ProjectFile(file_shas)),
+    ]
+
+
+async def test_cached_get_file_shas(mocker: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    gitlab_client_mock: Any = mocker.AsyncMock()
+    file_shas: dict[str, str] = {"poetry.lock": faker.sha1()}
+    file_cache_mock: Any = get_mocked_file_cache(ProjectFile(file_shas))
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
+
+    assert await file_getter.get_file_shas(project_id=project_id, is_cached=True) == file_shas
+    assert gitlab_client_mock.get_repository_tree.call_count == 0
+    assert file_cache_mock.get_many.mock_calls == [mocker.call([(project_id, REPOSITORY_TREE_PATH)])]
+
+
+async def test_get_file_shas_empty_repository(mocker: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{"get_repository_tree.side_effect": GitLabNotFoundError(status_code=404, url=faker.url())},
+    )
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=get_mocked_file_cache())
+
+    assert await file_getter.get_file_shas(project_id=project_id, is_cached=False) == {}
+
+
+async def test_cached_file_getter(mocker: Any, faker: Any) -> None:
     project_id: int = faker.pyint()
     file_path: str = faker.file_name()
     content: str = faker.text()
-    gitlab_client_mock: Any = mocker.Mock()
-    file_cache_mock: Any = mocker.Mock(**{"get.return_value": SimpleNamespace(content=content)})
+    gitlab_client_mock: Any = mocker.AsyncMock()
+    file_cache_mock: Any = get_mocked_file_cache(SimpleNamespace(content=content))
     file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
 
-    file = file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=True)
+    file = await file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=True)
     file = cast(IProjectFile, file)
 
     assert file.content == content
-    assert gitlab_client_mock.call_count == 0
-    assert file_cache_mock.get.mock_calls == [mocker.call(project_id=project_id, file_path=file_path)]
+    assert gitlab_client_mock.get_file.call_count == 0
+    assert file_cache_mock.get_many.mock_calls == [mocker.call([(project_id, file_path)])]
 
 
-def test_not_found_in_cache_file_getter(mocker: Any, faker: Any) -> None:
+async def test_not_found_in_cache_file_getter(mocker: Any, faker: Any) -> None:
     project_id: int = faker.pyint()
     file_path: str = faker.file_name()
     content: str = faker.text()
-    gitlab_client_mock: Any = mocker.Mock(
-        **{
-            "projects.get.return_value": mocker.Mock(
-                **{"files.get.return_value": SimpleNamespace(content=content)},
-            ),
-        },
-    )
-    file_cache_mock: Any = mocker.Mock(**{"get.return_value": None})
+    sha: str = faker.sha1()
+    gitlab_client_mock: Any = mocker.AsyncMock(**{"get_file.return_value": SimpleNamespace(content=content, sha=sha)})
+    file_cache_mock: Any = get_mocked_file_cache()
     file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
 
-    file = file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=True)
+    file = await file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=True)
     file = cast(IProjectFile, file)
 
     assert file.content == content
-    assert gitlab_client_mock.projects.get.mock_calls == [
-        mocker.call(project_id),
-        mocker.call().files.get(file_path=file_path, ref="master"),
+    assert gitlab_client_mock.get_file.mock_calls == [
+        mocker.call(project_id=project_id, file_path=file_path, ref="master"),
     ]
     assert file_cache_mock.set.mock_calls == [
         mocker.call(
             project_id=project_id,
             file_path=file_path,
-            content=ProjectFile(file.content),
+            content=ProjectFile(file.content, sha=sha),
         ),
     ]
-    assert file_cache_mock.get.mock_calls == [mocker.call(project_id=project_id, file_path=file_path)]
+    assert file_cache_mock.get_many.mock_calls == [mocker.call([(project_id, file_path)])]
 
 
-def test_file_not_found(faker: Any, mocker: Any) -> None:
+async def test_file_getter_revalidates_cached_file(mocker: Any, faker: Any) -> None:
     project_id: int = faker.pyint()
     file_path: str = faker.file_name()
-    gitlab_client_mock: Any = mocker.Mock(
-        **{
-            "projects.get.return_value": mocker.Mock(
-                **{"files.get.side_effect": GitlabGetError()},
-            ),
-        },
+    cached_file: ProjectFile = ProjectFile(content=faker.text(), sha=faker.sha1())
+    changed_file = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+    gitlab_client_mock: Any = mocker.AsyncMock(**{"get_file.return_value": changed_file})
+    file_cache_mock: Any = get_mocked_file_cache(cached_file)
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
+
+    # The cache is bypassed, but the blob did not change since it was cached
+    unchanged = await file_getter.get_file(
+        project_id=project_id, file_path=file_path, is_cached=False, sha=cached_file.sha
+    )
+    changed = await file_getter.get_file(
+        project_id=project_id, file_path=file_path, is_cached=True, sha=changed_file.sha
+    )
+
+    assert unchanged == cached_file
+    assert changed == changed_file
+    assert gitlab_client_mock.get_file.mock_calls == [
+        mocker.call(project_id=project_id, file_path=file_path, ref="master"),
+    ]
+    assert file_cache_mock.set.mock_calls == [
+        mocker.call(
+            project_id=project_id,
+            file_path=file_path,
+            content=ProjectFile(changed_file.content, sha=changed_file.sha),
+        ),
+    ]
+
+
+async def test_file_not_found(faker: Any, mocker: Any) -> None:
+    project_id: int = faker.pyint()
+    file_path: str = faker.file_name()
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{"get_file.side_effect": GitLabNotFoundError(status_code=404, url=faker.url())},
     )
-    file_cache_mock: Any = mocker.Mock()
+    file_cache_mock: Any = get_mocked_file_cache()
     file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
 
-    file: IProjectFile | None = file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=False)
+    file: IProjectFile | None = await file_getter.get_file(project_id=project_id, file_path=file_path, is_cached=False)
 
     assert file is None
-    assert gitlab_client_mock.projects.get.mock_calls == [
-        mocker.call(project_id),
-        mocker.call().files.get(file_path=file_path, ref="master"),
+    assert gitlab_client_mock.get_file.mock_calls == [
+        mocker.call(project_id=project_id, file_path=file_path, ref="master"),
     ]
     assert file_cache_mock.set.mock_calls == [
         mocker.call(
@@ -144,3 +235,154 @@ def test_file_not_found(faker: Any, mocker: Any) -> None:
             content=ProjectFile(""),
         ),
     ]
+
+
+async def test_batch_get_files_graphql(mocker: Any, faker: Any) -> None:
+    projects: list[Any] = [SimpleNamespace(id=i, name=faker.pystr(), web_url=faker.url()) for i in range(3)]
+    poetry_lock = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{
+            "get_repository_trees.return_value": {
+                0: [SimpleNamespace(id=faker.sha1(), type="blob", path="poetry.lock")],
+                1: [SimpleNamespace(id=faker.sha1(), type="blob", path="Dockerfile")],
+                2: None,
+            },
+            "get_repository_tree.return_value": [SimpleNamespace(id=faker.sha1(), type="blob", path="poetry.lock")],
+            "get_blobs.return_value": {0: {"poetry.lock": poetry_lock}, 2: {}},
+        },
+    )
+    file_getter: FileGetter = FileGetter(
+        gitlab_client=gitlab_client_mock, file_cache=get_mocked_file_cache(), graphql_batch_size=5
+    )
+
+    files = await file_getter.batch_get_files(projects=projects, file_path="poetry.lock", is_cached=False)
+
+    assert files == [(projects[0], poetry_lock), (projects[1], None), (projects[2], None)]
+    assert gitlab_client_mock.get_repository_trees.mock_calls == [mocker.call(project_ids=[0, 1, 2], ref="master")]
+    # The tree of the third project does not fit into one GraphQL page and is listed with REST
+    assert gitlab_client_mock.get_repository_tree.mock_calls == [mocker.call(project_id=2, ref="master")]
+    assert gitlab_client_mock.get_blobs.mock_calls == [
+        mocker.call(project_ids=[0, 2], file_paths=["poetry.lock"], ref="master"),
+    ]
+    assert gitlab_client_mock.get_file.call_count == 0
+
+
+async def test_batch_get_files_graphql_falls_back_to_rest(mocker: Any, faker: Any) -> None:
+    projects: list[Any] = [SimpleNamespace(id=i, name=faker.pystr(), web_url=faker.url()) for i in range(2)]
+    poetry_lock = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{
+            "get_repository_trees.side_effect": GitLabGraphQLError(errors=[{"message": faker.sentence()}]),
+            "get_repository_tree.return_value": [SimpleNamespace(id=faker.sha1(), type="blob", path="poetry.lock")],
+            "get_blobs.side_effect": GitLabError(status_code=502, url=faker.url()),
+            "get_file.return_value": poetry_lock,
+        },
+    )
+    file_getter: FileGetter = FileGetter(
+        gitlab_client=gitlab_client_mock, file_cache=get_mocked_file_cache(), graphql_batch_size=5
+    )
+
+    files = await file_getter.batch_get_files(projects=projects, file_path="poetry.lock", is_cached=False)
+
+    # Every project of the failed queries is read with REST instead of failing the batch
+    assert files == [(projects[0], poetry_lock), (projects[1], poetry_lock)]
+    assert gitlab_client_mock.get_repository_trees.call_count == 1
+    assert gitlab_client_mock.get_blobs.call_count == 1
+    assert gitlab_client_mock.get_repository_tree.mock_calls == [
+        mocker.call(project_id=0, ref="master"),
+        mocker.call(project_id=1, ref="master"),
+    ]
+    assert gitlab_client_mock.get_file.mock_calls == [
+        mocker.call(project_id=0, file_path="poetry.lock", ref="master"),
+        mocker.call(project_id=1, file_path="poetry.lock", ref="master"),
+    ]
+
+
+async def test_get_files_graphql_by_path_set(mocker: Any, faker: Any) -> None:
+    dockerfile = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+    poetry_lock = SimpleNamespace(content=faker.text(), sha=faker.sha1())
+
+    async def get_blobs(project_ids: list[int], file_paths: list[str], ref: str) -> dict:  # noqa: ARG001
+        return {project_id: {"Dockerfile": dockerfile, "poetry.lock": poetry_lock} for project_id in project_ids}
+
+    gitlab_client_mock: Any = mocker.AsyncMock(**{"get_blobs.side_effect": get_blobs})
+    file_getter: FileGetter = FileGetter(
+        gitlab_client=gitlab_client_mock, file_cache=get_mocked_file_cache(), graphql_batch_size=5
+    )
+
+    files: list = list(
+        await asyncio.gather(
+            file_getter.get_file(project_id=0, file_path="Dockerfile", is_cached=False),
+            file_getter.get_file(project_id=1, file_path="Dockerfile", is_cached=False),
+            file_getter.get_file(project_id=1, file_path="poetry.lock", is_cached=False),
+        ),
+    )
+
+    assert files == [dockerfile, dockerfile, poetry_lock]
+    # The poetry.lock of the second project is not read for the first one
+    assert gitlab_client_mock.get_blobs.mock_calls == [
+        mocker.call(project_ids=[0], file_paths=["Dockerfile"], ref="master"),
+        mocker.call(project_ids=[1], file_paths=["Dockerfile", "poetry.lock"], ref="master"),
+    ]
+
+
+async def test_get_file_single_request(httpx_mock: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    content: str = faker.pystr()
+    httpx_mock.add_response(
+        url=f"https://gitlab.test/api/v4/projects/{project_id}/repository/files/poetry.lock?ref=master",
+        json={"content": content},
+    )
+
+    async with (
+        FetchScheduler(max_concurrency=1) as fetch_scheduler,
+        GitLabClient(
+            settings=Settings(gitlab_url="https://gitlab.test", gitlab_token=faker.pystr()),
+            fetch_scheduler=fetch_scheduler,
+        ) as gitlab_client,
+    ):
+        file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client, file_cache=get_mocked_file_cache())
+        file = await file_getter.get_file(project_id=project_id, file_path="poetry.lock", is_cached=False)
+
+    assert file == GitLabFile(content=content)
+    # Files are read straight from the files endpoint, without fetching the project first
+    assert len(httpx_mock.get_requests()) == 1
+
+
+async def test_batch_get_cached_files_single_cache_read(mocker: Any, faker: Any) -> None:
+    projects: list[Any] = [SimpleNamespace(id=i, name=faker.pystr(), web_url=faker.url()) for i in range(3)]
+    gitlab_client_mock: Any = mocker.AsyncMock()
+    file_cache_mock: Any = get_mocked_file_cache(ProjectFile({}))
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=file_cache_mock)
+
+    files = await file_getter.batch_get_files(projects=projects, file_path="poetry.lock", is_cached=True)
+
+    assert files == [(project, None) for project in projects]
+    # Trees of all projects are read from the cache together
+    assert file_cache_mock.get_many.mock_calls == [
+        mocker.call([(project.id, REPOSITORY_TREE_PATH) for project in projects]),
+    ]
+
+
+async def test_concurrent_get_file_single_request(mocker: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    content: str = faker.text()
+
+    async def get_file(**_: Any) -> SimpleNamespace:
+        # Lets the other callers miss the cache while the file is being fetched
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(content=content, sha=None)
+
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{"get_file.side_effect": get_file, "get_repository_tree.return_value": []},
+    )
+    file_getter: FileGetter = FileGetter(gitlab_client=gitlab_client_mock, file_cache=get_mocked_file_cache())
+
+    files: list = await asyncio.gather(
+        *(file_getter.get_file(project_id=project_id, file_path="poetry.lock", is_cached=True) for _ in range(5)),
+        *(file_getter.get_file_shas(project_id=project_id, is_cached=True) for _ in range(5)),
+    )
+
+    assert [file.content for file in files[:5]] == [content] * 5
+    assert gitlab_client_mock.get_file.await_count == 1
+    assert gitlab_client_mock.get_repository_tree.await_count == 1
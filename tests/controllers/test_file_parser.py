@@ -0,0 +1,70 @@
+import base64
+import tomllib
+from typing import Any
+
+import pytest
+
+from packagebusters.controllers.cache.parsed_cache import ParsedFileCache
+from packagebusters.controllers.file_parser.controller import FileParser
+from packagebusters.controllers.package_getter.controller import PackageGetter
+from packagebusters.controllers.package_getter.types import GroupPackage
+from tests.fixtures.files import (
+    DOCKER_FILE_PROJECT_0,
+    DOCKER_FILE_PROJECT_1,
+    POETRY_LOCK_PROJECT_0,
+    POETRY_LOCK_PROJECT_1,
+    PYPROJECT_TOML_PROJECT_0,
+    PYPROJECT_TOML_PROJECT_1,
+)
+from tests.fixtures.mockers import get_mocked_file_getter, get_mocked_projects
+
+
+@pytest.mark.parametrize("max_workers", [0, 2])
+async def test_file_parser(max_workers: int) -> None:
+    jobs: list[tuple[Any, str]] = [
+        (tomllib.loads, base64.b64decode(POETRY_LOCK_PROJECT_0.content).decode()),
+        (tomllib.loads, base64.b64decode(POETRY_LOCK_PROJECT_1.content).decode()),
+        (base64.b64decode, DOCKER_FILE_PROJECT_1.content),
+    ]
+
+    async with FileParser(max_workers=max_workers) as file_parser:
+        parsed_files: list[Any] = await file_parser.parse_many(jobs)
+
+    assert parsed_files == [parse(content) for parse, content in jobs]
+    assert file_parser.get_stats() == {"max_workers": max_workers, "parsed": 3}
+
+
+async def test_file_parser_package_getter_parsers(mocker: Any) -> None:
+    project_0, project_1 = get_mocked_projects(num_of_projects=2)
+    files: dict[tuple[int, str], Any] = {
+        (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+        (project_0.id, "pyproject.toml"): PYPROJECT_TOML_PROJECT_0,
+        (project_0.id, "Dockerfile"): DOCKER_FILE_PROJECT_0,
+        (project_1.id, "poetry.lock"): POETRY_LOCK_PROJECT_1,
+        (project_1.id, "pyproject.toml"): PYPROJECT_TOML_PROJECT_1,
+        (project_1.id, "Dockerfile"): DOCKER_FILE_PROJECT_1,
+    }
+    scans: list[list[GroupPackage]] = []
+    for max_workers in (0, 2):
+        async with FileParser(max_workers=max_workers) as file_parser:
+            package_getter: PackageGetter = PackageGetter(
+                subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+                project_getter=mocker.AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]}),
+                file_getter=get_mocked_file_getter(files),
+                fetch_scheduler=mocker.MagicMock(),
+                parsed_file_cache=ParsedFileCache(max_entries=100),
+                file_parser=file_parser,
+            )
+            scans.append(
+                await package_getter.get_group_packages(
+                    group_id=0,
+                    is_add_transitive_dependencies=False,
+                    is_cached=True,
+                ),
+            )
+
+        # The parsers of the package getter are sent to the worker processes
+        assert file_parser.get_stats() == {"max_workers": max_workers, "parsed": 6}
+
+    assert scans[0]
+    assert scans[1] == scans[0]
@@ -0,0 +1,314 @@
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+
+from packagebusters.config import Settings
+from packagebusters.controllers.fetch_scheduler.controller import FetchScheduler
+from packagebusters.controllers.gitlab_client.controller import GitLabClient
+from packagebusters.controllers.gitlab_client.exceptions import GitLabError, GitLabGraphQLError, GitLabNotFoundError
+from packagebusters.controllers.gitlab_client.queries import REPOSITORY_BLOBS_QUERY, REPOSITORY_TREES_QUERY
+from packagebusters.controllers.gitlab_client.types import GitLabFile, GitLabGroup, GitLabProject, GitLabTreeEntry
+from tests.fixtures.http_server import HTTPServer
+
+
+GITLAB_URL: str = "https://gitlab.test/"
+GITLAB_API_URL: str = "https://gitlab.test/api/v4"
+GITLAB_GRAPHQL_URL: str = "https://gitlab.test/api/graphql"
+
+
+@pytest.fixture()
+async def fetch_scheduler() -> AsyncGenerator[FetchScheduler, None]:
+    async with FetchScheduler(max_concurrency=10) as fetch_scheduler:
+        yield fetch_scheduler
+
+
+async def test_get_file(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    project_id: int = faker.pyint()
+    private_token: str = faker.pystr()
+    content: str = faker.pystr()
+    blob_id: str = faker.sha1()
+    httpx_mock.add_response(
+        url=f"{GITLAB_API_URL}/projects/{project_id}/repository/files/deploy%2FDockerfile?ref=master",
+        match_headers={"PRIVATE-TOKEN": private_token},
+        json={"file_path": "deploy/Dockerfile", "content": content, "blob_id": blob_id},
+    )
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        file: GitLabFile = await gitlab_client.get_file(
+            project_id=project_id, file_path="deploy/Dockerfile", ref="master"
+        )
+
+    assert file == GitLabFile(content=content, sha=blob_id)
+
+
+async def test_get_repository_tree(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    project_id: int = faker.pyint()
+    private_token: str = faker.pystr()
+    httpx_mock.add_response(
+        url=f"{GITLAB_API_URL}/projects/{project_id}/repository/tree?ref=master&per_page=100",
+        json=[{"id": "a1b2", "name": "poetry.lock", "type": "blob", "path": "poetry.lock", "mode": "100644"}],
+    )
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        tree: list[GitLabTreeEntry] = await gitlab_client.get_repository_tree(project_id=project_id, ref="master")
+
+    assert tree == [GitLabTreeEntry(id="a1b2", name="poetry.lock", type="blob", path="poetry.lock")]
+
+
+async def test_get_group_projects_pagination(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    group_id: int = faker.pyint()
+    private_token: str = faker.pystr()
+    next_page_url: str = (
+        f"{GITLAB_API_URL}/groups/{group_id}/projects?archived=false&simple=true&include_subgroups=true&page=2"
+    )
+    httpx_mock.add_response(
+        url=f"{GITLAB_API_URL}/groups/{group_id}/projects?archived=false&simple=true&include_subgroups=true&per_page=100",
+        headers={"Link": f'<{next_page_url}>; rel="next"'},
+        json=[{"id": 1, "name": "first", "web_url": "https://first", "last_activity_at": "1988-10-14T00:00:00Z"}],
+    )
+    httpx_mock.add_response(
+        url=next_page_url,
+        json=[{"id": 2, "name": "second", "web_url": "https://second"}],
+    )
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        projects: list[GitLabProject] = await gitlab_client.get_group_projects(
+            group_id=group_id,
+            include_subgroups=True,
+        )
+
+    assert projects == [
+        GitLabProject(id=1, name="first", web_url="https://first", last_activity_at="1988-10-14T00:00:00Z"),
+        GitLabProject(id=2, name="second", web_url="https://second"),
+    ]
+
+
+async def test_get_descendant_groups(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    group_id: int = faker.pyint()
+    private_token: str = faker.pystr()
+    httpx_mock.add_response(
+        url=f"{GITLAB_API_URL}/groups/{group_id}/descendant_groups?per_page=100",
+        json=[{"id": 1}, {"id": 2}],
+    )
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        groups: list[GitLabGroup] = await gitlab_client.get_descendant_groups(group_id=group_id)
+
+    assert groups == [GitLabGroup(id=1), GitLabGroup(id=2)]
+
+
+@pytest.mark.parametrize(
+    ("status_code", "exception"),
+    [(404, GitLabNotFoundError), (500, GitLabError)],
+)
+async def test_get_file_error(
+    httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler, status_code: int, exception: type[Exception]
+) -> None:
+    project_id: int = faker.pyint()
+    private_token: str = faker.pystr()
+    httpx_mock.add_response(status_code=status_code)
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token, gitlab_max_retries=0),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        with pytest.raises(exception):
+            await gitlab_client.get_file(project_id=project_id, file_path="poetry.lock", ref="master")
+
+
+async def test_get_repository_trees(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    private_token: str = faker.pystr()
+    httpx_mock.add_response(
+        method="POST",
+        url=GITLAB_GRAPHQL_URL,
+        match_json={
+            "query": REPOSITORY_TREES_QUERY,
+            "variables": {"ids": ["gid://gitlab/Project/1", "gid://gitlab/Project/2"], "first": 2, "ref": "master"},
+        },
+        json={
+            "data": {
+                "projects": {
+                    "nodes": [
+                        {
+                            "id": "gid://gitlab/Project/1",
+                            "repository": {
+                                "tree": {
+                                    "blobs": {
+                                        "pageInfo": {"hasNextPage": False},
+                                        "nodes": [
+                                            {
+                                                "sha": "a1b2",
+                                                "name": "poetry.lock",
+                                                "path": "poetry.lock",
+                                                "type": "blob",
+                                            },
+                                        ],
+                                    },
+                                },
+                            },
+                        },
+                        {
+                            "id": "gid://gitlab/Project/2",
+                            "repository": {"tree": {"blobs": {"pageInfo": {"hasNextPage": True}, "nodes": []}}},
+                        },
+                        {"id": "gid://gitlab/Project/3", "repository": {"tree": None}},
+                    ],
+                },
+            },
+        },
+    )
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        trees: dict[int, list[GitLabTreeEntry] | None] = await gitlab_client.get_repository_trees(
+            project_ids=[1, 2],
+            ref="master",
+        )
+
+    assert trees == {
+        1: [GitLabTreeEntry(id="a1b2", name="poetry.lock", type="blob", path="poetry.lock")],
+        2: None,
+        3: [],
+    }
+
+
+async def test_get_blobs(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    private_token: str = faker.pystr()
+    httpx_mock.add_response(
+        method="POST",
+        url=GITLAB_GRAPHQL_URL,
+        match_json={
+            "query": REPOSITORY_BLOBS_QUERY,
+            "variables": {
+                "ids": ["gid://gitlab/Project/1", "gid://gitlab/Project/2"],
+                "first": 2,
+                "ref": "master",
+                "paths": ["poetry.lock", "Dockerfile"],
+            },
+        },
+        json={
+            "data": {
+                "projects": {
+                    "nodes": [
+                        {
+                            "id": "gid://gitlab/Project/1",
+                            "repository": {
+                                "blobs": {
+                                    "nodes": [
+                                        {"path": "poetry.lock", "oid": "a1", "rawBlob": "[[package]]"},
+                                        {"path": "Dockerfile", "oid": "b2", "rawBlob": "FROM python:3.12"},
+                                    ],
+                                },
+                            },
+                        },
+                        {"id": "gid://gitlab/Project/2", "repository": {"blobs": {"nodes": []}}},
+                    ],
+                },
+            },
+        },
+    )
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        blobs: dict[int, dict[str, GitLabFile]] = await gitlab_client.get_blobs(
+            project_ids=[1, 2],
+            file_paths=["poetry.lock", "Dockerfile"],
+            ref="master",
+        )
+
+    assert blobs == {
+        1: {
+            "poetry.lock": GitLabFile(content="W1twYWNrYWdlXV0=", sha="a1"),
+            "Dockerfile": GitLabFile(content="RlJPTSBweXRob246My4xMg==", sha="b2"),
+        },
+        2: {},
+    }
+
+
+async def test_graphql_errors(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    private_token: str = faker.pystr()
+    httpx_mock.add_response(method="POST", url=GITLAB_GRAPHQL_URL, json={"errors": [{"message": "Too complex"}]})
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=private_token),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        with pytest.raises(GitLabGraphQLError, match="Too complex"):
+            await gitlab_client.get_blobs(project_ids=[1], file_paths=["poetry.lock"], ref="master")
+
+
+async def test_get_retries_throttled_requests(
+    httpx_mock: Any, mocker: Any, faker: Any, fetch_scheduler: FetchScheduler
+) -> None:
+    mocker.patch("packagebusters.controllers.gitlab_client.controller.RETRY_BASE_DELAY", 0.001)
+    group_id: int = faker.pyint()
+    url: str = f"{GITLAB_API_URL}/groups/{group_id}/descendant_groups?per_page=100"
+    httpx_mock.add_response(url=url, status_code=429, headers={"Retry-After": "0"})
+    httpx_mock.add_response(url=url, status_code=503)
+    httpx_mock.add_response(url=url, json=[{"id": 1}])
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=faker.pystr()),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        groups: list[GitLabGroup] = await gitlab_client.get_descendant_groups(group_id=group_id)
+
+    assert groups == [GitLabGroup(id=1)]
+    assert len(httpx_mock.get_requests()) == 3
+    assert fetch_scheduler.get_stats()["throttled"] == 2
+    assert fetch_scheduler.get_stats()["limit"] < 10
+
+
+async def test_get_slows_down_near_rate_limit(httpx_mock: Any, faker: Any, fetch_scheduler: FetchScheduler) -> None:
+    group_id: int = faker.pyint()
+    httpx_mock.add_response(json=[], headers={"RateLimit-Limit": "600", "RateLimit-Remaining": "10"})
+
+    async with GitLabClient(
+        settings=Settings(gitlab_url=GITLAB_URL, gitlab_token=faker.pystr()),
+        fetch_scheduler=fetch_scheduler,
+    ) as gitlab_client:
+        await gitlab_client.get_descendant_groups(group_id=group_id)
+
+    assert fetch_scheduler.get_stats()["limit"] == 5
+
+
+async def test_gitlab_client_reuses_connections(
+    faker: Any, fetch_scheduler: FetchScheduler, non_mocked_hosts: list[str]
+) -> None:
+    non_mocked_hosts.append("127.0.0.1")
+
+    async with (
+        HTTPServer() as server,
+        GitLabClient(
+            settings=Settings(gitlab_url=server.url, gitlab_token=faker.pystr(), gitlab_max_connections=100),
+            fetch_scheduler=fetch_scheduler,
+        ) as gitlab_client,
+    ):
+        for _ in range(3):
+            await gitlab_client.get_descendant_groups(group_id=faker.pyint())
+
+    assert server.connections == 1
+    assert gitlab_client.get_stats() == {
+        "max_connections": 100,
+        "http2": False,
+        "requests": 3,
+        "connections": 1,
+        "tls_handshakes": 0,
+    }
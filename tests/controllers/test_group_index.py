@@ -0,0 +1,164 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from packagebusters.config import Settings
+from packagebusters.controllers.group_index.controller import GroupIndex
+from packagebusters.controllers.package_getter.types import ScanOptions
+from tests.conftest import SETTINGS
+
+
+def get_settings(refresh_interval: float, full_refresh_interval: float, idle_timeout: float) -> Settings:
+    return Settings(
+        gitlab_token=SETTINGS["GITLAB_TOKEN"],
+        group_index_refresh_interval=refresh_interval,
+        group_index_full_refresh_interval=full_refresh_interval,
+        group_index_idle_timeout=idle_timeout,
+    )
+
+
+def get_mocked_package_getter(mocker: Any, faker: Any) -> Any:
+    async def get_group_snapshot(**_: Any) -> SimpleNamespace:
+        return SimpleNamespace(group_packages=[{"package_name": faker.pystr()}])
+
+    return mocker.AsyncMock(**{"get_group_snapshot.side_effect": get_group_snapshot})
+
+
+async def test_group_index_serves_snapshot(mocker: Any, faker: Any) -> None:
+    group_id: int = faker.pyint()
+    package_getter_mock: Any = get_mocked_package_getter(mocker, faker)
+
+    async with GroupIndex(
+        package_getter=package_getter_mock,
+        settings=get_settings(refresh_interval=60, full_refresh_interval=3600, idle_timeout=3600),
+    ) as group_index:
+        first_packages, second_packages = await asyncio.gather(
+            group_index.get_group_packages(group_id=group_id, is_add_transitive_dependencies=True, is_cached=True),
+            group_index.get_group_packages(group_id=group_id, is_add_transitive_dependencies=True, is_cached=True),
+        )
+        uncached_packages: list = await group_index.get_group_packages(
+            group_id=group_id,
+            is_add_transitive_dependencies=True,
+            is_cached=False,
+        )
+
+    assert first_packages == second_packages
+    assert uncached_packages != first_packages
+    assert package_getter_mock.get_group_snapshot.mock_calls == [
+        mocker.call(group_id=group_id, options=ScanOptions(is_add_transitive_dependencies=True, is_cached=True)),
+        mocker.call(group_id=group_id, options=ScanOptions(is_add_transitive_dependencies=True, is_cached=False)),
+    ]
+    assert group_index.get_stats() == {"groups": 1, "refreshes": 2, "shared_builds": 1, "errors": 0}
+
+
+async def test_group_index_refreshes_in_background(mocker: Any, faker: Any) -> None:
+    group_id: int = faker.pyint()
+    package_getter_mock: Any = get_mocked_package_getter(mocker, faker)
+
+    async with GroupIndex(
+        package_getter=package_getter_mock,
+        settings=get_settings(refresh_interval=0.01, full_refresh_interval=3600, idle_timeout=3600),
+    ) as group_index:
+        first_packages: list = await group_index.get_group_packages(
+            group_id=group_id,
+            is_add_transitive_dependencies=False,
+            is_cached=True,
+        )
+        await asyncio.sleep(0.05)
+        refreshed_packages: list = await group_index.get_group_packages(
+            group_id=group_id,
+            is_add_transitive_dependencies=False,
+            is_cached=True,
+        )
+
+    assert refreshed_packages != first_packages
+    assert package_getter_mock.get_group_snapshot.call_count > 1
+    # Background refreshes build on the previous snapshot and read changed projects from GitLab
+    _, refresh_kwargs = package_getter_mock.get_group_snapshot.call_args
+    assert refresh_kwargs["options"].is_cached is False
+    assert refresh_kwargs["options"].previous is not None
+
+
+async def test_group_index_drops_idle_groups(mocker: Any, faker: Any) -> None:
+    package_getter_mock: Any = get_mocked_package_getter(mocker, faker)
+
+    async with GroupIndex(
+        package_getter=package_getter_mock,
+        settings=get_settings(refresh_interval=0.01, full_refresh_interval=0, idle_timeout=0.02),
+    ) as group_index:
+        await group_index.get_group_packages(
+            group_id=faker.pyint(), is_add_transitive_dependencies=False, is_cached=True
+        )
+        await asyncio.sleep(0.1)
+
+    assert group_index.get_stats()["groups"] == 0
+
+
+async def test_group_index_keeps_snapshot_on_errors(mocker: Any, faker: Any) -> None:
+    group_id: int = faker.pyint()
+    package_getter_mock: Any = get_mocked_package_getter(mocker, faker)
+
+    async with GroupIndex(
+        package_getter=package_getter_mock,
+        settings=get_settings(refresh_interval=0.01, full_refresh_interval=3600, idle_timeout=3600),
+    ) as group_index:
+        first_packages: list = await group_index.get_group_packages(
+            group_id=group_id,
+            is_add_transitive_dependencies=False,
+            is_cached=True,
+        )
+        package_getter_mock.get_group_snapshot.side_effect = OSError
+        await asyncio.sleep(0.05)
+        packages: list = await group_index.get_group_packages(
+            group_id=group_id,
+            is_add_transitive_dependencies=False,
+            is_cached=True,
+        )
+
+    assert packages == first_packages
+    assert group_index.get_stats()["errors"] > 0
+
+
+async def test_group_index_forgets_failed_builds(mocker: Any, faker: Any) -> None:
+    package_getter_mock: Any = mocker.AsyncMock(**{"get_group_snapshot.side_effect": ConnectionRefusedError})
+
+    async with GroupIndex(
+        package_getter=package_getter_mock,
+        settings=get_settings(refresh_interval=60, full_refresh_interval=3600, idle_timeout=3600),
+    ) as group_index:
+        with pytest.raises(ConnectionRefusedError):
+            await group_index.get_group_packages(
+                group_id=faker.pyint(), is_add_transitive_dependencies=False, is_cached=True
+            )
+
+    assert group_index.get_stats()["groups"] == 0
+    assert not group_index._locks  # noqa: SLF001
+
+
+async def test_group_index_refreshes_project(mocker: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    package_getter_mock: Any = mocker.AsyncMock(
+        **{"get_group_snapshot.return_value": SimpleNamespace(group_packages=[], projects={project_id: None})},
+    )
+
+    async with GroupIndex(
+        package_getter=package_getter_mock,
+        settings=get_settings(refresh_interval=60, full_refresh_interval=3600, idle_timeout=3600),
+    ) as group_index:
+        await group_index.get_group_packages(group_id=0, is_add_transitive_dependencies=False, is_cached=True)
+        await group_index.refresh_project(project_id=project_id)
+        await group_index.refresh_project(project_id=project_id + 1)
+
+    assert package_getter_mock.get_group_snapshot.mock_calls[1:] == [
+        mocker.call(
+            group_id=0,
+            options=ScanOptions(
+                is_add_transitive_dependencies=False,
+                is_cached=True,
+                previous=package_getter_mock.get_group_snapshot.return_value,
+                stale_project_ids=frozenset({project_id}),
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any
+
+from freezegun import freeze_time
+
+from packagebusters.controllers.cache.listing_cache import ListingCache
+
+
+async def test_listing_cache(mocker: Any, faker: Any) -> None:
+    listing: list[int] = faker.pylist(value_types=[int])
+    load_mock: Any = mocker.AsyncMock(return_value=listing)
+
+    async with ListingCache(ttl=60, stale_ttl=3600) as listing_cache:
+        assert await listing_cache.get("key", load_mock, is_cached=True) == listing
+        assert await listing_cache.get("key", load_mock, is_cached=True) == listing
+        await listing_cache.get("key", load_mock, is_cached=False)
+        listing_cache.invalidate("key")
+        await listing_cache.get("key", load_mock, is_cached=True)
+
+    assert load_mock.await_count == 3
+    assert listing_cache.get_stats() == {
+        "entries": 1,
+        "hits": 1,
+        "stale_hits": 0,
+        "misses": 3,
+        "revalidating": 0,
+        "errors": 0,
+    }
+
+
+async def test_listing_cache_serves_stale_while_revalidating(mocker: Any) -> None:
+    load_mock: Any = mocker.AsyncMock(side_effect=["old", "new", "newest"])
+
+    async with ListingCache(ttl=60, stale_ttl=3600) as listing_cache:
+        with freeze_time("1988-10-14 00:00:00"):
+            await listing_cache.get("key", load_mock, is_cached=True)
+        with freeze_time("1988-10-14 00:10:00"):
+            stale_listing: str = await listing_cache.get("key", load_mock, is_cached=True)
+            while listing_cache.get_stats()["revalidating"]:
+                await asyncio.sleep(0)
+            fresh_listing: str = await listing_cache.get("key", load_mock, is_cached=True)
+        with freeze_time("1988-10-14 02:00:00"):
+            expired_listing: str = await listing_cache.get("key", load_mock, is_cached=True)
+
+    assert (stale_listing, fresh_listing, expired_listing) == ("old", "new", "newest")
+    assert listing_cache.get_stats()["stale_hits"] == 1
+
+
+async def test_listing_cache_keeps_stale_listing_on_errors(mocker: Any) -> None:
+    load_mock: Any = mocker.AsyncMock(side_effect=["old", OSError])
+
+    async with ListingCache(ttl=60, stale_ttl=3600) as listing_cache:
+        with freeze_time("1988-10-14 00:00:00"):
+            await listing_cache.get("key", load_mock, is_cached=True)
+        with freeze_time("1988-10-14 00:10:00"):
+            await listing_cache.get("key", load_mock, is_cached=True)
+            while listing_cache.get_stats()["revalidating"]:
+                await asyncio.sleep(0)
+            listing: str = await listing_cache.get("key", load_mock, is_cached=True)
+
+    assert listing == "old"
+    assert listing_cache.get_stats()["errors"] == 1
@@ -0,0 +1,14 @@
+import asyncio
+import time
+
+from packagebusters.controllers.loop_monitor.controller import LoopLagMonitor
+
+
+async def test_loop_lag_monitor() -> None:
+    async with LoopLagMonitor(interval=0.01) as loop_lag_monitor:
+        await asyncio.sleep(0.02)
+        # Blocks the event loop
+        time.sleep(0.05)  # noqa: ASYNC101
+        await asyncio.sleep(0.02)
+
+    assert loop_lag_monitor.get_stats()["max_lag_ms"] >= 30
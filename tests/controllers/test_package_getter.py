@@ -1,9 +1,16 @@
-from collections.abc import Generator
+import asyncio
+import base64
+import copy
+import tomllib
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import Mock
+from unittest.mock import AsyncMock
 
+from packagebusters.controllers.cache.parsed_cache import ParsedFileCache
+from packagebusters.controllers.file_parser.controller import FileParser
+from packagebusters.controllers.gitlab_client.exceptions import GitLabError
 from packagebusters.controllers.package_getter.controller import PackageGetter
-from packagebusters.controllers.package_getter.types import GroupPackage
+from packagebusters.controllers.package_getter.types import GroupPackage, GroupSnapshot, ScanOptions
 from tests.fixtures.files import (
     DOCKER_FILE_PROJECT_0,
     DOCKER_FILE_PROJECT_1,
@@ -12,23 +19,24 @@ from tests.fixtures.files import (
     PYPROJECT_TOML_PROJECT_0,
     PYPROJECT_TOML_PROJECT_1,
 )
-from tests.fixtures.mockers import get_mocked_projects
+from tests.fixtures.mockers import get_mocked_file_getter, get_mocked_file_sha, get_mocked_projects
 
 
-def test_package_getter(mocker: Any, faker: Any) -> None:
+async def test_package_getter(mocker: Any, faker: Any) -> None:
     subgroup_id: int = faker.pyint()
     group_id: int = subgroup_id + faker.pyint()
     is_cached: bool = faker.pybool()
-    subgroup_getter_mock: Any = mocker.Mock(**{"get_subgroup_ids.return_value": {subgroup_id}})
+    subgroup_getter_mock: Any = mocker.AsyncMock(**{"get_subgroup_ids.return_value": {subgroup_id}})
     project_0, project_1 = get_mocked_projects(num_of_projects=2)
-    project_getter_mock: Any = Mock(**{"batch_get_projects.return_value": [project_0, project_1]})
-    file_getter_mock: Any = Mock(
-        **{
-            "batch_get_files.side_effect": [
-                [(project_0, POETRY_LOCK_PROJECT_0), (project_1, POETRY_LOCK_PROJECT_1)],
-                [(project_0, DOCKER_FILE_PROJECT_0), (project_1, DOCKER_FILE_PROJECT_1)],
-                [(project_0, PYPROJECT_TOML_PROJECT_0), (project_1, PYPROJECT_TOML_PROJECT_1)],
-            ]
+    project_getter_mock: Any = AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]})
+    file_getter_mock: Any = get_mocked_file_getter(
+        {
+            (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+            (project_0.id, "Dockerfile"): DOCKER_FILE_PROJECT_0,
+            (project_0.id, "pyproject.toml"): PYPROJECT_TOML_PROJECT_0,
+            (project_1.id, "poetry.lock"): POETRY_LOCK_PROJECT_1,
+            (project_1.id, "Dockerfile"): DOCKER_FILE_PROJECT_1,
+            (project_1.id, "pyproject.toml"): PYPROJECT_TOML_PROJECT_1,
         }
     )
 
@@ -36,9 +44,12 @@ def test_package_getter(mocker: Any, faker: Any) -> None:
         subgroup_getter=subgroup_getter_mock,
         project_getter=project_getter_mock,
         file_getter=file_getter_mock,
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
     )
 
-    group_packages: Generator[GroupPackage, Any, None] = package_getter.get_group_packages(
+    group_packages: list[GroupPackage] = await package_getter.get_group_packages(
         group_id=group_id,
         is_add_transitive_dependencies=False,
         is_cached=is_cached,
@@ -80,37 +91,44 @@ def test_package_getter(mocker: Any, faker: Any) -> None:
         },
     ]
 
-    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == [mocker.call(group_id=group_id)]
-    assert project_getter_mock.batch_get_projects.mock_calls == [mocker.call(group_ids={group_id, subgroup_id})]
-    assert file_getter_mock.batch_get_files.mock_calls == [
-        mocker.call(projects=[project_0, project_1], file_path="poetry.lock", is_cached=is_cached),
-        mocker.call(projects=[project_0, project_1], file_path="Dockerfile", is_cached=is_cached),
-        mocker.call(projects=[project_0, project_1], file_path="pyproject.toml", is_cached=is_cached),
+    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == [mocker.call(group_id=group_id, is_cached=is_cached)]
+    assert project_getter_mock.batch_get_projects.mock_calls == [
+        mocker.call(group_ids={group_id, subgroup_id}, is_cached=is_cached),
     ]
+    assert file_getter_mock.get_file.await_count == 6
+    file_getter_mock.get_file.assert_has_awaits(
+        [
+            mocker.call(
+                project_id=project.id,
+                file_path=file_path,
+                is_cached=is_cached,
+                sha=get_mocked_file_sha(project.id, file_path),
+            )
+            for project in (project_0, project_1)
+            for file_path in ("poetry.lock", "Dockerfile", "pyproject.toml")
+        ],
+        any_order=True,
+    )
 
 
-def test_package_getter_is_add_transitive_dependencies(mocker: Any, faker: Any) -> None:
+async def test_package_getter_is_add_transitive_dependencies(mocker: Any, faker: Any) -> None:
     group_id: int = faker.pyint()
     is_cached: bool = faker.pybool()
-    subgroup_getter_mock: Any = mocker.Mock(**{"get_subgroup_ids.return_value": {}})
+    subgroup_getter_mock: Any = mocker.AsyncMock(**{"get_subgroup_ids.return_value": {}})
     project_0: Any = get_mocked_projects(1)[0]
-    project_getter_mock: Any = Mock(**{"batch_get_projects.return_value": [project_0]})
-    file_getter_mock: Any = Mock(
-        **{
-            "batch_get_files.side_effect": [
-                [(project_0, POETRY_LOCK_PROJECT_0)],
-                [(project_0, None)],
-            ]
-        }
-    )
+    project_getter_mock: Any = AsyncMock(**{"batch_get_projects.return_value": [project_0]})
+    file_getter_mock: Any = get_mocked_file_getter({(project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0})
 
     package_getter: PackageGetter = PackageGetter(
         subgroup_getter=subgroup_getter_mock,
         project_getter=project_getter_mock,
         file_getter=file_getter_mock,
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
     )
 
-    group_packages: Generator[GroupPackage, Any, None] = package_getter.get_group_packages(
+    group_packages: list[GroupPackage] = await package_getter.get_group_packages(
         group_id=group_id,
         is_add_transitive_dependencies=True,
         is_cached=is_cached,
@@ -134,37 +152,38 @@ def test_package_getter_is_add_transitive_dependencies(mocker: Any, faker: Any)
         },
     ]
 
-    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == [mocker.call(group_id=group_id)]
-    assert project_getter_mock.batch_get_projects.mock_calls == [mocker.call(group_ids={group_id})]
-    assert file_getter_mock.batch_get_files.mock_calls == [
-        mocker.call(projects=[project_0], file_path="poetry.lock", is_cached=is_cached),
-        mocker.call(projects=[project_0], file_path="Dockerfile", is_cached=is_cached),
+    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == [mocker.call(group_id=group_id, is_cached=is_cached)]
+    assert project_getter_mock.batch_get_projects.mock_calls == [mocker.call(group_ids={group_id}, is_cached=is_cached)]
+    assert file_getter_mock.get_file_shas.mock_calls == [mocker.call(project_id=project_0.id, is_cached=is_cached)]
+    assert file_getter_mock.get_file.mock_calls == [
+        mocker.call(
+            project_id=project_0.id,
+            file_path="poetry.lock",
+            is_cached=is_cached,
+            sha=get_mocked_file_sha(project_0.id, "poetry.lock"),
+        ),
     ]
 
 
-def test_package_getter_wo_poetry_lock_in_project_0(mocker: Any, faker: Any) -> None:
+async def test_package_getter_wo_poetry_lock_in_project_0(mocker: Any, faker: Any) -> None:
     subgroup_id: int = faker.pyint()
     group_id: int = subgroup_id + faker.pyint()
-    subgroup_getter_mock: Any = mocker.Mock(**{"get_subgroup_ids.return_value": {subgroup_id}})
+    subgroup_getter_mock: Any = mocker.AsyncMock(**{"get_subgroup_ids.return_value": {subgroup_id}})
     is_cached: bool = faker.pybool()
     project_0, project_1 = get_mocked_projects(num_of_projects=2)
-    project_getter_mock: Any = Mock(**{"batch_get_projects.return_value": [project_0, project_1]})
-    file_getter_mock: Any = Mock(
-        **{
-            "batch_get_files.side_effect": [
-                [(project_0, None), (project_1, POETRY_LOCK_PROJECT_1)],
-                [(project_1, None)],
-            ]
-        }
-    )
+    project_getter_mock: Any = AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]})
+    file_getter_mock: Any = get_mocked_file_getter({(project_1.id, "poetry.lock"): POETRY_LOCK_PROJECT_1})
 
     package_getter: PackageGetter = PackageGetter(
         subgroup_getter=subgroup_getter_mock,
         project_getter=project_getter_mock,
         file_getter=file_getter_mock,
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
     )
 
-    group_packages: Generator[GroupPackage, Any, None] = package_getter.get_group_packages(
+    group_packages: list[GroupPackage] = await package_getter.get_group_packages(
         group_id=group_id,
         is_add_transitive_dependencies=True,
         is_cached=is_cached,
@@ -183,9 +202,321 @@ def test_package_getter_wo_poetry_lock_in_project_0(mocker: Any, faker: Any) ->
         },
     ]
 
-    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == [mocker.call(group_id=group_id)]
-    assert project_getter_mock.batch_get_projects.mock_calls == [mocker.call(group_ids={group_id, subgroup_id})]
-    assert file_getter_mock.batch_get_files.mock_calls == [
-        mocker.call(projects=[project_0, project_1], file_path="poetry.lock", is_cached=is_cached),
-        mocker.call(projects=[project_1], file_path="Dockerfile", is_cached=is_cached),
+    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == [mocker.call(group_id=group_id, is_cached=is_cached)]
+    assert project_getter_mock.batch_get_projects.mock_calls == [
+        mocker.call(group_ids={group_id, subgroup_id}, is_cached=is_cached),
+    ]
+    assert file_getter_mock.get_file_shas.mock_calls == [
+        mocker.call(project_id=project_0.id, is_cached=is_cached),
+        mocker.call(project_id=project_1.id, is_cached=is_cached),
+    ]
+    assert file_getter_mock.get_file.mock_calls == [
+        mocker.call(
+            project_id=project_1.id,
+            file_path="poetry.lock",
+            is_cached=is_cached,
+            sha=get_mocked_file_sha(project_1.id, "poetry.lock"),
+        ),
+    ]
+
+
+async def test_package_getter_does_not_wait_for_slow_projects(mocker: Any) -> None:
+    project_0, project_1 = get_mocked_projects(num_of_projects=2)
+    project_0_dockerfile_requested: asyncio.Event = asyncio.Event()
+    file_getter_mock: Any = get_mocked_file_getter(
+        {
+            (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+            (project_0.id, "Dockerfile"): DOCKER_FILE_PROJECT_0,
+            (project_1.id, "poetry.lock"): POETRY_LOCK_PROJECT_1,
+        }
+    )
+    get_mocked_file = file_getter_mock.get_file.side_effect
+
+    async def get_file(project_id: int, file_path: str, is_cached: bool, sha: str | None = None) -> Any:
+        if (project_id, file_path) == (project_0.id, "Dockerfile"):
+            project_0_dockerfile_requested.set()
+        if (project_id, file_path) == (project_1.id, "poetry.lock"):
+            await project_0_dockerfile_requested.wait()
+        return await get_mocked_file(project_id=project_id, file_path=file_path, is_cached=is_cached, sha=sha)
+
+    file_getter_mock.get_file.side_effect = get_file
+
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+        project_getter=AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]}),
+        file_getter=file_getter_mock,
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
+    )
+
+    group_packages: list[GroupPackage] = await asyncio.wait_for(
+        package_getter.get_group_packages(group_id=0, is_add_transitive_dependencies=True, is_cached=False),
+        timeout=1,
+    )
+
+    assert {package["package_name"] for package in group_packages} == {
+        "common-package",
+        "different_naming",
+        "old-package",
+        "python",
+        "transitive_dependencies",
+    }
+
+
+async def test_package_getter_reuses_parsed_files(mocker: Any) -> None:
+    project_0, project_1 = get_mocked_projects(num_of_projects=2)
+    parsed_file_cache: ParsedFileCache = ParsedFileCache(max_entries=100)
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+        project_getter=AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]}),
+        file_getter=get_mocked_file_getter(
+            {
+                (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+                (project_0.id, "Dockerfile"): DOCKER_FILE_PROJECT_0,
+                (project_1.id, "poetry.lock"): POETRY_LOCK_PROJECT_1,
+            }
+        ),
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=parsed_file_cache,
+        file_parser=FileParser(max_workers=0),
+    )
+
+    first_scan: list[GroupPackage] = list(
+        await package_getter.get_group_packages(group_id=0, is_add_transitive_dependencies=True, is_cached=True),
+    )
+    tomllib_loads_spy: Any = mocker.spy(tomllib, "loads")
+    second_scan: list[GroupPackage] = list(
+        await package_getter.get_group_packages(group_id=0, is_add_transitive_dependencies=True, is_cached=True),
+    )
+
+    assert second_scan == first_scan
+    assert tomllib_loads_spy.call_count == 0
+    assert parsed_file_cache.get_stats() == {
+        "entries": 3,
+        "max_entries": 100,
+        "hits": 3,
+        "misses": 3,
+        "evictions": 0,
+    }
+
+
+async def test_package_getter_sorts_non_pep_440_versions(mocker: Any) -> None:
+    projects: list[Any] = get_mocked_projects(num_of_projects=3)
+    dockerfiles: list[bytes] = [b"FROM python:3.12-slim", b"FROM python:3.11.4", b"FROM python"]
+    files: dict[tuple[int, str], Any] = {}
+    for project, dockerfile in zip(projects, dockerfiles, strict=True):
+        files[project.id, "poetry.lock"] = POETRY_LOCK_PROJECT_1
+        files[project.id, "Dockerfile"] = SimpleNamespace(content=base64.b64encode(dockerfile).decode())
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+        project_getter=AsyncMock(**{"batch_get_projects.return_value": projects[::-1]}),
+        file_getter=get_mocked_file_getter(files),
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
+    )
+
+    group_packages: list[GroupPackage] = await package_getter.get_group_packages(
+        group_id=0,
+        is_add_transitive_dependencies=True,
+        is_cached=True,
+    )
+
+    assert [
+        (package["package_version"], [project["project_name"] for project in package["projects"]])
+        for package in group_packages
+        if package["package_name"] == "python"
+    ] == [
+        ("Version Unknown", ["test_project_2"]),
+        ("3.11.4", ["test_project_1"]),
+        ("3.12-", ["test_project_0"]),
+    ]
+    assert [project["project_name"] for project in group_packages[0]["projects"]] == [
+        "test_project_0",
+        "test_project_1",
+        "test_project_2",
+    ]
+
+
+async def test_package_getter_snapshot_rereads_active_projects(mocker: Any) -> None:
+    project_0, project_1 = get_mocked_projects(num_of_projects=2)
+    project_getter_mock: Any = AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]})
+    file_getter_mock: Any = get_mocked_file_getter(
+        {
+            (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+            (project_1.id, "poetry.lock"): POETRY_LOCK_PROJECT_1,
+        }
+    )
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+        project_getter=project_getter_mock,
+        file_getter=file_getter_mock,
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
+    )
+    first_snapshot: GroupSnapshot = await package_getter.get_group_snapshot(
+        group_id=0,
+        options=ScanOptions(is_add_transitive_dependencies=True, is_cached=True),
+    )
+    file_getter_mock.reset_mock()
+    active_project_1: Any = copy.copy(project_1)
+    active_project_1.last_activity_at = "1988-10-15T00:00:00.000Z"
+    project_getter_mock.batch_get_projects.return_value = [project_0, active_project_1]
+
+    second_snapshot: GroupSnapshot = await package_getter.get_group_snapshot(
+        group_id=0,
+        options=ScanOptions(is_add_transitive_dependencies=True, is_cached=False, previous=first_snapshot),
+    )
+
+    assert second_snapshot.group_packages == first_snapshot.group_packages
+    assert second_snapshot.projects[project_0.id] == first_snapshot.projects[project_0.id]
+    assert second_snapshot.projects[project_1.id].project == active_project_1
+    assert file_getter_mock.get_file_shas.mock_calls == [mocker.call(project_id=project_1.id, is_cached=False)]
+
+    file_getter_mock.reset_mock()
+    await package_getter.get_group_snapshot(
+        group_id=0,
+        options=ScanOptions(
+            is_add_transitive_dependencies=True,
+            is_cached=True,
+            previous=second_snapshot,
+            stale_project_ids=frozenset({project_0.id}),
+        ),
+    )
+
+    assert file_getter_mock.get_file_shas.mock_calls == [mocker.call(project_id=project_0.id, is_cached=True)]
+
+
+async def test_package_getter_snapshot_rereads_evicted_files(mocker: Any) -> None:
+    project_0: Any = get_mocked_projects(num_of_projects=1)[0]
+    file_getter_mock: Any = get_mocked_file_getter({(project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0})
+    parsed_file_cache: ParsedFileCache = ParsedFileCache(max_entries=100)
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+        project_getter=AsyncMock(**{"batch_get_projects.return_value": [project_0]}),
+        file_getter=file_getter_mock,
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=parsed_file_cache,
+        file_parser=FileParser(max_workers=0),
+    )
+    first_snapshot: GroupSnapshot = await package_getter.get_group_snapshot(
+        group_id=0,
+        options=ScanOptions(is_add_transitive_dependencies=True, is_cached=True),
+    )
+    file_getter_mock.reset_mock()
+    parsed_file_cache.parsed_files.clear()
+
+    second_snapshot: GroupSnapshot = await package_getter.get_group_snapshot(
+        group_id=0,
+        options=ScanOptions(is_add_transitive_dependencies=True, is_cached=True, previous=first_snapshot),
+    )
+
+    assert first_snapshot.projects[project_0.id].file_shas == {
+        "poetry.lock": get_mocked_file_sha(project_0.id, "poetry.lock"),
+        "Dockerfile": None,
+    }
+    assert second_snapshot.group_packages == first_snapshot.group_packages
+    assert file_getter_mock.get_file_shas.await_count == 0
+    assert file_getter_mock.get_file.mock_calls == [
+        mocker.call(
+            project_id=project_0.id,
+            file_path="poetry.lock",
+            is_cached=True,
+            sha=get_mocked_file_sha(project_0.id, "poetry.lock"),
+        ),
+    ]
+
+
+async def test_package_getter_skips_unreadable_projects(mocker: Any, faker: Any) -> None:
+    project_0, project_1 = get_mocked_projects(num_of_projects=2)
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": set()}),
+        project_getter=AsyncMock(**{"batch_get_projects.return_value": [project_0, project_1]}),
+        file_getter=get_mocked_file_getter(
+            {
+                (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+                (project_1.id, "poetry.lock"): GitLabError(status_code=403, url=faker.url()),
+            }
+        ),
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
+    )
+
+    snapshot: GroupSnapshot = await package_getter.get_group_snapshot(
+        group_id=0,
+        options=ScanOptions(is_add_transitive_dependencies=True, is_cached=True),
+    )
+
+    assert {project["project_name"] for package in snapshot.group_packages for project in package["projects"]} == {
+        project_0.name,
+    }
+    # The skipped project is not in the snapshot, so the next refresh reads it again
+    assert list(snapshot.projects) == [project_0.id]
+
+
+async def test_package_getter_includes_subgroups(mocker: Any, faker: Any) -> None:
+    group_id: int = faker.pyint()
+    subgroup_getter_mock: Any = mocker.AsyncMock()
+    project_0: Any = get_mocked_projects(num_of_projects=1)[0]
+    project_getter_mock: Any = AsyncMock(**{"get_projects.return_value": [project_0]})
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=subgroup_getter_mock,
+        project_getter=project_getter_mock,
+        file_getter=get_mocked_file_getter({(project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0}),
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
+        is_include_subgroups=True,
+    )
+
+    group_packages: list[GroupPackage] = await package_getter.get_group_packages(
+        group_id=group_id,
+        is_add_transitive_dependencies=True,
+        is_cached=True,
+    )
+
+    assert len(group_packages) == 3
+    assert project_getter_mock.get_projects.mock_calls == [
+        mocker.call(group_id=group_id, include_subgroups=True, is_cached=True),
+    ]
+    assert project_getter_mock.batch_get_projects.mock_calls == []
+    assert subgroup_getter_mock.get_subgroup_ids.mock_calls == []
+
+
+async def test_package_getter_lists_every_subgroup(mocker: Any, faker: Any) -> None:
+    group_id: int = faker.pyint()
+    subgroup_id: int = group_id + 1
+    project_0, shared_project = get_mocked_projects(num_of_projects=2)
+    project_getter_mock: Any = AsyncMock(**{"batch_get_projects.return_value": [project_0, shared_project]})
+    package_getter: PackageGetter = PackageGetter(
+        subgroup_getter=mocker.AsyncMock(**{"get_subgroup_ids.return_value": {subgroup_id}}),
+        project_getter=project_getter_mock,
+        file_getter=get_mocked_file_getter(
+            {
+                (project_0.id, "poetry.lock"): POETRY_LOCK_PROJECT_0,
+                (shared_project.id, "poetry.lock"): POETRY_LOCK_PROJECT_1,
+            }
+        ),
+        fetch_scheduler=mocker.MagicMock(),
+        parsed_file_cache=ParsedFileCache(max_entries=100),
+        file_parser=FileParser(max_workers=0),
+    )
+
+    group_packages: list[GroupPackage] = await package_getter.get_group_packages(
+        group_id=group_id,
+        is_add_transitive_dependencies=True,
+        is_cached=True,
+    )
+
+    # By default every subgroup is listed separately, so projects shared into a subgroup are scanned as well
+    assert {project["project_name"] for package in group_packages for project in package["projects"]} == {
+        project_0.name,
+        shared_project.name,
+    }
+    assert project_getter_mock.batch_get_projects.mock_calls == [
+        mocker.call(group_ids={group_id, subgroup_id}, is_cached=True),
     ]
+    assert project_getter_mock.get_projects.mock_calls == []
@@ -0,0 +1,35 @@
+from packagebusters.controllers.package_getter.index import PackageIndex
+
+
+def test_package_index() -> None:
+    package_index: PackageIndex = PackageIndex()
+    first_project_id: int = package_index.add_project(project_name="first", project_url="https://first")
+    second_project_id: int = package_index.add_project(project_name="second", project_url="https://second")
+    package_index.add(package_name="httpx", version="0.27.0", project_id=first_project_id)
+    package_index.add(package_name="fastapi", version="0.110.0", project_id=first_project_id)
+    package_index.add(package_name="httpx", version="0.27.0", project_id=second_project_id)
+    package_index.add(package_name="fastapi", version="0.99.1", project_id=second_project_id)
+
+    group_packages = package_index.get_group_packages(version_key=lambda version: tuple(map(int, version.split("."))))
+
+    assert group_packages == [
+        {
+            "package_name": "fastapi",
+            "package_version": "0.99.1",
+            "projects": [{"project_name": "second", "project_url": "https://second"}],
+        },
+        {
+            "package_name": "fastapi",
+            "package_version": "0.110.0",
+            "projects": [{"project_name": "first", "project_url": "https://first"}],
+        },
+        {
+            "package_name": "httpx",
+            "package_version": "0.27.0",
+            "projects": [
+                {"project_name": "first", "project_url": "https://first"},
+                {"project_name": "second", "project_url": "https://second"},
+            ],
+        },
+    ]
+    assert list(package_index.package_ids) == [0, 1, 0, 1]
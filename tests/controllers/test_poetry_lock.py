@@ -0,0 +1,75 @@
+import base64
+import tomllib
+
+import pytest
+
+from packagebusters.controllers.package_getter.poetry_lock import (
+    UnsupportedPoetryLockError,
+    scan_poetry_lock_packages,
+)
+from tests.fixtures.files import POETRY_LOCK_PROJECT_0, POETRY_LOCK_PROJECT_1
+
+
+POETRY_LOCK: bytes = b"""
+# This file is automatically @generated by Poetry 1.8.2 and should not be changed by hand.
+
+[[package]]
+name = "anyio"
+version = "4.3.0"
+description = "High level compatibility layer for multiple asynchronous event loop implementations"
+optional = false
+python-versions = ">=3.8"
+files = [
+    {file = "anyio-4.3.0-py3-none-any.whl", hash = "sha256:048e05d0f6caeed70d731f3db756d35dcc1f3574"},
+    {file = "anyio-4.3.0.tar.gz", hash = "sha256:f75253795a87df48568485fd18cdafeb2bbc2d48c60d0567a8d4b66ce45c6"},
+]
+
+[package.dependencies]
+idna = ">=2.8"
+"backports.zoneinfo" = {version = "*", markers = "python_version < \\"3.9\\""}
+
+[package.extras]
+doc = ["packaging", "Sphinx (>=7)"]
+
+[[package]]
+name = 'idna'  # literal string
+version = "3.6"
+description = "Internationalized Domain Names in Applications (IDNA)"
+
+[metadata]
+lock-version = "2.0"
+python-versions = "^3.12"
+content-hash = "9f3b1d2e"
+"""
+
+
+def get_tomllib_packages(poetry_lock: bytes) -> dict[str, str]:
+    return {package["name"]: package["version"] for package in tomllib.loads(poetry_lock.decode())["package"]}
+
+
+@pytest.mark.parametrize(
+    "poetry_lock",
+    [
+        POETRY_LOCK,
+        POETRY_LOCK.replace(b"\n", b"\r\n"),
+        base64.b64decode(POETRY_LOCK_PROJECT_0.content),
+        base64.b64decode(POETRY_LOCK_PROJECT_1.content),
+    ],
+)
+def test_scan_poetry_lock_packages(poetry_lock: bytes) -> None:
+    assert scan_poetry_lock_packages(poetry_lock) == get_tomllib_packages(poetry_lock)
+
+
+@pytest.mark.parametrize(
+    "poetry_lock",
+    [
+        b'[[package]]\nname = "anyio"\ndescription = """\nname = "fake"\n"""\nversion = "4.3.0"\n',
+        b'[[package]]\n"name" = "anyio"\nversion = "4.3.0"\n',
+        b'[[package]]\nname = "any\\u0069o"\nversion = "4.3.0"\n',
+        b'[[package]]\nname = "anyio"\n\n[package.dependencies]\nidna = ">=2.8"\n',
+        b'[[package]]\nname = "anyio"\nname = "idna"\nversion = "4.3.0"\n',
+    ],
+)
+def test_scan_unusual_poetry_lock(poetry_lock: bytes) -> None:
+    with pytest.raises(UnsupportedPoetryLockError):
+        scan_poetry_lock_packages(poetry_lock)
@@ -1,62 +1,73 @@
 from types import SimpleNamespace
 from typing import Any
 
+import pytest
+
+from packagebusters.controllers.cache.listing_cache import ListingCache
+from packagebusters.controllers.gitlab_client.exceptions import GitLabNotFoundError
 from packagebusters.controllers.project_getter.controller import ProjectGetter
 from packagebusters.controllers.project_getter.interfaces import IGroupProject
+from packagebusters.exceptions import BadGitlabGroupIdError
 
 
-def test_project_getter(faker: Any, mocker: Any) -> None:
+async def test_project_getter(faker: Any, mocker: Any) -> None:
     project_id: int = faker.pyint()
     project_name: str = faker.pystr()
     project_web_url: str = faker.pystr()
-    gitlab_client_mock: Any = mocker.Mock(
+    gitlab_client_mock: Any = mocker.AsyncMock(
         **{
-            "groups.get.return_value": mocker.Mock(
-                **{
-                    "projects.list.return_value": [
-                        SimpleNamespace(
-                            id=project_id,
-                            name=project_name,
-                            web_url=project_web_url,
-                        ),
-                    ],
-                },
-            ),
+            "get_group_projects.return_value": [
+                SimpleNamespace(
+                    id=project_id,
+                    name=project_name,
+                    web_url=project_web_url,
+                ),
+            ],
         },
     )
     group_id: int = faker.pyint()
-    project_getter: ProjectGetter = ProjectGetter(gitlab_client=gitlab_client_mock)
+    project_getter: ProjectGetter = ProjectGetter(
+        gitlab_client=gitlab_client_mock,
+        listing_cache=ListingCache(ttl=60, stale_ttl=3600),
+    )
 
-    projects: list[IGroupProject] = project_getter.get_projects(group_id=group_id)
+    projects: list[IGroupProject] = await project_getter.get_projects(group_id=group_id)
 
     assert len(projects) == 1
     assert projects[0].id == project_id
     assert projects[0].name == project_name
     assert projects[0].web_url == project_web_url
-    assert gitlab_client_mock.groups.get.mock_calls == [
-        mocker.call(group_id),
-        mocker.call().projects.list(iterator=True, archived=False),
+    assert gitlab_client_mock.get_group_projects.mock_calls == [
+        mocker.call(group_id=group_id, include_subgroups=False),
     ]
 
 
-def test_batch_get_project(faker: Any, mocker: Any) -> None:
+async def test_batch_get_project(faker: Any, mocker: Any) -> None:
     group_ids: set[int] = {faker.pyint() * 2}
     project_1: SimpleNamespace = SimpleNamespace(id=faker.pyint(), name=faker.pystr(), web_url=faker.pystr())
     project_2: SimpleNamespace = SimpleNamespace(id=faker.pyint(), name=faker.pystr(), web_url=faker.pystr())
-    gitlab_client_mock: Any = mocker.Mock(
-        **{
-            "groups.get.return_value": mocker.Mock(
-                **{
-                    "projects.list.side_effect": [[project_1, project_2]],
-                },
-            ),
-        },
-    )
+    gitlab_client_mock: Any = mocker.AsyncMock(**{"get_group_projects.side_effect": [[project_1, project_2]]})
 
-    project_getter: ProjectGetter = ProjectGetter(gitlab_client=gitlab_client_mock)
+    project_getter: ProjectGetter = ProjectGetter(
+        gitlab_client=gitlab_client_mock,
+        listing_cache=ListingCache(ttl=60, stale_ttl=3600),
+    )
 
-    projects: list[IGroupProject] = project_getter.batch_get_projects(group_ids=group_ids)
+    projects: list[IGroupProject] = await project_getter.batch_get_projects(group_ids=group_ids)
 
     assert len(projects) == 2
     assert project_1 in projects
     assert project_2 in projects
+
+
+async def test_get_projects_bad_group_id(faker: Any, mocker: Any) -> None:
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{"get_group_projects.side_effect": GitLabNotFoundError(status_code=404, url=faker.url())},
+    )
+    project_getter: ProjectGetter = ProjectGetter(
+        gitlab_client=gitlab_client_mock,
+        listing_cache=ListingCache(ttl=60, stale_ttl=3600),
+    )
+
+    with pytest.raises(BadGitlabGroupIdError):
+        await project_getter.get_projects(group_id=faker.pyint(), include_subgroups=True)
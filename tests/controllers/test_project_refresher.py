@@ -0,0 +1,45 @@
+from typing import Any
+
+from packagebusters.controllers.project_refresher.controller import ProjectRefresher
+from tests.fixtures.mockers import get_mocked_file_getter, get_mocked_file_sha
+
+
+async def test_project_refresher(mocker: Any, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    file_getter_mock: Any = get_mocked_file_getter(
+        {(project_id, "poetry.lock"): faker.pystr(), (project_id, "pyproject.toml"): faker.pystr()},
+    )
+    group_index_mock: Any = mocker.AsyncMock()
+    project_refresher: ProjectRefresher = ProjectRefresher(
+        file_getter=file_getter_mock,
+        group_index=group_index_mock,
+        fetch_scheduler=mocker.MagicMock(),
+    )
+
+    await project_refresher.refresh_project(project_id=project_id, file_paths={"poetry.lock", "Dockerfile"})
+
+    assert file_getter_mock.get_file_shas.mock_calls == [mocker.call(project_id=project_id, is_cached=False)]
+    assert file_getter_mock.get_file.mock_calls == [
+        mocker.call(
+            project_id=project_id,
+            file_path="poetry.lock",
+            is_cached=False,
+            sha=get_mocked_file_sha(project_id, "poetry.lock"),
+        ),
+    ]
+    assert group_index_mock.refresh_project.mock_calls == [mocker.call(project_id=project_id)]
+    assert project_refresher.get_stats() == {"refreshes": 1, "errors": 0}
+
+
+async def test_project_refresher_errors(mocker: Any, faker: Any) -> None:
+    group_index_mock: Any = mocker.AsyncMock()
+    project_refresher: ProjectRefresher = ProjectRefresher(
+        file_getter=mocker.AsyncMock(**{"get_file_shas.side_effect": OSError}),
+        group_index=group_index_mock,
+        fetch_scheduler=mocker.MagicMock(),
+    )
+
+    await project_refresher.refresh_project(project_id=faker.pyint(), file_paths={"poetry.lock"})
+
+    assert group_index_mock.refresh_project.mock_calls == []
+    assert project_refresher.get_stats() == {"refreshes": 0, "errors": 1}
@@ -0,0 +1,120 @@
+import ssl
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from freezegun import freeze_time
+
+from packagebusters.controllers.cache.redis_cache import RedisFileCache
+from packagebusters.controllers.cache.redis_client import RedisClient
+from packagebusters.controllers.file_getter.controller import ProjectFile
+from tests.fixtures.redis_server import RedisServer
+
+
+async def test_redis_file_cache(faker: Any) -> None:
+    project_id: int = faker.pyint()
+    file: ProjectFile = ProjectFile(content=faker.text(), sha=faker.sha1())
+
+    async with RedisServer() as server, RedisFileCache(dsn=server.dsn, max_connections=2, ttl=60) as cache:
+        with freeze_time("1988-10-14"):
+            await cache.set(project_id=project_id, file_path="poetry.lock", content=file)
+
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") == file
+        assert await cache.get_created_at(project_id=project_id, file_path="poetry.lock") == datetime(
+            1988, 10, 14, tzinfo=UTC
+        )
+
+        await cache.delete(project_id=project_id, file_path="poetry.lock")
+
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
+
+    assert server.expirations == {f"packagebusters:file:{project_id}:poetry.lock".encode(): 60}
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "errors": 0}
+
+
+async def test_redis_file_cache_get_many(faker: Any) -> None:
+    project_id: int = faker.pyint()
+    content: str = faker.text()
+
+    async with RedisServer() as server, RedisFileCache(dsn=server.dsn, max_connections=2) as cache:
+        await cache.set(project_id=project_id, file_path="poetry.lock", content=content)
+        server.commands.clear()
+
+        files: dict[tuple[int, str], Any] = await cache.get_many(
+            [(project_id, "poetry.lock"), (project_id, "Dockerfile")],
+        )
+
+    assert files == {(project_id, "poetry.lock"): content}
+    assert server.commands == [
+        [
+            b"MGET",
+            f"packagebusters:file:{project_id}:poetry.lock".encode(),
+            f"packagebusters:file:{project_id}:Dockerfile".encode(),
+        ],
+    ]
+
+
+async def test_redis_file_cache_unavailable(faker: Any) -> None:
+    async with RedisServer() as server:
+        dsn: str = server.dsn
+
+    async with RedisFileCache(dsn=dsn, max_connections=1) as cache:
+        await cache.set(project_id=faker.pyint(), file_path="poetry.lock", content=faker.text())
+
+        assert await cache.get(project_id=faker.pyint(), file_path="poetry.lock") is None
+        assert cache.get_stats() == {"hits": 0, "misses": 1, "errors": 2}
+
+
+async def test_redis_file_cache_error_reply(faker: Any) -> None:
+    project_id: int = faker.pyint()
+
+    async with RedisServer() as server, RedisFileCache(dsn=server.dsn, max_connections=1) as cache:
+        server.error = "LOADING Redis is loading the dataset in memory"
+        await cache.set(project_id=project_id, file_path="poetry.lock", content=faker.text())
+        await cache.delete(project_id=project_id, file_path="poetry.lock")
+
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
+        assert cache.get_stats() == {"hits": 0, "misses": 1, "errors": 3}
+
+
+async def test_redis_file_cache_timeout(faker: Any) -> None:
+    project_id: int = faker.pyint()
+
+    async with RedisServer() as server, RedisFileCache(dsn=server.dsn, max_connections=1, timeout=0.05) as cache:
+        server.is_hanging = True
+
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
+
+        server.is_hanging = False
+        await cache.set(project_id=project_id, file_path="poetry.lock", content="content")
+
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") == "content"
+        assert cache.get_stats() == {"hits": 1, "misses": 1, "errors": 1}
+
+
+async def test_redis_file_cache_skips_undecodable_files(faker: Any) -> None:
+    project_id: int = faker.pyint()
+
+    async with RedisServer() as server, RedisFileCache(dsn=server.dsn, max_connections=1) as cache:
+        await cache.set(project_id=project_id, file_path="poetry.lock", content=faker.text())
+        # An entry pickled by an older version is not unpickled
+        server.data[f"packagebusters:file:{project_id}:poetry.lock".encode()] = b"\x80\x04\x95"
+
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
+        assert cache.get_stats() == {"hits": 0, "misses": 1, "errors": 1}
+
+
+async def test_redis_client_tls(mocker: Any) -> None:
+    open_connection_mock: Any = mocker.patch("asyncio.open_connection", side_effect=ConnectionRefusedError)
+    client: RedisClient = RedisClient(dsn="rediss://redis.example.com:6380/0", max_connections=1)
+
+    with pytest.raises(ConnectionRefusedError):
+        await client.execute("PING")
+
+    assert isinstance(open_connection_mock.call_args.kwargs["ssl"], ssl.SSLContext)
+    assert open_connection_mock.call_args.args == ("redis.example.com", 6380)
+
+
+def test_redis_client_unsupported_scheme() -> None:
+    with pytest.raises(ValueError, match="unix"):
+        RedisClient(dsn="unix:///var/run/redis.sock", max_connections=1)
@@ -0,0 +1,93 @@
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+from freezegun import freeze_time
+
+from packagebusters.controllers.cache.sqlite import SQLiteFileCache
+from packagebusters.controllers.file_getter.controller import ProjectFile
+
+
+async def test_sqlite_file_cache_survives_restart(tmp_path: Path, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    path: str = str(tmp_path / "cache" / "file_cache.sqlite3")
+    file: ProjectFile = ProjectFile(content=faker.text(), sha=faker.sha1())
+
+    async with SQLiteFileCache(path=path) as cache:
+        await cache.set(project_id=project_id, file_path="poetry.lock", content=file)
+        await cache.set(project_id=project_id, file_path="Dockerfile", content=ProjectFile(content=""))
+        await cache.delete(project_id=project_id, file_path="Dockerfile")
+
+    async with SQLiteFileCache(path=path) as cache:
+        assert cache.get_stats()["warmed"] == 1
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") == file
+        assert await cache.get(project_id=project_id, file_path="Dockerfile") is None
+
+
+async def test_sqlite_file_cache_reads_evicted_files_from_disk(tmp_path: Path, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    content: str = faker.text()
+
+    async with SQLiteFileCache(path=str(tmp_path / "file_cache.sqlite3"), max_entries=1) as cache:
+        await cache.set(project_id=project_id, file_path="poetry.lock", content=content)
+        await cache.set(project_id=project_id, file_path="Dockerfile", content=faker.text())
+
+        assert cache.get_stats()["entries"] == 1
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") == content
+
+
+async def test_sqlite_file_cache_skips_expired_files(tmp_path: Path, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    path: str = str(tmp_path / "file_cache.sqlite3")
+
+    with freeze_time("1988-10-14 00:00:00"):
+        async with SQLiteFileCache(path=path, ttl=60) as cache:
+            await cache.set(project_id=project_id, file_path="poetry.lock", content=faker.text())
+
+    with freeze_time("1988-10-14 00:01:00"):
+        async with SQLiteFileCache(path=path, ttl=60) as cache:
+            assert cache.get_stats()["warmed"] == 0
+            assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
+
+
+async def test_sqlite_file_cache_warms_newest_files(tmp_path: Path, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    path: str = str(tmp_path / "file_cache.sqlite3")
+
+    async with SQLiteFileCache(path=path) as cache:
+        for minute, file_path in enumerate(("poetry.lock", "pyproject.toml", "Dockerfile")):
+            with freeze_time(f"1988-10-14 00:0{minute}:00"):
+                await cache.set(project_id=project_id, file_path=file_path, content=faker.text())
+
+    async with SQLiteFileCache(path=path, max_entries=2) as cache:
+        assert cache.get_stats()["warmed"] == 2
+        assert list(cache.file_cache) == [(project_id, "pyproject.toml"), (project_id, "Dockerfile")]
+
+
+async def test_sqlite_file_cache_prunes_expired_files(tmp_path: Path, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    path: Path = tmp_path / "file_cache.sqlite3"
+
+    with freeze_time("1988-10-14 00:00:00") as frozen_time:
+        async with SQLiteFileCache(path=str(path), ttl=60) as cache:
+            await cache.set(project_id=project_id, file_path="poetry.lock", content=faker.text())
+            frozen_time.move_to("1988-10-14 00:10:00")
+            await cache.set(project_id=project_id, file_path="Dockerfile", content=faker.text())
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT file_path FROM files").fetchall() == [("Dockerfile",)]
+
+
+async def test_sqlite_file_cache_skips_undecodable_files(tmp_path: Path, faker: Any) -> None:
+    project_id: int = faker.pyint()
+    path: Path = tmp_path / "file_cache.sqlite3"
+
+    async with SQLiteFileCache(path=str(path)) as cache:
+        await cache.set(project_id=project_id, file_path="poetry.lock", content=faker.text())
+    # A row pickled by an older version is not unpickled
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE files SET content = ?", (b"\x80\x04\x95",))
+
+    async with SQLiteFileCache(path=str(path)) as cache:
+        assert cache.get_stats()["warmed"] == 0
+        assert await cache.get(project_id=project_id, file_path="poetry.lock") is None
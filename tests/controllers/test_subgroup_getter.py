@@ -2,44 +2,70 @@ from types import SimpleNamespace
 from typing import Any
 
 import pytest
-from gitlab import GitlabGetError
 
+from packagebusters.controllers.cache.listing_cache import ListingCache
+from packagebusters.controllers.gitlab_client.exceptions import GitLabNotFoundError
 from packagebusters.controllers.subgroup_getter.controller import SubGroupGetter
 from packagebusters.exceptions import BadGitlabGroupIdError
 
 
-def test_subgroup_getter(faker: Any, mocker: Any) -> None:
+async def test_subgroup_getter(faker: Any, mocker: Any) -> None:
     subgroup_id: int = faker.pyint()
-    gitlab_client_mock: Any = mocker.Mock(
+    group_id: int = faker.pyint()
+    gitlab_client_mock: Any = mocker.AsyncMock(
         **{
-            "groups.get.return_value": mocker.Mock(
-                **{
-                    "descendant_groups.list.return_value": [
-                        SimpleNamespace(id=subgroup_id),
-                        SimpleNamespace(id=subgroup_id + 1),
-                    ],
-                },
-            ),
+            "get_descendant_groups.return_value": [
+                SimpleNamespace(id=subgroup_id, parent_id=group_id),
+                SimpleNamespace(id=subgroup_id + 1, parent_id=group_id),
+            ],
         },
     )
-    group_id: int = faker.pyint()
-    subgroup_getter: SubGroupGetter = SubGroupGetter(gitlab_client=gitlab_client_mock)
+    subgroup_getter: SubGroupGetter = SubGroupGetter(
+        gitlab_client=gitlab_client_mock,
+        listing_cache=ListingCache(ttl=60, stale_ttl=3600),
+    )
 
-    subgroups: set[int] = subgroup_getter.get_subgroup_ids(group_id=group_id)
+    subgroups: set[int] = await subgroup_getter.get_subgroup_ids(group_id=group_id)
 
     assert subgroups == {subgroup_id, subgroup_id + 1}
-    assert gitlab_client_mock.groups.get.mock_calls == [
-        mocker.call(group_id, archived=False),
-        mocker.call().descendant_groups.list(iterator=True),
-    ]
+    assert gitlab_client_mock.get_descendant_groups.mock_calls == [mocker.call(group_id=group_id)]
 
 
-def test_subgroup_getter_invalid_group(faker: Any, mocker: Any) -> None:
-    gitlab_client_mock: Any = mocker.Mock(
-        **{"groups.get.side_effect": GitlabGetError()},
+async def test_subgroup_getter_invalid_group(faker: Any, mocker: Any) -> None:
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{"get_descendant_groups.side_effect": GitLabNotFoundError(status_code=404, url=faker.url())},
     )
     group_id: int = faker.pyint()
-    subgroup_getter: SubGroupGetter = SubGroupGetter(gitlab_client=gitlab_client_mock)
+    subgroup_getter: SubGroupGetter = SubGroupGetter(
+        gitlab_client=gitlab_client_mock,
+        listing_cache=ListingCache(ttl=60, stale_ttl=3600),
+    )
 
     with pytest.raises(BadGitlabGroupIdError, match=f"Group {group_id} not found"):
-        subgroup_getter.get_subgroup_ids(group_id=group_id)
+        await subgroup_getter.get_subgroup_ids(group_id=group_id)
+
+
+async def test_subgroup_getter_reuses_parent_tree(mocker: Any) -> None:
+    gitlab_client_mock: Any = mocker.AsyncMock(
+        **{
+            "get_descendant_groups.return_value": [
+                SimpleNamespace(id=2, parent_id=1),
+                SimpleNamespace(id=3, parent_id=2),
+                SimpleNamespace(id=4, parent_id=3),
+                SimpleNamespace(id=5, parent_id=1),
+            ],
+        },
+    )
+    subgroup_getter: SubGroupGetter = SubGroupGetter(
+        gitlab_client=gitlab_client_mock,
+        listing_cache=ListingCache(ttl=60, stale_ttl=3600),
+    )
+
+    assert await subgroup_getter.get_subgroup_ids(group_id=1) == {2, 3, 4, 5}
+    assert await subgroup_getter.get_subgroup_ids(group_id=2) == {3, 4}
+    assert await subgroup_getter.get_subgroup_ids(group_id=4) == set()
+    assert gitlab_client_mock.get_descendant_groups.mock_calls == [mocker.call(group_id=1)]
+
+    await subgroup_getter.get_subgroup_ids(group_id=2, is_cached=False)
+
+    assert gitlab_client_mock.get_descendant_groups.mock_calls == [mocker.call(group_id=1), mocker.call(group_id=2)]
@@ -0,0 +1,15 @@
+from collections.abc import Callable
+from typing import Any
+
+from packagebusters.endpoints.metrics.metrics import MetricsEndpoint
+
+
+async def test_metrics(test_client: Callable, mocker: Any, faker: Any) -> None:
+    stats: dict[str, int] = {faker.pystr(): faker.pyint()}
+    stats_provider_mock: Any = mocker.Mock(**{"get_stats.return_value": stats})
+    endpoint: MetricsEndpoint = MetricsEndpoint(stats_providers={"fetch_scheduler": stats_provider_mock})
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.json() == {"fetch_scheduler": stats}
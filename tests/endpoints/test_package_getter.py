@@ -1,3 +1,4 @@
+import json
 from collections.abc import Callable
 from typing import Any
 
@@ -10,7 +11,7 @@ async def test_package_getter(test_client: Callable, mocker: Any, faker: Any) ->
     package_version: str = faker.pystr()
     project_name: str = faker.pystr()
     project_url: str = faker.pystr()
-    package_getter_mock: Any = mocker.Mock(
+    package_getter_mock: Any = mocker.AsyncMock(
         **{
             "get_group_packages.return_value": [
                 IGroupPackage(
@@ -50,3 +51,23 @@ async def test_package_getter(test_client: Callable, mocker: Any, faker: Any) ->
             is_cached=is_cached,
         ),
     ]
+
+
+async def test_package_getter_stream(test_client: Callable, mocker: Any, faker: Any) -> None:
+    group_packages: list[IGroupPackage] = [
+        IGroupPackage(
+            package_name=f"package-{i:04}",
+            package_version=faker.pystr(),
+            projects=[IProject(project_name=faker.pystr(), project_url=faker.pystr())],
+        )
+        for i in range(1001)
+    ]
+    package_getter_mock: Any = mocker.AsyncMock(**{"get_group_packages.return_value": group_packages})
+    endpoint: PackageGetterEndpoint = PackageGetterEndpoint(package_getter=package_getter_mock)
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.get(f"/groups/{faker.pyint()}/packages", params={"stream": True})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in resp.text.splitlines()] == group_packages
@@ -0,0 +1,142 @@
+from collections.abc import Callable
+from typing import Any
+
+from packagebusters.endpoints.webhook.webhook import WebhookEndpoint
+
+
+def get_push_event(project_id: int, ref: str = "refs/heads/master", **commit: list[str]) -> dict[str, Any]:
+    return {
+        "object_kind": "push",
+        "ref": ref,
+        "project_id": project_id,
+        "commits": [{"added": [], "modified": [], "removed": [], **commit}],
+        "total_commits_count": 1,
+    }
+
+
+async def test_webhook_refreshes_project(test_client: Callable, mocker: Any, faker: Any) -> None:
+    token: str = faker.pystr()
+    project_id: int = faker.pyint()
+    project_refresher_mock: Any = mocker.AsyncMock()
+    endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=project_refresher_mock, listing_cache=mocker.MagicMock(), token=token
+    )
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.post(
+            "/webhooks/gitlab",
+            json=get_push_event(project_id, modified=["poetry.lock", "README.md"], removed=["Dockerfile"]),
+            headers={"X-Gitlab-Token": token},
+        )
+
+    assert resp.status_code == 202
+    assert resp.json() == {"is_refreshed": True}
+    assert project_refresher_mock.refresh_project.mock_calls == [
+        mocker.call(project_id=project_id, file_paths={"poetry.lock", "Dockerfile"}),
+    ]
+
+
+async def test_webhook_skips_untracked_changes(test_client: Callable, mocker: Any, faker: Any) -> None:
+    token: str = faker.pystr()
+    project_refresher_mock: Any = mocker.AsyncMock()
+    endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=project_refresher_mock, listing_cache=mocker.MagicMock(), token=token
+    )
+
+    with test_client([endpoint.router]) as client:
+        responses: list = [
+            await client.post("/webhooks/gitlab", json=event, headers={"X-Gitlab-Token": token})
+            for event in (
+                get_push_event(faker.pyint(), modified=["README.md"]),
+                get_push_event(faker.pyint(), ref="refs/heads/feature", modified=["poetry.lock"]),
+                {"object_kind": "merge_request", "project": {"id": faker.pyint()}},
+            )
+        ]
+
+    assert [resp.json() for resp in responses] == [{"is_refreshed": False}] * 3
+    assert project_refresher_mock.refresh_project.mock_calls == []
+
+
+async def test_webhook_rejects_malformed_push(test_client: Callable, mocker: Any, faker: Any) -> None:
+    token: str = faker.pystr()
+    project_refresher_mock: Any = mocker.AsyncMock()
+    endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=project_refresher_mock, listing_cache=mocker.MagicMock(), token=token
+    )
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.post(
+            "/webhooks/gitlab",
+            json={"object_kind": "push", "project_id": "abc"},
+            headers={"X-Gitlab-Token": token},
+        )
+
+    assert resp.status_code == 422
+    assert project_refresher_mock.refresh_project.mock_calls == []
+
+
+async def test_webhook_refreshes_all_files_of_long_pushes(test_client: Callable, mocker: Any, faker: Any) -> None:
+    token: str = faker.pystr()
+    project_id: int = faker.pyint()
+    project_refresher_mock: Any = mocker.AsyncMock()
+    endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=project_refresher_mock, listing_cache=mocker.MagicMock(), token=token
+    )
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.post(
+            "/webhooks/gitlab",
+            json=get_push_event(project_id, modified=["README.md"]) | {"total_commits_count": 21},
+            headers={"X-Gitlab-Token": token},
+        )
+
+    assert resp.json() == {"is_refreshed": True}
+    assert project_refresher_mock.refresh_project.mock_calls == [
+        mocker.call(project_id=project_id, file_paths={"poetry.lock", "pyproject.toml", "Dockerfile"}),
+    ]
+
+
+async def test_webhook_rejects_invalid_token(test_client: Callable, mocker: Any, faker: Any) -> None:
+    project_refresher_mock: Any = mocker.AsyncMock()
+    endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=project_refresher_mock, listing_cache=mocker.MagicMock(), token=faker.pystr()
+    )
+    disabled_endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=project_refresher_mock, listing_cache=mocker.MagicMock(), token=""
+    )
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.post(
+            "/webhooks/gitlab",
+            json=get_push_event(faker.pyint(), modified=["poetry.lock"]),
+            headers={"X-Gitlab-Token": faker.pystr()},
+        )
+    with test_client([disabled_endpoint.router]) as client:
+        disabled_resp = await client.post(
+            "/webhooks/gitlab",
+            json=get_push_event(faker.pyint(), modified=["poetry.lock"]),
+        )
+
+    assert resp.status_code == 401
+    assert disabled_resp.status_code == 401
+    assert project_refresher_mock.refresh_project.mock_calls == []
+
+
+async def test_webhook_invalidates_listings(test_client: Callable, mocker: Any, faker: Any) -> None:
+    token: str = faker.pystr()
+    listing_cache_mock: Any = mocker.MagicMock()
+    endpoint: WebhookEndpoint = WebhookEndpoint(
+        project_refresher=mocker.AsyncMock(),
+        listing_cache=listing_cache_mock,
+        token=token,
+    )
+
+    with test_client([endpoint.router]) as client:
+        resp = await client.post(
+            "/webhooks/gitlab",
+            json={"event_name": "project_create", "project_id": faker.pyint()},
+            headers={"X-Gitlab-Token": token},
+        )
+
+    assert resp.json() == {"is_refreshed": True}
+    assert listing_cache_mock.invalidate.mock_calls == [mocker.call()]
@@ -1,4 +1,6 @@
 from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
 
 
 class HashableSimpleNamespace(SimpleNamespace):
@@ -8,6 +10,39 @@ class HashableSimpleNamespace(SimpleNamespace):
 
 def get_mocked_projects(num_of_projects: int) -> list[HashableSimpleNamespace]:
     return [
-        HashableSimpleNamespace(id=i, name=f"test_project_{i}", web_url=f"https://test_project_{i}")
+        HashableSimpleNamespace(
+            id=i,
+            name=f"test_project_{i}",
+            web_url=f"https://test_project_{i}",
+            last_activity_at="1988-10-14T00:00:00.000Z",
+        )
         for i in range(num_of_projects)
     ]
+
+
+def get_mocked_file_sha(project_id: int, file_path: str) -> str:
+    return f"{project_id}:{file_path}"
+
+
+def get_mocked_file_getter(files: dict[tuple[int, str], Any]) -> AsyncMock:
+    async def get_file_shas(project_id: int, is_cached: bool) -> dict[str, str]:  # noqa: ARG001
+        return {
+            file_path: get_mocked_file_sha(project_id, file_path)
+            for file_project_id, file_path in files
+            if file_project_id == project_id
+        }
+
+    async def get_file(project_id: int, file_path: str, is_cached: bool, sha: str | None = None) -> Any:  # noqa: ARG001
+        file: Any = files.get((project_id, file_path))
+        if isinstance(file, Exception):
+            raise file
+        return file
+
+    return AsyncMock(**{"get_file_shas.side_effect": get_file_shas, "get_file.side_effect": get_file})
+
+
+def get_mocked_file_cache(content: Any = None) -> AsyncMock:
+    async def get_many(keys: list[tuple[int, str]]) -> dict[tuple[int, str], Any]:
+        return dict.fromkeys(keys, content) if content is not None else {}
+
+    return AsyncMock(**{"get_many.side_effect": get_many})
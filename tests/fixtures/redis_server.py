@@ -0,0 +1,80 @@
+import asyncio
+from types import TracebackType
+from typing import Any, Self
+
+
+class RedisServer:
+    """Local stand-in for Redis that speaks enough RESP for the file cache."""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, bytes] = {}
+        self.expirations: dict[bytes, int] = {}
+        self.commands: list[list[bytes]] = []
+        # Error replied to every command and whether commands are left unanswered
+        self.error: str | None = None
+        self.is_hanging: bool = False
+        self.server: asyncio.Server | None = None
+
+    @property
+    def dsn(self) -> str:
+        assert self.server is not None
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"redis://{host}:{port}/0"
+
+    async def __aenter__(self) -> Self:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                count: int = int((await reader.readuntil(b"\r\n"))[1:-2])
+                command: list[bytes] = []
+                for _ in range(count):
+                    length: int = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    command.append((await reader.readexactly(length + 2))[:-2])
+                self.commands.append(command)
+                if self.is_hanging:
+                    continue
+                writer.write(f"-{self.error}\r\n".encode() if self.error else self._encode(self._execute(command)))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    def _execute(self, command: list[bytes]) -> Any:
+        name, *args = command
+        match name.upper():
+            case b"GET":
+                return self.data.get(args[0])
+            case b"MGET":
+                return [self.data.get(key) for key in args]
+            case b"SET":
+                self.data[args[0]] = args[1]
+                if len(args) == 4 and args[2].upper() == b"EX":
+                    self.expirations[args[0]] = int(args[3])
+                return "OK"
+            case b"DEL":
+                return sum(self.data.pop(key, None) is not None for key in args)
+        return "OK"
+
+    @classmethod
+    def _encode(cls, value: Any) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        if isinstance(value, int):
+            return f":{value}\r\n".encode()
+        if isinstance(value, bytes):
+            return b"$%d\r\n%b\r\n" % (len(value), value)
+        return b"*%d\r\n" % len(value) + b"".join(cls._encode(item) for item in value)
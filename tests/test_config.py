@@ -1,10 +1,35 @@
 """Tests for Packagebusters config."""
 
 from packagebusters.config import Settings
-from tests.conftest import patch_settings_context
+from tests.conftest import SETTINGS, patch_settings_context
 
 
-INSENSITIVE_SETTINGS: set[str] = {"gitlab_url", "gitlab_api_version"}
+INSENSITIVE_SETTINGS: set[str] = {
+    "gitlab_url",
+    "gitlab_api_version",
+    "gitlab_max_concurrency",
+    "gitlab_min_concurrency",
+    "gitlab_max_retries",
+    "gitlab_max_connections",
+    "gitlab_keepalive_expiry",
+    "gitlab_http2",
+    "gitlab_include_subgroups",
+    "gitlab_graphql_batch_size",
+    "file_cache_max_entries",
+    "file_cache_max_bytes",
+    "file_cache_ttl",
+    "file_cache_backend",
+    "file_cache_sqlite_path",
+    "file_cache_redis_max_connections",
+    "file_cache_redis_timeout",
+    "parsed_file_cache_max_entries",
+    "listing_cache_ttl",
+    "listing_cache_stale_ttl",
+    "file_parser_max_workers",
+    "group_index_refresh_interval",
+    "group_index_full_refresh_interval",
+    "group_index_idle_timeout",
+}
 
 
 def test_config() -> None:
@@ -17,3 +42,17 @@ def test_config() -> None:
                 unmasked_settings.add(key)
 
     assert unmasked_settings == INSENSITIVE_SETTINGS
+
+
+def test_config_gitlab_max_connections() -> None:
+    """Connection pool matches the concurrency unless set."""
+    with patch_settings_context(GITLAB_MAX_CONCURRENCY="12"):
+        assert Settings(gitlab_token=SETTINGS["GITLAB_TOKEN"]).gitlab_max_connections == 12
+    with patch_settings_context(GITLAB_MAX_CONCURRENCY="12", GITLAB_MAX_CONNECTIONS="20"):
+        assert Settings(gitlab_token=SETTINGS["GITLAB_TOKEN"]).gitlab_max_connections == 20
+
+
+def test_config_gitlab_include_subgroups() -> None:
+    """Subgroups are listed separately unless asked, the single listing leaves out shared projects."""
+    with patch_settings_context():
+        assert Settings(gitlab_token=SETTINGS["GITLAB_TOKEN"]).gitlab_include_subgroups is False
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from packagebusters.single_flight import SingleFlight
+
+
+async def test_single_flight(mocker: Any) -> None:
+    started: asyncio.Event = asyncio.Event()
+    release: asyncio.Event = asyncio.Event()
+
+    async def fetch(value: int) -> int:
+        started.set()
+        await release.wait()
+        return value * 10
+
+    fetch_mock: Any = mocker.AsyncMock(side_effect=fetch)
+    single_flight: SingleFlight[str, int] = SingleFlight()
+
+    first: asyncio.Task[int] = asyncio.create_task(single_flight.run("key", fetch_mock, 1))
+    await started.wait()
+    second: asyncio.Task[int] = asyncio.create_task(single_flight.run("key", fetch_mock, 2))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert list(await asyncio.gather(first, second)) == [10, 10]
+    assert await single_flight.run("key", fetch_mock, 3) == 30
+    assert fetch_mock.mock_calls == [mocker.call(1), mocker.call(3)]
+    assert single_flight.shared == 1
+
+
+async def test_single_flight_error() -> None:
+    async def fail() -> int:
+        await asyncio.sleep(0)
+        raise OSError
+
+    single_flight: SingleFlight[str, int] = SingleFlight()
+
+    with pytest.raises(OSError):  # noqa: PT011
+        await asyncio.gather(single_flight.run("key", fail), single_flight.run("key", fail))
+
+
+async def test_single_flight_cancelled_caller() -> None:
+    release: asyncio.Event = asyncio.Event()
+
+    async def fetch() -> int:
+        await release.wait()
+        return 1
+
+    single_flight: SingleFlight[str, int] = SingleFlight()
+    first: asyncio.Task[int] = asyncio.create_task(single_flight.run("key", fetch))
+    second: asyncio.Task[int] = asyncio.create_task(single_flight.run("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 1